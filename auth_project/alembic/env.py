@@ -12,6 +12,9 @@ from app.core.config import settings
 from app.database import Base
 from app.models.user import User  # noqa: F401
 from app.models.social_token import SocialToken  # noqa: F401
+from app.models.vk_publish_queue import QueuedPost  # noqa: F401
+from app.models.vk_user_group import VKUserGroup  # noqa: F401
+from app.models.vk_scheduled_post import ScheduledPostMirror  # noqa: F401
 
 config = context.config
 
@@ -0,0 +1,77 @@
+"""create vk publish queue
+
+Revision ID: 0003_create_vk_publish_queue
+Revises: 0002_create_social_tokens
+Create Date: 2026-10-18
+
+"""
+
+from __future__ import annotations
+
+import sqlalchemy as sa
+from alembic import op
+from sqlalchemy.dialects import postgresql
+
+revision = "0003_create_vk_publish_queue"
+down_revision = "0002_create_social_tokens"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "vk_publish_queue",
+        sa.Column("id", sa.Uuid(), primary_key=True, nullable=False),
+        sa.Column(
+            "user_id",
+            sa.Uuid(),
+            sa.ForeignKey("users.id", ondelete="CASCADE"),
+            nullable=False,
+        ),
+        sa.Column("group_id", sa.BigInteger(), nullable=False),
+        sa.Column("message", sa.Text(), nullable=False),
+        sa.Column("attachments", postgresql.JSONB(), nullable=False, server_default=sa.text("'[]'::jsonb")),
+        sa.Column("from_group", sa.Boolean(), nullable=False, server_default=sa.text("true")),
+        sa.Column("publish_at", sa.DateTime(timezone=True), nullable=False),
+        sa.Column("status", sa.String(length=16), nullable=False, server_default="queued"),
+        sa.Column("vk_post_id", sa.BigInteger(), nullable=True),
+        sa.Column("attempts", sa.Integer(), nullable=False, server_default=sa.text("0")),
+        sa.Column("last_error", sa.Text(), nullable=True),
+        sa.Column(
+            "created_at",
+            sa.DateTime(timezone=True),
+            nullable=False,
+            server_default=sa.text("timezone('utc', now())"),
+        ),
+        sa.Column(
+            "updated_at",
+            sa.DateTime(timezone=True),
+            nullable=False,
+            server_default=sa.text("timezone('utc', now())"),
+        ),
+    )
+
+    op.create_index("ix_vk_publish_queue_user_id", "vk_publish_queue", ["user_id"], unique=False)
+    # The worker only ever scans queued rows in due order; keep that index
+    # small by leaving pushed/published history out of it.
+    op.create_index(
+        "ix_vk_publish_queue_due",
+        "vk_publish_queue",
+        ["group_id", "publish_at"],
+        unique=False,
+        postgresql_where=sa.text("status = 'queued'"),
+    )
+    op.create_index(
+        "ix_vk_publish_queue_in_flight",
+        "vk_publish_queue",
+        ["group_id", "publish_at"],
+        unique=False,
+        postgresql_where=sa.text("status IN ('pushing', 'pushed')"),
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("ix_vk_publish_queue_in_flight", table_name="vk_publish_queue")
+    op.drop_index("ix_vk_publish_queue_due", table_name="vk_publish_queue")
+    op.drop_index("ix_vk_publish_queue_user_id", table_name="vk_publish_queue")
+    op.drop_table("vk_publish_queue")
@@ -0,0 +1,46 @@
+"""create vk user groups
+
+Revision ID: 0004_create_vk_user_groups
+Revises: 0003_create_vk_publish_queue
+Create Date: 2026-10-18
+
+"""
+
+from __future__ import annotations
+
+import sqlalchemy as sa
+from alembic import op
+
+revision = "0004_create_vk_user_groups"
+down_revision = "0003_create_vk_publish_queue"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "vk_user_groups",
+        sa.Column("id", sa.Uuid(), primary_key=True, nullable=False),
+        sa.Column(
+            "user_id",
+            sa.Uuid(),
+            sa.ForeignKey("users.id", ondelete="CASCADE"),
+            nullable=False,
+        ),
+        sa.Column("group_id", sa.BigInteger(), nullable=False),
+        sa.Column("title", sa.String(length=255), nullable=True),
+        sa.Column(
+            "created_at",
+            sa.DateTime(timezone=True),
+            nullable=False,
+            server_default=sa.text("timezone('utc', now())"),
+        ),
+        sa.UniqueConstraint("user_id", "group_id", name="uq_vk_user_groups_user_group"),
+    )
+
+    op.create_index("ix_vk_user_groups_user_id", "vk_user_groups", ["user_id"], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index("ix_vk_user_groups_user_id", table_name="vk_user_groups")
+    op.drop_table("vk_user_groups")
@@ -0,0 +1,52 @@
+"""create vk scheduled posts mirror
+
+Revision ID: 0005_create_vk_scheduled_posts
+Revises: 0004_create_vk_user_groups
+Create Date: 2026-10-18
+
+"""
+
+from __future__ import annotations
+
+import sqlalchemy as sa
+from alembic import op
+from sqlalchemy.dialects import postgresql
+
+revision = "0005_create_vk_scheduled_posts"
+down_revision = "0004_create_vk_user_groups"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "vk_scheduled_posts",
+        sa.Column("group_id", sa.BigInteger(), primary_key=True, nullable=False),
+        sa.Column("post_id", sa.BigInteger(), primary_key=True, nullable=False),
+        sa.Column("owner_id", sa.BigInteger(), nullable=False),
+        sa.Column("from_id", sa.BigInteger(), nullable=True),
+        sa.Column("date", sa.BigInteger(), nullable=False, server_default=sa.text("0")),
+        sa.Column("text", sa.Text(), nullable=False, server_default=""),
+        sa.Column("attachments", postgresql.JSONB(), nullable=False, server_default=sa.text("'[]'::jsonb")),
+        sa.Column("postponed_id", sa.BigInteger(), nullable=True),
+        sa.Column("content_hash", sa.String(length=64), nullable=False),
+        sa.Column(
+            "synced_at",
+            sa.DateTime(timezone=True),
+            nullable=False,
+            server_default=sa.text("timezone('utc', now())"),
+        ),
+    )
+
+    # Keyset pagination walks (date, post_id) within a group.
+    op.create_index(
+        "ix_vk_scheduled_posts_group_date",
+        "vk_scheduled_posts",
+        ["group_id", "date", "post_id"],
+        unique=False,
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("ix_vk_scheduled_posts_group_date", table_name="vk_scheduled_posts")
+    op.drop_table("vk_scheduled_posts")
@@ -0,0 +1,45 @@
+"""add full-text search to vk scheduled posts
+
+Revision ID: 0006_add_vk_scheduled_posts_search
+Revises: 0005_create_vk_scheduled_posts
+Create Date: 2026-10-18
+
+"""
+
+from __future__ import annotations
+
+import sqlalchemy as sa
+from alembic import op
+from sqlalchemy.dialects import postgresql
+
+revision = "0006_add_vk_scheduled_posts_search"
+down_revision = "0005_create_vk_scheduled_posts"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # Generated, so every mirror upsert refreshes it without extra writes.
+    # 'simple' keeps words as typed: posts mix Russian and English, and
+    # prefix queries cover most inflections.
+    op.add_column(
+        "vk_scheduled_posts",
+        sa.Column(
+            "search_vector",
+            postgresql.TSVECTOR(),
+            sa.Computed("to_tsvector('simple'::regconfig, text)", persisted=True),
+            nullable=False,
+        ),
+    )
+    op.create_index(
+        "ix_vk_scheduled_posts_search",
+        "vk_scheduled_posts",
+        ["search_vector"],
+        unique=False,
+        postgresql_using="gin",
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("ix_vk_scheduled_posts_search", table_name="vk_scheduled_posts")
+    op.drop_column("vk_scheduled_posts", "search_vector")
@@ -0,0 +1,44 @@
+from __future__ import annotations
+
+from fastapi import APIRouter, Depends, HTTPException, Path
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.crud.vk_user_group import delete_group, list_by_user, upsert_group
+from app.database import get_db_session
+from app.dependencies import get_current_user, rate_limit
+from app.schemas.vk_posting import VKGroupList, VKGroupPublic, VKGroupUpsert, VKOkResponse
+
+router = APIRouter(prefix="/vk-groups", tags=["vk-groups"])
+
+
+@router.get("", response_model=VKGroupList, dependencies=[Depends(rate_limit)])
+async def list_groups(
+    user=Depends(get_current_user),
+    session: AsyncSession = Depends(get_db_session),
+) -> VKGroupList:
+    objs = await list_by_user(session, user_id=user.id)
+    return VKGroupList(
+        items=[VKGroupPublic(group_id=obj.group_id, title=obj.title, created_at=obj.created_at) for obj in objs]
+    )
+
+
+@router.put("/{group_id}", response_model=VKGroupPublic, dependencies=[Depends(rate_limit)])
+async def link_group(
+    payload: VKGroupUpsert,
+    group_id: int = Path(ge=1),
+    user=Depends(get_current_user),
+    session: AsyncSession = Depends(get_db_session),
+) -> VKGroupPublic:
+    obj = await upsert_group(session, user_id=user.id, group_id=group_id, title=payload.title)
+    return VKGroupPublic(group_id=obj.group_id, title=obj.title, created_at=obj.created_at)
+
+
+@router.delete("/{group_id}", response_model=VKOkResponse, dependencies=[Depends(rate_limit)])
+async def unlink_group(
+    group_id: int = Path(ge=1),
+    user=Depends(get_current_user),
+    session: AsyncSession = Depends(get_db_session),
+) -> VKOkResponse:
+    if not await delete_group(session, user_id=user.id, group_id=group_id):
+        raise HTTPException(status_code=404, detail="Group is not linked")
+    return VKOkResponse(ok=True)
@@ -2,46 +2,88 @@ from __future__ import annotations
 
 import logging
 
-from fastapi import APIRouter, Depends, HTTPException, Query, status
+from fastapi import APIRouter, Depends, HTTPException, Query, Response, status
 from pydantic import ValidationError as PydanticValidationError
+from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.core.config import settings
 from app.core.security import decrypt_secret
+from app.crud.vk_scheduled_post import get_post as get_mirrored_post
+from app.crud.vk_scheduled_post import list_page as list_mirrored_posts
+from app.crud.vk_scheduled_post import prefix_tsquery, search_posts
+from app.crud.vk_user_group import list_group_ids
+from app.database import get_db_session
 from app.dependencies import get_current_user, rate_limit
+from app.models.vk_scheduled_post import ScheduledPostMirror
 from app.redis_client import get_redis_client
+from app.services.post_mirror import (
+    has_mirror_access,
+    is_mirror_fresh,
+    mirrored_group_ids,
+    register_source,
+    write_through,
+)
+from app.services.schedule_index import (
+    SlotClaim,
+    claim_slot,
+    confirm_slot,
+    index_post,
+    post_slot,
+    range_posts,
+    release_slot,
+    unindex_post,
+)
+from app.vk_client import build_vk_scheduler
 from app.schemas.vk_posting import (
+    VK_POST_PUBLIC_FIELDS,
+    VKCalendarItem,
+    VKCalendarResponse,
+    VKFanoutItem,
+    VKFanoutRequest,
+    VKFanoutResponse,
     VKOkResponse,
     VKPostCreateRequest,
     VKPostIdResponse,
     VKPostList,
     VKPostPublic,
     VKPostEditRequest,
+    VKSlotCheckResponse,
 )
 
 from vkposting.exceptions import (
     VKAccessDeniedError,
-    VKAPIError,
     VKAuthError,
     VKCaptchaRequiredError,
+    VKCircuitOpenError,
+    VKClientError,
     VKFloodControlError,
     VKInternalServerError,
     VKNotFoundError,
     VKRateLimitError,
+    VKTimeoutError,
     VKUnknownMethodError,
     VKValidationRequiredError,
 )
+from vkposting.models import POST_LIST_ADAPTER
 from vkposting.wall_scheduler import VKWallScheduler
 
 logger = logging.getLogger(__name__)
 
 router = APIRouter(prefix="/vk-posting", tags=["vk-posting"])
 
+_PUBLIC_POST_INCLUDE = set(VK_POST_PUBLIC_FIELDS)
+_PUBLIC_POST_LIST_INCLUDE = {"__all__": _PUBLIC_POST_INCLUDE}
+
 
 def _token_key(user_id: str, provider: str) -> str:
     return f"social_tokens:token:{user_id}:{provider}"
 
 
-def _http_error_from_vk(exc: VKAPIError) -> HTTPException:
+def _http_error_from_vk(exc: VKClientError) -> HTTPException:
+    if isinstance(exc, VKCircuitOpenError):
+        return HTTPException(status_code=503, detail=str(exc))
+    if isinstance(exc, VKTimeoutError):
+        return HTTPException(status_code=504, detail=str(exc))
     if isinstance(exc, VKAuthError):
         return HTTPException(status_code=401, detail=str(exc))
     if isinstance(exc, VKAccessDeniedError):
@@ -58,26 +100,109 @@ def _http_error_from_vk(exc: VKAPIError) -> HTTPException:
     return HTTPException(status_code=502, detail=str(exc))
 
 
-async def _get_vk_scheduler(*, user_id) -> VKWallScheduler:
-    if settings.vk_group_id == 0:
-        raise HTTPException(status_code=500, detail="VK_GROUP_ID is not configured")
+async def _get_vk_access_token(*, user_id) -> str:
+    redis = get_redis_client()
+    token_data = await redis.hgetall(_token_key(str(user_id), "vk"))
+    if not token_data:
+        raise HTTPException(status_code=404, detail="VK token is not set for this user")
+
+    return decrypt_secret(token_data.get("access_token", ""))
+
 
+def _configured_group_id() -> int:
     group_id = abs(int(settings.vk_group_id))
     if group_id == 0:
         raise HTTPException(status_code=500, detail="VK_GROUP_ID is not configured")
+    return group_id
+
+
+async def _get_vk_scheduler(*, user_id) -> VKWallScheduler:
+    group_id = _configured_group_id()
+    access_token = await _get_vk_access_token(user_id=user_id)
+    return build_vk_scheduler(access_token, group_id)
+
+
+async def _ensure_mirror_access(group_id: int, user_id) -> None:
+    # Mirror reads skip VK's per-token access check, so the user's own token
+    # must have read the group on VK recently. The probe bypasses the shared
+    # cache: a page cached for someone else proves nothing.
+    if await has_mirror_access(group_id, user_id):
+        return
+    access_token = await _get_vk_access_token(user_id=user_id)
+    scheduler = build_vk_scheduler(access_token, group_id, cached=False)
+    try:
+        async with scheduler:
+            await scheduler.get_scheduled_posts(count=1)
+    except VKClientError as exc:
+        raise _http_error_from_vk(exc)
+    await register_source(group_id, user_id, access_ttl_s=settings.vk_mirror_access_ttl_s)
 
-    redis = get_redis_client()
-    token_data = await redis.hgetall(_token_key(str(user_id), "vk"))
-    if not token_data:
-        raise HTTPException(status_code=404, detail="VK token is not set for this user")
 
-    access_token = decrypt_secret(token_data.get("access_token", ""))
+async def _use_mirror(group_id: int, user_id, *, fresh: bool) -> bool:
+    if not settings.vk_mirror_enabled or fresh:
+        return False
+    await _ensure_mirror_access(group_id, user_id)
+    return await is_mirror_fresh(group_id, settings.vk_mirror_max_staleness_s)
 
-    return VKWallScheduler(
-        access_token=access_token,
-        group_id=group_id,
-        api_version=settings.vk_api_version,
-        cache_ttl_s=float(settings.vk_cache_ttl_s),
+
+async def _mirror_upsert(scheduler: VKWallScheduler, group_id: int, post_id: int) -> None:
+    # The write already went through on VK; a failed re-read only delays
+    # the mirror until the next sync.
+    try:
+        post = await scheduler.get_post_by_id(post_id)
+    except VKClientError as exc:
+        logger.warning("Mirror refresh failed post_id=%s: %s", post_id, exc)
+        return
+    if post is not None:
+        await write_through(group_id, upsert=post)
+
+
+_ON_CONFLICT_PATTERN = "^(reject|shift)$"
+
+
+async def _claim_slot_or_409(
+    group_id: int,
+    publish_date: int,
+    on_conflict: str,
+    *,
+    post_id: int | None = None,
+) -> SlotClaim:
+    claim = await claim_slot(
+        group_id,
+        publish_date,
+        spacing_s=settings.vk_schedule_min_spacing_s,
+        shift=on_conflict == "shift",
+        post_id=post_id,
+    )
+    if not claim.ok:
+        raise HTTPException(
+            status_code=409,
+            detail={
+                "message": "publish_date is too close to another scheduled post",
+                "conflict_post_id": claim.conflict_post_id,
+                "conflict_publish_date": claim.publish_date,
+            },
+        )
+    return claim
+
+
+def _decode_cursor(cursor: str) -> tuple[int, int]:
+    try:
+        date, post_id = cursor.split(":", 1)
+        return int(date), int(post_id)
+    except ValueError:
+        raise HTTPException(status_code=422, detail="Invalid cursor")
+
+
+def _mirrored_public(row: ScheduledPostMirror) -> VKPostPublic:
+    return VKPostPublic(
+        id=row.post_id,
+        owner_id=row.owner_id,
+        from_id=row.from_id,
+        date=row.date,
+        text=row.text,
+        attachments=row.attachments,
+        postponed_id=row.postponed_id,
     )
 
 
@@ -85,70 +210,282 @@ async def _get_vk_scheduler(*, user_id) -> VKWallScheduler:
 async def list_scheduled_posts(
     count: int = Query(default=10, ge=1, le=100),
     offset: int = Query(default=0, ge=0),
+    cursor: str | None = Query(default=None, description="next_cursor from the previous page"),
+    fresh: bool = Query(default=False, description="Bypass the local mirror and read from VK"),
     user=Depends(get_current_user),
-) -> VKPostList:
+    session: AsyncSession = Depends(get_db_session),
+) -> Response:
     scheduler = await _get_vk_scheduler(user_id=user.id)
+    group_id = _configured_group_id()
+
+    # A cursor always pages through the mirror so a walk stays consistent
+    # even if the mirror goes stale halfway.
+    if cursor is not None:
+        if not settings.vk_mirror_enabled:
+            raise HTTPException(status_code=422, detail="Cursor pagination requires the post mirror")
+        await _ensure_mirror_access(group_id, user.id)
+    if cursor is not None or await _use_mirror(group_id, user.id, fresh=fresh):
+        after = _decode_cursor(cursor) if cursor is not None else None
+        rows = await list_mirrored_posts(session, group_id=group_id, limit=count, after=after, offset=offset)
+        next_cursor = f"{rows[-1].date}:{rows[-1].post_id}" if len(rows) == count else None
+        page = VKPostList(items=[_mirrored_public(row) for row in rows], next_cursor=next_cursor)
+        return Response(content=page.model_dump_json(), media_type="application/json")
+
     try:
         async with scheduler:
             posts = await scheduler.get_scheduled_posts(count=count, offset=offset)
-    except VKAPIError as exc:
+    except VKClientError as exc:
         raise _http_error_from_vk(exc)
 
-    return VKPostList(items=[VKPostPublic.model_validate(p.model_dump()) for p in posts])
+    # Posts are already validated; serialize them straight to JSON bytes.
+    items = POST_LIST_ADAPTER.dump_json(posts, include=_PUBLIC_POST_LIST_INCLUDE)
+    return Response(content=b'{"items":' + items + b"}", media_type="application/json")
+
+
+@router.get("/calendar", response_model=VKCalendarResponse, dependencies=[Depends(rate_limit)])
+async def scheduled_calendar(
+    from_: int = Query(alias="from", ge=0, description="Unix timestamp, inclusive"),
+    to: int = Query(ge=0, description="Unix timestamp, inclusive"),
+    limit: int = Query(default=500, ge=1, le=1000),
+    user=Depends(get_current_user),
+) -> VKCalendarResponse:
+    if to < from_:
+        raise HTTPException(status_code=422, detail="to must be >= from")
+    slots = await range_posts(_configured_group_id(), from_, to, limit=limit)
+    return VKCalendarResponse(items=[VKCalendarItem(post_id=p, publish_date=ts) for p, ts in slots])
+
+
+@router.get("/search", response_model=VKPostList, dependencies=[Depends(rate_limit)])
+async def search_scheduled_posts(
+    q: str = Query(min_length=1, max_length=200),
+    limit: int = Query(default=20, ge=1, le=100),
+    user=Depends(get_current_user),
+    session: AsyncSession = Depends(get_db_session),
+) -> Response:
+    if not settings.vk_mirror_enabled:
+        raise HTTPException(status_code=503, detail="Search requires the post mirror (VK_MIRROR_ENABLED)")
+
+    # Same access rule as mirrored listing: VK must have let this user's
+    # token read the group recently.
+    group_id = _configured_group_id()
+    await _ensure_mirror_access(group_id, user.id)
+
+    query = prefix_tsquery(q)
+    if query is None:
+        raise HTTPException(status_code=422, detail="Query has no searchable words")
+
+    rows = await search_posts(session, group_id=group_id, query=query, limit=limit)
+    page = VKPostList(items=[_mirrored_public(row) for row in rows])
+    return Response(content=page.model_dump_json(), media_type="application/json")
+
+
+@router.get("/slots/check", response_model=VKSlotCheckResponse, dependencies=[Depends(rate_limit)])
+async def check_slot(
+    publish_date: int = Query(ge=1, description="Unix timestamp"),
+    on_conflict: str = Query(default="reject", pattern=_ON_CONFLICT_PATTERN),
+    user=Depends(get_current_user),
+) -> VKSlotCheckResponse:
+    claim = await claim_slot(
+        _configured_group_id(),
+        publish_date,
+        spacing_s=settings.vk_schedule_min_spacing_s,
+        shift=on_conflict == "shift",
+        dry_run=True,
+    )
+    return VKSlotCheckResponse(
+        free=claim.ok,
+        publish_date=claim.publish_date,
+        conflict_post_id=claim.conflict_post_id,
+    )
 
 
 @router.get("/{post_id}", response_model=VKPostPublic, dependencies=[Depends(rate_limit)])
 async def get_scheduled_post(
     post_id: int,
+    fresh: bool = Query(default=False, description="Bypass the local mirror and read from VK"),
     user=Depends(get_current_user),
-) -> VKPostPublic:
+    session: AsyncSession = Depends(get_db_session),
+) -> Response:
     scheduler = await _get_vk_scheduler(user_id=user.id)
+    group_id = _configured_group_id()
+
+    # A miss may be a post created outside this API since the last sync.
+    if await _use_mirror(group_id, user.id, fresh=fresh):
+        row = await get_mirrored_post(session, group_id=group_id, post_id=post_id)
+        if row is not None:
+            return Response(content=_mirrored_public(row).model_dump_json(), media_type="application/json")
+
     try:
         async with scheduler:
             post = await scheduler.get_post_by_id(post_id)
-    except VKAPIError as exc:
+    except VKClientError as exc:
         raise _http_error_from_vk(exc)
 
     if post is None:
         raise HTTPException(status_code=404, detail="Post not found")
 
-    return VKPostPublic.model_validate(post.model_dump())
+    return Response(content=post.model_dump_json(include=_PUBLIC_POST_INCLUDE), media_type="application/json")
 
 
 @router.post("", response_model=VKPostIdResponse, status_code=status.HTTP_201_CREATED, dependencies=[Depends(rate_limit)])
 async def create_scheduled_post(
     payload: VKPostCreateRequest,
+    on_conflict: str = Query(default="reject", pattern=_ON_CONFLICT_PATTERN),
     user=Depends(get_current_user),
 ) -> VKPostIdResponse:
     scheduler = await _get_vk_scheduler(user_id=user.id)
+    group_id = _configured_group_id()
+
+    data = payload.model_dump()
+    claim = None
+    if payload.publish_date > 0:
+        claim = await _claim_slot_or_409(group_id, payload.publish_date, on_conflict)
+        data["publish_date"] = claim.publish_date
+
+    post_id: int | None = None
     try:
         async with scheduler:
-            post_id = await scheduler.create_scheduled_post(**payload.model_dump())
+            post_id = await scheduler.create_scheduled_post(**data)
+            if settings.vk_mirror_enabled:
+                await _mirror_upsert(scheduler, group_id, post_id)
     except (ValueError, PydanticValidationError) as exc:
         raise HTTPException(status_code=422, detail=str(exc))
-    except VKAPIError as exc:
+    except VKClientError as exc:
         raise _http_error_from_vk(exc)
+    finally:
+        if claim is not None:
+            if post_id is None:
+                await release_slot(group_id, claim)
+            else:
+                await confirm_slot(group_id, claim, post_id)
 
-    return VKPostIdResponse(post_id=post_id)
+    return VKPostIdResponse(post_id=post_id, publish_date=data["publish_date"] or None)
+
+
+@router.post("/fanout", response_model=VKFanoutResponse, dependencies=[Depends(rate_limit)])
+async def fanout_scheduled_post(
+    payload: VKFanoutRequest,
+    on_conflict: str = Query(default="reject", pattern=_ON_CONFLICT_PATTERN),
+    user=Depends(get_current_user),
+    session: AsyncSession = Depends(get_db_session),
+) -> VKFanoutResponse:
+    mapped = await list_group_ids(session, user_id=user.id)
+    if payload.group_ids is None:
+        group_ids = mapped
+    else:
+        group_ids = list(dict.fromkeys(abs(g) for g in payload.group_ids))
+        unknown = sorted(set(group_ids) - set(mapped))
+        if unknown:
+            raise HTTPException(status_code=403, detail=f"Groups are not linked to this user: {unknown}")
+    if not group_ids:
+        raise HTTPException(status_code=422, detail="No VK groups are linked to this user")
+
+    access_token = await _get_vk_access_token(user_id=user.id)
+
+    # Every group claims its own slot. A group whose slot is taken fails on
+    # its own instead of failing the whole fan-out.
+    claims: dict[int, SlotClaim] = {}
+    conflicts: dict[int, SlotClaim] = {}
+    if payload.publish_date > 0:
+        for group_id in group_ids:
+            claim = await claim_slot(
+                group_id,
+                payload.publish_date,
+                spacing_s=settings.vk_schedule_min_spacing_s,
+                shift=on_conflict == "shift",
+            )
+            (claims if claim.ok else conflicts)[group_id] = claim
+    targets = [g for g in group_ids if g not in conflicts]
+
+    results = {}
+    scheduler = build_vk_scheduler(access_token, group_ids[0])
+    try:
+        async with scheduler:
+            if targets:
+                results = await scheduler.fanout_create_scheduled_post(
+                    targets,
+                    publish_dates={g: claim.publish_date for g, claim in claims.items()},
+                    **payload.model_dump(exclude={"group_ids"}),
+                )
+            if settings.vk_mirror_enabled:
+                mirrored = await mirrored_group_ids()
+                for group_id, result in results.items():
+                    if result.ok and group_id in mirrored:
+                        await _mirror_upsert(scheduler.with_group(group_id), group_id, result.post_id)
+    except (ValueError, PydanticValidationError) as exc:
+        raise HTTPException(status_code=422, detail=str(exc))
+    except VKClientError as exc:
+        raise _http_error_from_vk(exc)
+    finally:
+        for group_id, claim in claims.items():
+            result = results.get(group_id)
+            if result is not None and result.ok:
+                await confirm_slot(group_id, claim, result.post_id)
+            else:
+                await release_slot(group_id, claim)
+
+    items = []
+    for group_id in group_ids:
+        if group_id in conflicts:
+            items.append(
+                VKFanoutItem(
+                    group_id=group_id,
+                    error="publish_date is too close to another scheduled post",
+                    conflict_post_id=conflicts[group_id].conflict_post_id,
+                )
+            )
+            continue
+        result = results[group_id]
+        claim = claims.get(group_id)
+        items.append(
+            VKFanoutItem(
+                group_id=group_id,
+                post_id=result.post_id,
+                publish_date=(claim.publish_date if claim is not None else payload.publish_date) or None
+                if result.ok
+                else None,
+                error=str(result.error) if result.error is not None else None,
+            )
+        )
+    return VKFanoutResponse(items=items)
 
 
 @router.patch("/{post_id}", response_model=VKOkResponse, dependencies=[Depends(rate_limit)])
 async def edit_scheduled_post(
     post_id: int,
     payload: VKPostEditRequest,
+    on_conflict: str = Query(default="reject", pattern=_ON_CONFLICT_PATTERN),
     user=Depends(get_current_user),
 ) -> VKOkResponse:
     scheduler = await _get_vk_scheduler(user_id=user.id)
+    group_id = _configured_group_id()
 
     data = payload.model_dump(exclude_unset=True)
     if not data:
         raise HTTPException(status_code=422, detail="No fields to update")
 
+    # The claim moves the post's own entry; put it back if VK refuses.
+    previous_slot = None
+    claim = None
+    if data.get("publish_date"):
+        previous_slot = await post_slot(group_id, post_id)
+        claim = await _claim_slot_or_409(group_id, data["publish_date"], on_conflict, post_id=post_id)
+        data["publish_date"] = claim.publish_date
+
+    ok = False
     try:
         async with scheduler:
             ok = await scheduler.edit_scheduled_post(post_id, **data)
-    except VKAPIError as exc:
+            if ok and settings.vk_mirror_enabled:
+                await _mirror_upsert(scheduler, group_id, post_id)
+    except VKClientError as exc:
         raise _http_error_from_vk(exc)
+    finally:
+        if claim is not None and not ok:
+            if previous_slot is None:
+                await unindex_post(group_id, post_id)
+            else:
+                await index_post(group_id, post_id, previous_slot)
 
     return VKOkResponse(ok=bool(ok))
 
@@ -162,7 +499,13 @@ async def delete_scheduled_post(
     try:
         async with scheduler:
             ok = await scheduler.delete_scheduled_post(post_id)
-    except VKAPIError as exc:
+    except VKClientError as exc:
         raise _http_error_from_vk(exc)
 
+    if ok:
+        group_id = _configured_group_id()
+        await unindex_post(group_id, post_id)
+        if settings.vk_mirror_enabled:
+            await write_through(group_id, delete_id=post_id)
+
     return VKOkResponse(ok=bool(ok))
@@ -0,0 +1,126 @@
+from __future__ import annotations
+
+import datetime as dt
+import uuid
+
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.crud.vk_publish_queue import cancel_queued, enqueue_posts, get_by_user_and_id, list_by_user
+from app.database import get_db_session
+from app.dependencies import get_current_user, rate_limit
+from app.models.vk_publish_queue import QueuedPost
+from app.schemas.vk_posting import VKOkResponse
+from app.schemas.vk_publish_queue import (
+    VKQueuedIdsResponse,
+    VKQueuedPostBatchCreate,
+    VKQueuedPostCreate,
+    VKQueuedPostList,
+    VKQueuedPostPublic,
+)
+
+router = APIRouter(prefix="/vk-publish-queue", tags=["vk-publish-queue"])
+
+_STATUS_PATTERN = "^(queued|pushing|pushed|published|failed|cancelled)$"
+
+
+def _group_id() -> int:
+    group_id = abs(int(settings.vk_group_id))
+    if group_id == 0:
+        raise HTTPException(status_code=500, detail="VK_GROUP_ID is not configured")
+    return group_id
+
+
+def _to_row(payload: VKQueuedPostCreate) -> dict:
+    return {
+        "message": payload.message,
+        "attachments": payload.attachments,
+        "from_group": payload.from_group,
+        "publish_at": dt.datetime.fromtimestamp(payload.publish_at, tz=dt.timezone.utc),
+    }
+
+
+def _to_public(obj: QueuedPost) -> VKQueuedPostPublic:
+    return VKQueuedPostPublic(
+        id=obj.id,
+        group_id=obj.group_id,
+        message=obj.message,
+        attachments=obj.attachments,
+        from_group=obj.from_group,
+        publish_at=int(obj.publish_at.timestamp()),
+        status=obj.status,
+        vk_post_id=obj.vk_post_id,
+        attempts=obj.attempts,
+        last_error=obj.last_error,
+        created_at=obj.created_at,
+    )
+
+
+@router.post("", response_model=VKQueuedPostPublic, status_code=status.HTTP_201_CREATED, dependencies=[Depends(rate_limit)])
+async def enqueue_post(
+    payload: VKQueuedPostCreate,
+    user=Depends(get_current_user),
+    session: AsyncSession = Depends(get_db_session),
+) -> VKQueuedPostPublic:
+    objs = await enqueue_posts(session, user_id=user.id, group_id=_group_id(), posts=[_to_row(payload)])
+    await session.refresh(objs[0])
+    return _to_public(objs[0])
+
+
+@router.post(
+    "/batch",
+    response_model=VKQueuedIdsResponse,
+    status_code=status.HTTP_201_CREATED,
+    dependencies=[Depends(rate_limit)],
+)
+async def enqueue_batch(
+    payload: VKQueuedPostBatchCreate,
+    user=Depends(get_current_user),
+    session: AsyncSession = Depends(get_db_session),
+) -> VKQueuedIdsResponse:
+    objs = await enqueue_posts(
+        session,
+        user_id=user.id,
+        group_id=_group_id(),
+        posts=[_to_row(item) for item in payload.items],
+    )
+    return VKQueuedIdsResponse(ids=[obj.id for obj in objs])
+
+
+@router.get("", response_model=VKQueuedPostList, dependencies=[Depends(rate_limit)])
+async def list_queued_posts(
+    status_filter: str | None = Query(default=None, alias="status", pattern=_STATUS_PATTERN),
+    limit: int = Query(default=50, ge=1, le=500),
+    offset: int = Query(default=0, ge=0),
+    user=Depends(get_current_user),
+    session: AsyncSession = Depends(get_db_session),
+) -> VKQueuedPostList:
+    objs = await list_by_user(session, user_id=user.id, status=status_filter, limit=limit, offset=offset)
+    return VKQueuedPostList(items=[_to_public(obj) for obj in objs])
+
+
+@router.get("/{queued_id}", response_model=VKQueuedPostPublic, dependencies=[Depends(rate_limit)])
+async def get_queued_post(
+    queued_id: uuid.UUID,
+    user=Depends(get_current_user),
+    session: AsyncSession = Depends(get_db_session),
+) -> VKQueuedPostPublic:
+    obj = await get_by_user_and_id(session, user_id=user.id, queued_id=queued_id)
+    if obj is None:
+        raise HTTPException(status_code=404, detail="Queued post not found")
+    return _to_public(obj)
+
+
+@router.delete("/{queued_id}", response_model=VKOkResponse, dependencies=[Depends(rate_limit)])
+async def cancel_queued_post(
+    queued_id: uuid.UUID,
+    user=Depends(get_current_user),
+    session: AsyncSession = Depends(get_db_session),
+) -> VKOkResponse:
+    if await cancel_queued(session, user_id=user.id, queued_id=queued_id):
+        return VKOkResponse(ok=True)
+    if await get_by_user_and_id(session, user_id=user.id, queued_id=queued_id) is None:
+        raise HTTPException(status_code=404, detail="Queued post not found")
+    # Already handed to VK; delete it there through /vk-posting instead.
+    raise HTTPException(status_code=409, detail="Queued post is no longer pending")
@@ -31,9 +31,67 @@ class Settings(BaseSettings):
     rate_limit_requests: int = 60
     rate_limit_window_seconds: int = 60
 
+    metrics_enabled: bool = True
+    server_timing_enabled: bool = True
+    # Requests slower than this are logged with their span breakdown; 0 disables it.
+    slow_request_threshold_ms: float = 1000.0
+
     vk_group_id: int = 0
     vk_api_version: str = "5.199"
+    vk_api_base_url: str = "https://api.vk.com/method"
     vk_cache_ttl_s: float = 0.0
+    # Redis-backed wall.get/wall.getById cache shared by all workers; 0 disables it.
+    vk_shared_cache_ttl_s: float = 0.0
+    vk_shared_cache_compress_min_bytes: int = 1024
+    # get_post_by_id calls for one token and wall, across requests, are
+    # merged into one wall.getById if they land within this window.
+    vk_get_by_id_batch_window_s: float = 0.002
+
+    vk_http_pool_limit: int = 100
+    vk_http_pool_limit_per_host: int = 20
+    vk_http_dns_cache_ttl_s: int = 300
+    vk_http_keepalive_timeout_s: float = 30.0
+
+    # Client-side budget per VK access token (VK allows 3 rps for user tokens).
+    vk_rate_limit_rps: float = 3.0
+    vk_rate_limit_min_rps: float = 0.5
+
+    vk_retry_max_attempts: int = 4
+    vk_retry_base_delay_s: float = 0.35
+    vk_retry_max_delay_s: float = 4.0
+    vk_retry_deadline_s: float = 10.0
+    vk_circuit_failure_threshold: int = 5
+    vk_circuit_reset_timeout_s: float = 30.0
+    # Minimum gap between two scheduled posts of a group. 0 disables conflict
+    # detection: any publish_date is accepted and no slot is reserved.
+    vk_schedule_min_spacing_s: int = 0
+
+    # Local queue for posts beyond VK's postponed-post limit; only the nearest
+    # vk_publish_window_size posts per group are kept on VK.
+    vk_publish_queue_enabled: bool = False
+    vk_publish_window_size: int = 100
+    vk_publish_poll_interval_s: float = 15.0
+    vk_publish_max_attempts: int = 5
+    vk_publish_leader_ttl_s: float = 60.0
+    vk_publish_stale_after_s: float = 600.0
+
+    # Postgres mirror of postponed posts that list/get read from while the
+    # last sync is at most vk_mirror_max_staleness_s old.
+    vk_mirror_enabled: bool = False
+    vk_mirror_sync_interval_s: float = 30.0
+    vk_mirror_max_staleness_s: float = 120.0
+    vk_mirror_leader_ttl_s: float = 90.0
+    # How long one successful VK read lets a user read a group's mirror.
+    vk_mirror_access_ttl_s: float = 600.0
+
+    # Downscale and re-encode photos in a process pool before upload
+    # (needs Pillow); 0 workers means one per CPU. An empty cache dir means
+    # a directory under the system temp dir.
+    vk_image_prep_enabled: bool = False
+    vk_image_prep_quality: int = 85
+    vk_image_prep_workers: int = 0
+    vk_image_prep_cache_dir: str = ""
+    vk_image_prep_cache_max_mb: int = 512
 
 
 settings = Settings()
@@ -12,16 +12,19 @@ from jose import JWTError, jwt
 from passlib.context import CryptContext
 
 from app.core.config import settings
+from app.core.timing import timed
 
 logger = logging.getLogger(__name__)
 
 pwd_context = CryptContext(schemes=["bcrypt_sha256"], deprecated="auto")
 
 
+@timed("bcrypt")
 def hash_password(password: str) -> str:
     return pwd_context.hash(password)
 
 
+@timed("bcrypt")
 def verify_password(plain_password: str, hashed_password: str) -> bool:
     return pwd_context.verify(plain_password, hashed_password)
 
@@ -34,6 +37,7 @@ def _new_jti() -> str:
     return secrets.token_urlsafe(32)
 
 
+@timed("jwt")
 def create_access_token(*, subject: str, expires_minutes: int) -> str:
     now = _utcnow()
     payload: dict[str, Any] = {
@@ -46,6 +50,7 @@ def create_access_token(*, subject: str, expires_minutes: int) -> str:
     return jwt.encode(payload, settings.secret_key, algorithm=settings.algorithm)
 
 
+@timed("jwt")
 def create_refresh_token(*, subject: str, expires_days: int) -> tuple[str, str]:
     now = _utcnow()
     jti = _new_jti()
@@ -60,6 +65,7 @@ def create_refresh_token(*, subject: str, expires_days: int) -> tuple[str, str]:
     return token, jti
 
 
+@timed("jwt")
 def decode_token(token: str) -> dict[str, Any]:
     try:
         payload = jwt.decode(token, settings.secret_key, algorithms=[settings.algorithm])
@@ -86,6 +92,7 @@ def _get_fernet() -> Fernet:
     return Fernet(key)
 
 
+@timed("fernet")
 def encrypt_secret(value: str) -> str:
     if value == "":
         return value
@@ -94,6 +101,7 @@ def encrypt_secret(value: str) -> str:
     return token.decode("utf-8")
 
 
+@timed("fernet")
 def decrypt_secret(value: str) -> str:
     if value == "":
         return value
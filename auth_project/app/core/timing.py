@@ -0,0 +1,161 @@
+from __future__ import annotations
+
+import functools
+import logging
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Callable, Iterator, TypeVar
+
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncEngine
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from vkposting.hooks import VKHooks, VKRequestEvent
+
+logger = logging.getLogger(__name__)
+
+F = TypeVar("F", bound=Callable[..., Any])
+
+
+class RequestTimings:
+    __slots__ = ("started", "totals", "counts")
+
+    def __init__(self) -> None:
+        self.started = time.perf_counter()
+        self.totals: dict[str, float] = {}
+        self.counts: dict[str, int] = {}
+
+    def add(self, name: str, duration_s: float) -> None:
+        self.totals[name] = self.totals.get(name, 0.0) + duration_s
+        self.counts[name] = self.counts.get(name, 0) + 1
+
+    def elapsed_s(self) -> float:
+        return time.perf_counter() - self.started
+
+    def server_timing(self) -> str:
+        parts = [
+            f'{name};dur={total * 1000:.2f};desc="{self.counts[name]}x"' for name, total in self.totals.items()
+        ]
+        parts.append(f"total;dur={self.elapsed_s() * 1000:.2f}")
+        return ", ".join(parts)
+
+    def summary(self) -> str:
+        return " ".join(f"{name}={total * 1000:.1f}ms/{self.counts[name]}" for name, total in self.totals.items())
+
+
+# None outside of an HTTP request, so instrumented code pays one lookup.
+_current: ContextVar[RequestTimings | None] = ContextVar("request_timings", default=None)
+
+
+def current_timings() -> RequestTimings | None:
+    return _current.get()
+
+
+def record_span(name: str, duration_s: float) -> None:
+    timings = _current.get()
+    if timings is not None:
+        timings.add(name, duration_s)
+
+
+@contextmanager
+def span(name: str) -> Iterator[None]:
+    timings = _current.get()
+    if timings is None:
+        yield
+        return
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        timings.add(name, time.perf_counter() - started)
+
+
+def timed(name: str) -> Callable[[F], F]:
+    def decorator(fn: F) -> F:
+        @functools.wraps(fn)
+        def wrapper(*args: Any, **kwargs: Any) -> Any:
+            timings = _current.get()
+            if timings is None:
+                return fn(*args, **kwargs)
+            started = time.perf_counter()
+            try:
+                return fn(*args, **kwargs)
+            finally:
+                timings.add(name, time.perf_counter() - started)
+
+        return wrapper  # type: ignore[return-value]
+
+    return decorator
+
+
+class TimingVKHooks(VKHooks):
+    def on_request_end(self, event: VKRequestEvent) -> None:
+        timings = _current.get()
+        if timings is not None:
+            timings.add("vk", event.duration_s)
+            if event.queue_wait_s:
+                timings.add("vk-queue", event.queue_wait_s)
+
+
+def instrument_engine(engine: AsyncEngine) -> None:
+    # Cursor-level events run inside SQLAlchemy's greenlet, which shares the
+    # request's context, so the spans land on the right request.
+    sync_engine = engine.sync_engine
+
+    @event.listens_for(sync_engine, "before_cursor_execute")
+    def _before(conn, cursor, statement, parameters, context, executemany) -> None:
+        if _current.get() is not None:
+            conn.info.setdefault("timing_started", []).append(time.perf_counter())
+
+    @event.listens_for(sync_engine, "after_cursor_execute")
+    def _after(conn, cursor, statement, parameters, context, executemany) -> None:
+        stack = conn.info.get("timing_started")
+        if stack:
+            record_span("db", time.perf_counter() - stack.pop())
+
+    @event.listens_for(sync_engine, "handle_error")
+    def _error(exception_context) -> None:
+        conn = exception_context.connection
+        stack = conn.info.get("timing_started") if conn is not None else None
+        if stack:
+            record_span("db", time.perf_counter() - stack.pop())
+
+
+class ServerTimingMiddleware:
+    def __init__(self, app: ASGIApp, *, slow_request_threshold_ms: float = 1000.0):
+        self.app = app
+        self.slow_request_threshold_s = slow_request_threshold_ms / 1000
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        timings = RequestTimings()
+        token = _current.set(timings)
+        status_code = 500
+
+        async def send_wrapper(message: Message) -> None:
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+                headers = list(message.get("headers", []))
+                headers.append((b"server-timing", timings.server_timing().encode("latin-1")))
+                message = {**message, "headers": headers}
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            _current.reset(token)
+            elapsed = timings.elapsed_s()
+            if self.slow_request_threshold_s > 0 and elapsed >= self.slow_request_threshold_s:
+                logger.warning(
+                    "Slow request method=%s path=%s status=%s total_ms=%.1f spans=%s",
+                    scope["method"],
+                    scope["path"],
+                    status_code,
+                    elapsed * 1000,
+                    timings.summary() or "-",
+                )
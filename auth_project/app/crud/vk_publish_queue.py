@@ -0,0 +1,68 @@
+from __future__ import annotations
+
+import datetime as dt
+from typing import Any, Iterable
+
+from sqlalchemy import select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models.vk_publish_queue import CANCELLED, QUEUED, QueuedPost
+
+
+async def enqueue_posts(
+    session: AsyncSession,
+    *,
+    user_id,
+    group_id: int,
+    posts: Iterable[dict[str, Any]],
+) -> list[QueuedPost]:
+    objs = [
+        QueuedPost(
+            user_id=user_id,
+            group_id=group_id,
+            message=p["message"],
+            attachments=list(p.get("attachments") or []),
+            from_group=p.get("from_group", True),
+            publish_at=p["publish_at"],
+            status=QUEUED,
+            attempts=0,
+        )
+        for p in posts
+    ]
+    session.add_all(objs)
+    await session.commit()
+    return objs
+
+
+async def get_by_user_and_id(session: AsyncSession, *, user_id, queued_id) -> QueuedPost | None:
+    stmt = select(QueuedPost).where(QueuedPost.id == queued_id, QueuedPost.user_id == user_id)
+    res = await session.execute(stmt)
+    return res.scalar_one_or_none()
+
+
+async def list_by_user(
+    session: AsyncSession,
+    *,
+    user_id,
+    status: str | None = None,
+    limit: int = 50,
+    offset: int = 0,
+) -> list[QueuedPost]:
+    stmt = select(QueuedPost).where(QueuedPost.user_id == user_id)
+    if status is not None:
+        stmt = stmt.where(QueuedPost.status == status)
+    stmt = stmt.order_by(QueuedPost.publish_at.asc(), QueuedPost.id.asc()).limit(limit).offset(offset)
+    res = await session.execute(stmt)
+    return list(res.scalars().all())
+
+
+async def cancel_queued(session: AsyncSession, *, user_id, queued_id) -> bool:
+    # Only rows the worker has not claimed yet can be cancelled locally.
+    stmt = (
+        update(QueuedPost)
+        .where(QueuedPost.id == queued_id, QueuedPost.user_id == user_id, QueuedPost.status == QUEUED)
+        .values(status=CANCELLED, updated_at=dt.datetime.now(dt.timezone.utc))
+    )
+    res = await session.execute(stmt)
+    await session.commit()
+    return res.rowcount > 0
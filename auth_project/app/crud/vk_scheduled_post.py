@@ -0,0 +1,100 @@
+from __future__ import annotations
+
+import re
+from typing import Any, Iterable
+
+from sqlalchemy import delete, func, literal_column, select, tuple_
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models.vk_scheduled_post import ScheduledPostMirror
+
+
+_SEARCH_WORD_RE = re.compile(r"\w+", re.UNICODE)
+
+_UPSERT_COLUMNS = ("owner_id", "from_id", "date", "text", "attachments", "postponed_id", "content_hash")
+
+
+async def get_post(session: AsyncSession, *, group_id: int, post_id: int) -> ScheduledPostMirror | None:
+    return await session.get(ScheduledPostMirror, (group_id, post_id))
+
+
+async def list_page(
+    session: AsyncSession,
+    *,
+    group_id: int,
+    limit: int,
+    after: tuple[int, int] | None = None,
+    offset: int = 0,
+) -> list[ScheduledPostMirror]:
+    stmt = select(ScheduledPostMirror).where(ScheduledPostMirror.group_id == group_id)
+    if after is not None:
+        stmt = stmt.where(tuple_(ScheduledPostMirror.date, ScheduledPostMirror.post_id) > after)
+    elif offset:
+        stmt = stmt.offset(offset)
+    stmt = stmt.order_by(ScheduledPostMirror.date.asc(), ScheduledPostMirror.post_id.asc()).limit(limit)
+    res = await session.execute(stmt)
+    return list(res.scalars().all())
+
+
+async def get_hashes(session: AsyncSession, *, group_id: int) -> dict[int, str]:
+    stmt = select(ScheduledPostMirror.post_id, ScheduledPostMirror.content_hash).where(
+        ScheduledPostMirror.group_id == group_id
+    )
+    res = await session.execute(stmt)
+    return {post_id: content_hash for post_id, content_hash in res.all()}
+
+
+async def upsert_posts(session: AsyncSession, rows: list[dict[str, Any]]) -> None:
+    if not rows:
+        return
+    stmt = insert(ScheduledPostMirror).values(rows)
+    set_ = {col: stmt.excluded[col] for col in _UPSERT_COLUMNS}
+    set_["synced_at"] = func.timezone("utc", func.now())
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[ScheduledPostMirror.group_id, ScheduledPostMirror.post_id],
+        set_=set_,
+    )
+    await session.execute(stmt)
+
+
+async def delete_posts(session: AsyncSession, *, group_id: int, post_ids: Iterable[int]) -> None:
+    ids = list(post_ids)
+    if not ids:
+        return
+    stmt = delete(ScheduledPostMirror).where(
+        ScheduledPostMirror.group_id == group_id,
+        ScheduledPostMirror.post_id.in_(ids),
+    )
+    await session.execute(stmt)
+
+
+def prefix_tsquery(text: str) -> str | None:
+    # Words only, so user input can never inject tsquery operators; every
+    # word is matched as a prefix ("sal" finds "sale").
+    words = _SEARCH_WORD_RE.findall(text.lower())
+    if not words:
+        return None
+    return " & ".join(f"{w}:*" for w in words)
+
+
+async def search_posts(
+    session: AsyncSession,
+    *,
+    group_id: int,
+    query: str,
+    limit: int,
+) -> list[ScheduledPostMirror]:
+    tsquery = func.to_tsquery(literal_column("'simple'::regconfig"), query)
+    rank = func.ts_rank(ScheduledPostMirror.search_vector, tsquery)
+    stmt = (
+        select(ScheduledPostMirror)
+        .where(
+            ScheduledPostMirror.group_id == group_id,
+            ScheduledPostMirror.search_vector.op("@@")(tsquery),
+        )
+        .order_by(rank.desc(), ScheduledPostMirror.date.asc(), ScheduledPostMirror.post_id.asc())
+        .limit(limit)
+    )
+    res = await session.execute(stmt)
+    return list(res.scalars().all())
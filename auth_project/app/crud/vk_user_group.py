@@ -0,0 +1,39 @@
+from __future__ import annotations
+
+from sqlalchemy import delete, select
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models.vk_user_group import VKUserGroup
+
+
+async def list_by_user(session: AsyncSession, *, user_id) -> list[VKUserGroup]:
+    stmt = select(VKUserGroup).where(VKUserGroup.user_id == user_id).order_by(VKUserGroup.group_id.asc())
+    res = await session.execute(stmt)
+    return list(res.scalars().all())
+
+
+async def list_group_ids(session: AsyncSession, *, user_id) -> list[int]:
+    stmt = select(VKUserGroup.group_id).where(VKUserGroup.user_id == user_id).order_by(VKUserGroup.group_id.asc())
+    res = await session.execute(stmt)
+    return list(res.scalars().all())
+
+
+async def upsert_group(session: AsyncSession, *, user_id, group_id: int, title: str | None) -> VKUserGroup:
+    stmt = (
+        insert(VKUserGroup)
+        .values(user_id=user_id, group_id=group_id, title=title)
+        .on_conflict_do_update(constraint="uq_vk_user_groups_user_group", set_={"title": title})
+        .returning(VKUserGroup)
+    )
+    res = await session.execute(stmt)
+    obj = res.scalar_one()
+    await session.commit()
+    return obj
+
+
+async def delete_group(session: AsyncSession, *, user_id, group_id: int) -> bool:
+    stmt = delete(VKUserGroup).where(VKUserGroup.user_id == user_id, VKUserGroup.group_id == group_id)
+    res = await session.execute(stmt)
+    await session.commit()
+    return res.rowcount > 0
@@ -6,6 +6,7 @@ from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, async_sessionmaker
 from sqlalchemy.orm import DeclarativeBase
 
 from app.core.config import settings
+from app.core.timing import instrument_engine
 
 logger = logging.getLogger(__name__)
 
@@ -19,6 +20,9 @@ engine: AsyncEngine = create_async_engine(
     pool_pre_ping=True,
 )
 
+if settings.server_timing_enabled:
+    instrument_engine(engine)
+
 AsyncSessionLocal = async_sessionmaker(
     bind=engine,
     class_=AsyncSession,
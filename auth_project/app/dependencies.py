@@ -12,6 +12,7 @@ from app.core.config import settings
 from app.core.security import decode_token
 from app.crud.user import get_user_by_id
 from app.database import get_db_session
+from app.metrics import RATE_LIMIT_REJECTIONS, route_label
 from app.redis_client import get_redis_client
 
 logger = logging.getLogger(__name__)
@@ -31,6 +32,7 @@ async def rate_limit(request: Request) -> None:
             await redis.expire(key, settings.rate_limit_window_seconds)
 
         if count > settings.rate_limit_requests:
+            RATE_LIMIT_REJECTIONS.labels(route_label(request.scope)).inc()
             raise HTTPException(
                 status_code=status.HTTP_429_TOO_MANY_REQUESTS,
                 detail="Rate limit exceeded",
@@ -3,12 +3,17 @@ from __future__ import annotations
 import asyncio
 import logging
 
-from fastapi import FastAPI
+from fastapi import FastAPI, Response
 from fastapi.middleware.cors import CORSMiddleware
 
 from app.api.v1 import api_router
 from app.core.config import settings
+from app.core.timing import ServerTimingMiddleware
+from app.metrics import PrometheusMiddleware, mark_process_dead, metrics_response
 from app.redis_client import close_redis_client, get_redis_client
+from app.services.post_mirror import PostMirrorSync
+from app.services.publish_queue import PublishQueueWorker
+from app.vk_client import close_vk_image_preprocessor, close_vk_session_pool, get_vk_session_pool
 
 logging.basicConfig(
     level=logging.INFO,
@@ -33,12 +38,47 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+if settings.metrics_enabled:
+    app.add_middleware(PrometheusMiddleware)
+
+if settings.server_timing_enabled:
+    app.add_middleware(ServerTimingMiddleware, slow_request_threshold_ms=settings.slow_request_threshold_ms)
+
 app.include_router(api_router, prefix="/api/v1")
 
 
+if settings.metrics_enabled:
+
+    @app.get("/metrics", include_in_schema=False)
+    async def metrics() -> Response:
+        return metrics_response()
+
+
 @app.on_event("startup")
 async def on_startup() -> None:
+    app.state.vk_session_pool = get_vk_session_pool()
     app.state.redis = get_redis_client()
+    app.state.publish_worker = None
+    if settings.vk_publish_queue_enabled:
+        worker = PublishQueueWorker(
+            window_size=settings.vk_publish_window_size,
+            poll_interval_s=settings.vk_publish_poll_interval_s,
+            max_attempts=settings.vk_publish_max_attempts,
+            leader_ttl_s=settings.vk_publish_leader_ttl_s,
+            stale_after_s=settings.vk_publish_stale_after_s,
+        )
+        app.state.publish_worker = worker
+        app.state.publish_worker_task = asyncio.create_task(worker.run())
+
+    app.state.mirror_sync = None
+    if settings.vk_mirror_enabled:
+        mirror_sync = PostMirrorSync(
+            interval_s=settings.vk_mirror_sync_interval_s,
+            leader_ttl_s=settings.vk_mirror_leader_ttl_s,
+        )
+        app.state.mirror_sync = mirror_sync
+        app.state.mirror_sync_task = asyncio.create_task(mirror_sync.run())
+
     last_exc: Exception | None = None
     for _ in range(10):
         try:
@@ -55,4 +95,13 @@ async def on_startup() -> None:
 
 @app.on_event("shutdown")
 async def on_shutdown() -> None:
+    if app.state.publish_worker is not None:
+        app.state.publish_worker.stop()
+        await app.state.publish_worker_task
+    if app.state.mirror_sync is not None:
+        app.state.mirror_sync.stop()
+        await app.state.mirror_sync_task
     await close_redis_client()
+    await close_vk_session_pool()
+    close_vk_image_preprocessor()
+    mark_process_dead()
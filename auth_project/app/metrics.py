@@ -0,0 +1,244 @@
+from __future__ import annotations
+
+import logging
+import os
+import time
+from typing import Any
+
+from prometheus_client import (
+    CONTENT_TYPE_LATEST,
+    REGISTRY,
+    CollectorRegistry,
+    Counter,
+    Gauge,
+    Histogram,
+    generate_latest,
+    multiprocess,
+)
+from starlette.responses import Response
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from vkposting.hooks import VKCacheEvent, VKConnectionEvent, VKHooks, VKRequestEvent, VKUploadEvent
+
+from app.database import engine
+from app.redis_client import get_redis_client
+
+logger = logging.getLogger(__name__)
+
+
+# With several uvicorn/gunicorn workers each process writes its samples to
+# PROMETHEUS_MULTIPROC_DIR and /metrics aggregates them at scrape time.
+MULTIPROCESS = bool(os.getenv("PROMETHEUS_MULTIPROC_DIR"))
+
+# Pool gauges are refreshed by every worker as it serves requests, at most
+# this often, so the livesum over workers is never stuck on a stale value.
+_POOL_GAUGES_INTERVAL_S = 1.0
+_pool_gauges_updated_at = 0.0
+
+_LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+_UPLOAD_BUCKETS = (0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 120.0)
+
+HTTP_REQUESTS = Counter(
+    "http_requests_total",
+    "HTTP requests handled",
+    ["method", "route", "status"],
+)
+HTTP_REQUEST_DURATION = Histogram(
+    "http_request_duration_seconds",
+    "HTTP request latency",
+    ["method", "route"],
+    buckets=_LATENCY_BUCKETS,
+)
+HTTP_REQUESTS_IN_PROGRESS = Gauge(
+    "http_requests_in_progress",
+    "HTTP requests currently being handled",
+    multiprocess_mode="livesum",
+)
+RATE_LIMIT_REJECTIONS = Counter(
+    "rate_limit_rejections_total",
+    "Requests rejected by the per-IP rate limit",
+    ["route"],
+)
+
+VK_REQUESTS = Counter(
+    "vk_api_requests_total",
+    "VK API request attempts",
+    ["method", "outcome", "error_code"],
+)
+VK_REQUEST_DURATION = Histogram(
+    "vk_api_request_duration_seconds",
+    "VK API request attempt latency, excluding rate limiter wait",
+    ["method"],
+    buckets=_LATENCY_BUCKETS,
+)
+VK_RATE_LIMIT_WAIT = Histogram(
+    "vk_rate_limit_wait_seconds",
+    "Time spent waiting for a VK rate limiter token",
+    buckets=_LATENCY_BUCKETS,
+)
+VK_CACHE_LOOKUPS = Counter(
+    "vk_cache_lookups_total",
+    "VK response cache lookups",
+    ["layer", "result"],
+)
+VK_CONNECTIONS = Counter(
+    "vk_http_connections_total",
+    "VK HTTP requests by connection reuse",
+    ["reused"],
+)
+VK_CONNECT_DURATION = Histogram(
+    "vk_http_connect_seconds",
+    "New VK connection setup time",
+    ["phase"],
+    buckets=_LATENCY_BUCKETS,
+)
+VK_UPLOAD_BYTES = Counter(
+    "vk_upload_bytes_total",
+    "Bytes uploaded to VK upload servers",
+    ["kind"],
+)
+VK_UPLOAD_DURATION = Histogram(
+    "vk_upload_duration_seconds",
+    "VK upload transfer time",
+    ["kind", "outcome"],
+    buckets=_UPLOAD_BUCKETS,
+)
+
+DB_POOL_CHECKED_OUT = Gauge(
+    "db_pool_checked_out_connections",
+    "SQLAlchemy connections in use",
+    multiprocess_mode="livesum",
+)
+DB_POOL_SIZE = Gauge(
+    "db_pool_size",
+    "SQLAlchemy pool size",
+    multiprocess_mode="livesum",
+)
+DB_POOL_OVERFLOW = Gauge(
+    "db_pool_overflow",
+    "SQLAlchemy connections opened beyond pool_size",
+    multiprocess_mode="livesum",
+)
+REDIS_POOL_IN_USE = Gauge(
+    "redis_pool_in_use_connections",
+    "Redis connections in use",
+    multiprocess_mode="livesum",
+)
+REDIS_POOL_AVAILABLE = Gauge(
+    "redis_pool_available_connections",
+    "Idle Redis connections in the pool",
+    multiprocess_mode="livesum",
+)
+
+
+class PrometheusVKHooks(VKHooks):
+    def on_request_end(self, event: VKRequestEvent) -> None:
+        if event.ok:
+            outcome, code = "ok", ""
+        else:
+            outcome = "error"
+            code = str(event.error_code) if event.error_code is not None else type(event.error).__name__
+        VK_REQUESTS.labels(event.method, outcome, code).inc()
+        VK_REQUEST_DURATION.labels(event.method).observe(event.duration_s)
+        VK_RATE_LIMIT_WAIT.observe(event.queue_wait_s)
+
+    def on_connection(self, event: VKConnectionEvent) -> None:
+        VK_CONNECTIONS.labels("true" if event.reused else "false").inc()
+        if event.dns_s is not None:
+            VK_CONNECT_DURATION.labels("dns").observe(event.dns_s)
+        if event.connect_s is not None:
+            VK_CONNECT_DURATION.labels("connect").observe(event.connect_s)
+
+    def on_cache(self, event: VKCacheEvent) -> None:
+        VK_CACHE_LOOKUPS.labels(event.layer, "hit" if event.hit else "miss").inc()
+
+    def on_upload(self, event: VKUploadEvent) -> None:
+        VK_UPLOAD_BYTES.labels(event.kind).inc(event.bytes_sent)
+        VK_UPLOAD_DURATION.labels(event.kind, "ok" if event.error is None else "error").observe(event.duration_s)
+
+
+def route_label(scope: Scope) -> str:
+    # The route template, not the raw path, keeps label cardinality bounded.
+    # Newer FastAPI keeps included routes unprefixed and records the full
+    # template on the effective route context instead.
+    fastapi_scope = scope.get("fastapi") or {}
+    for route in (fastapi_scope.get("effective_route_context"), scope.get("route")):
+        path = getattr(route, "path", None)
+        if path:
+            return path
+    return "<unmatched>"
+
+
+class PrometheusMiddleware:
+    # Plain ASGI middleware: no request/response wrapping beyond capturing
+    # the status code.
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        status_code = 500
+
+        async def send_wrapper(message: Message) -> None:
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+
+        started = time.perf_counter()
+        HTTP_REQUESTS_IN_PROGRESS.inc()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            HTTP_REQUESTS_IN_PROGRESS.dec()
+            route = route_label(scope)
+            method = scope["method"]
+            HTTP_REQUEST_DURATION.labels(method, route).observe(time.perf_counter() - started)
+            HTTP_REQUESTS.labels(method, route, str(status_code)).inc()
+            _maybe_update_pool_gauges()
+
+
+def _update_pool_gauges() -> None:
+    pool: Any = engine.pool
+    for gauge, attr in ((DB_POOL_CHECKED_OUT, "checkedout"), (DB_POOL_SIZE, "size"), (DB_POOL_OVERFLOW, "overflow")):
+        fn = getattr(pool, attr, None)
+        if fn is not None:
+            gauge.set(fn())
+
+    # redis-py does not expose pool usage publicly; these lists are stable
+    # across 4.x/5.x.
+    redis_pool = get_redis_client().connection_pool
+    REDIS_POOL_IN_USE.set(len(getattr(redis_pool, "_in_use_connections", ())))
+    REDIS_POOL_AVAILABLE.set(len(getattr(redis_pool, "_available_connections", ())))
+
+
+def _maybe_update_pool_gauges(*, force: bool = False) -> None:
+    global _pool_gauges_updated_at
+    now = time.monotonic()
+    if not force and now - _pool_gauges_updated_at < _POOL_GAUGES_INTERVAL_S:
+        return
+    _pool_gauges_updated_at = now
+    try:
+        _update_pool_gauges()
+    except Exception as exc:
+        logger.warning("Pool metrics update failed: %s", exc)
+
+
+def metrics_response() -> Response:
+    _maybe_update_pool_gauges(force=True)
+
+    if MULTIPROCESS:
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+    else:
+        registry = REGISTRY
+    return Response(content=generate_latest(registry), media_type=CONTENT_TYPE_LATEST)
+
+
+def mark_process_dead() -> None:
+    # Drops this worker's live gauges from the multiprocess aggregate.
+    if MULTIPROCESS:
+        multiprocess.mark_process_dead(os.getpid())
@@ -0,0 +1,73 @@
+from __future__ import annotations
+
+import datetime as dt
+import uuid
+from typing import Any
+
+from sqlalchemy import BigInteger, Boolean, DateTime, ForeignKey, Index, Integer, String, Text, func, text
+from sqlalchemy.dialects.postgresql import JSONB, UUID
+from sqlalchemy.orm import Mapped, mapped_column
+
+from app.database import Base
+
+
+QUEUED = "queued"
+# Claimed by the worker and being sent to VK. Rows left here by a crash go
+# back to QUEUED after vk_publish_stale_after_s; if VK took the post before
+# the crash, the retry duplicates it.
+PUSHING = "pushing"
+# Sitting on VK as a postponed post.
+PUSHED = "pushed"
+PUBLISHED = "published"
+FAILED = "failed"
+CANCELLED = "cancelled"
+
+
+class QueuedPost(Base):
+    __tablename__ = "vk_publish_queue"
+    __table_args__ = (
+        Index(
+            "ix_vk_publish_queue_due",
+            "group_id",
+            "publish_at",
+            postgresql_where=text("status = 'queued'"),
+        ),
+        Index(
+            "ix_vk_publish_queue_in_flight",
+            "group_id",
+            "publish_at",
+            postgresql_where=text("status IN ('pushing', 'pushed')"),
+        ),
+    )
+
+    id: Mapped[uuid.UUID] = mapped_column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
+
+    user_id: Mapped[uuid.UUID] = mapped_column(
+        UUID(as_uuid=True),
+        ForeignKey("users.id", ondelete="CASCADE"),
+        nullable=False,
+        index=True,
+    )
+    group_id: Mapped[int] = mapped_column(BigInteger, nullable=False)
+
+    message: Mapped[str] = mapped_column(Text, nullable=False)
+    attachments: Mapped[list[Any]] = mapped_column(JSONB, nullable=False, default=list)
+    from_group: Mapped[bool] = mapped_column(Boolean, nullable=False, default=True)
+    publish_at: Mapped[dt.datetime] = mapped_column(DateTime(timezone=True), nullable=False)
+
+    status: Mapped[str] = mapped_column(String(16), nullable=False, default=QUEUED)
+    vk_post_id: Mapped[int | None] = mapped_column(BigInteger, nullable=True)
+    attempts: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    last_error: Mapped[str | None] = mapped_column(Text, nullable=True)
+
+    created_at: Mapped[dt.datetime] = mapped_column(
+        DateTime(timezone=True),
+        nullable=False,
+        server_default=func.timezone("utc", func.now()),
+    )
+    updated_at: Mapped[dt.datetime] = mapped_column(
+        DateTime(timezone=True),
+        nullable=False,
+        server_default=func.timezone("utc", func.now()),
+        onupdate=func.timezone("utc", func.now()),
+    )
@@ -0,0 +1,44 @@
+from __future__ import annotations
+
+import datetime as dt
+from typing import Any
+
+from sqlalchemy import BigInteger, Computed, DateTime, Index, String, Text, func
+from sqlalchemy.dialects.postgresql import JSONB, TSVECTOR
+from sqlalchemy.orm import Mapped, mapped_column
+
+from app.database import Base
+
+
+class ScheduledPostMirror(Base):
+    # Local copy of a group's postponed posts, kept in sync by
+    # app.services.post_mirror.
+    __tablename__ = "vk_scheduled_posts"
+    __table_args__ = (
+        Index("ix_vk_scheduled_posts_group_date", "group_id", "date", "post_id"),
+        Index("ix_vk_scheduled_posts_search", "search_vector", postgresql_using="gin"),
+    )
+
+    group_id: Mapped[int] = mapped_column(BigInteger, primary_key=True)
+    post_id: Mapped[int] = mapped_column(BigInteger, primary_key=True)
+
+    owner_id: Mapped[int] = mapped_column(BigInteger, nullable=False)
+    from_id: Mapped[int | None] = mapped_column(BigInteger, nullable=True)
+    date: Mapped[int] = mapped_column(BigInteger, nullable=False, default=0)
+    text: Mapped[str] = mapped_column(Text, nullable=False, default="")
+    attachments: Mapped[list[Any]] = mapped_column(JSONB, nullable=False, default=list)
+    postponed_id: Mapped[int | None] = mapped_column(BigInteger, nullable=True)
+    search_vector: Mapped[Any] = mapped_column(
+        TSVECTOR,
+        Computed("to_tsvector('simple'::regconfig, text)", persisted=True),
+        nullable=False,
+        deferred=True,
+    )
+
+    content_hash: Mapped[str] = mapped_column(String(64), nullable=False)
+    synced_at: Mapped[dt.datetime] = mapped_column(
+        DateTime(timezone=True),
+        nullable=False,
+        server_default=func.timezone("utc", func.now()),
+        onupdate=func.timezone("utc", func.now()),
+    )
@@ -1,26 +1,54 @@
 from __future__ import annotations
 
 import logging
+import time
+from typing import Any
 
 import redis.asyncio as redis
 
 from app.core.config import settings
+from app.core.timing import current_timings
 
 logger = logging.getLogger(__name__)
 
 
+class TimedRedis(redis.Redis):
+    # Adds each command to the current request's "redis" timing span.
+    async def execute_command(self, *args: Any, **options: Any) -> Any:
+        timings = current_timings()
+        if timings is None:
+            return await super().execute_command(*args, **options)
+        started = time.perf_counter()
+        try:
+            return await super().execute_command(*args, **options)
+        finally:
+            timings.add("redis", time.perf_counter() - started)
+
+
 _redis_client: redis.Redis | None = None
+_redis_binary_client: redis.Redis | None = None
 
 
 def get_redis_client() -> redis.Redis:
     global _redis_client
     if _redis_client is None:
-        _redis_client = redis.from_url(settings.redis_url, decode_responses=True)
+        _redis_client = TimedRedis.from_url(settings.redis_url, decode_responses=True)
     return _redis_client
 
 
+def get_redis_binary_client() -> redis.Redis:
+    # Raw bytes in and out, for compressed/serialized payloads.
+    global _redis_binary_client
+    if _redis_binary_client is None:
+        _redis_binary_client = TimedRedis.from_url(settings.redis_url, decode_responses=False)
+    return _redis_binary_client
+
+
 async def close_redis_client() -> None:
-    global _redis_client
+    global _redis_client, _redis_binary_client
     if _redis_client is not None:
         await _redis_client.aclose()
         _redis_client = None
+    if _redis_binary_client is not None:
+        await _redis_binary_client.aclose()
+        _redis_binary_client = None
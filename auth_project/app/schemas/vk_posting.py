@@ -1,5 +1,6 @@
 from __future__ import annotations
 
+from datetime import datetime
 from typing import Any
 
 from pydantic import BaseModel, Field, model_validator
@@ -15,8 +16,15 @@ class VKPostPublic(BaseModel):
     postponed_id: int | None = None
 
 
+# Fields of vkposting.Post exposed by the API; endpoints serialize Post with
+# this include set directly instead of re-validating into VKPostPublic.
+VK_POST_PUBLIC_FIELDS = frozenset(VKPostPublic.model_fields)
+
+
 class VKPostList(BaseModel):
     items: list[VKPostPublic]
+    # Set when the page came from the local mirror and more posts follow.
+    next_cursor: str | None = None
 
 
 class VKPostCreateRequest(BaseModel):
@@ -26,6 +34,11 @@ class VKPostCreateRequest(BaseModel):
     from_group: bool = True
 
 
+class VKFanoutRequest(VKPostCreateRequest):
+    # None posts to every group in the user's mapping.
+    group_ids: list[int] | None = Field(default=None, min_length=1, max_length=100)
+
+
 class VKPostEditRequest(BaseModel):
     message: str | None = None
     publish_date: int | None = Field(default=None, description="Unix timestamp")
@@ -46,7 +59,52 @@ class VKPostEditRequest(BaseModel):
 
 class VKPostIdResponse(BaseModel):
     post_id: int
+    # The slot actually used; differs from the request when it was shifted.
+    publish_date: int | None = None
 
 
 class VKOkResponse(BaseModel):
     ok: bool
+
+
+class VKCalendarItem(BaseModel):
+    post_id: int
+    publish_date: int
+
+
+class VKCalendarResponse(BaseModel):
+    items: list[VKCalendarItem]
+
+
+class VKSlotCheckResponse(BaseModel):
+    free: bool
+    # The requested slot, the shifted one, or the conflicting post's slot.
+    publish_date: int
+    conflict_post_id: int | None = None
+
+
+class VKFanoutItem(BaseModel):
+    group_id: int
+    post_id: int | None = None
+    # The slot actually used; differs per group with on_conflict=shift.
+    publish_date: int | None = None
+    error: str | None = None
+    conflict_post_id: int | None = None
+
+
+class VKFanoutResponse(BaseModel):
+    items: list[VKFanoutItem]
+
+
+class VKGroupUpsert(BaseModel):
+    title: str | None = Field(default=None, max_length=255)
+
+
+class VKGroupPublic(BaseModel):
+    group_id: int
+    title: str | None = None
+    created_at: datetime
+
+
+class VKGroupList(BaseModel):
+    items: list[VKGroupPublic]
@@ -0,0 +1,39 @@
+from __future__ import annotations
+
+from datetime import datetime
+from uuid import UUID
+
+from pydantic import BaseModel, Field
+
+
+class VKQueuedPostCreate(BaseModel):
+    message: str = Field(min_length=1)
+    publish_at: int = Field(ge=1, description="Unix timestamp")
+    attachments: list[str] = Field(default_factory=list)
+    from_group: bool = True
+
+
+class VKQueuedPostBatchCreate(BaseModel):
+    items: list[VKQueuedPostCreate] = Field(min_length=1, max_length=1000)
+
+
+class VKQueuedPostPublic(BaseModel):
+    id: UUID
+    group_id: int
+    message: str
+    attachments: list[str]
+    from_group: bool
+    publish_at: int
+    status: str
+    vk_post_id: int | None = None
+    attempts: int
+    last_error: str | None = None
+    created_at: datetime
+
+
+class VKQueuedPostList(BaseModel):
+    items: list[VKQueuedPostPublic]
+
+
+class VKQueuedIdsResponse(BaseModel):
+    ids: list[UUID]
@@ -0,0 +1,46 @@
+from __future__ import annotations
+
+import uuid
+
+import redis.asyncio as redis
+
+
+# Both scripts only touch the key while we still own it, so a lock that
+# expired and was taken over by another process is never extended or freed.
+_RENEW_SCRIPT = """
+if redis.call("GET", KEYS[1]) == ARGV[1] then
+    return redis.call("PEXPIRE", KEYS[1], ARGV[2])
+end
+return 0
+"""
+
+_RELEASE_SCRIPT = """
+if redis.call("GET", KEYS[1]) == ARGV[1] then
+    return redis.call("DEL", KEYS[1])
+end
+return 0
+"""
+
+
+class RedisLeaderLock:
+    def __init__(self, redis_client: redis.Redis, key: str, *, ttl_ms: int):
+        self._redis = redis_client
+        self.key = key
+        self.ttl_ms = int(ttl_ms)
+        self.token = uuid.uuid4().hex
+        self._renew = redis_client.register_script(_RENEW_SCRIPT)
+        self._release = redis_client.register_script(_RELEASE_SCRIPT)
+
+    async def acquire(self) -> bool:
+        return bool(await self._redis.set(self.key, self.token, nx=True, px=self.ttl_ms))
+
+    async def renew(self) -> bool:
+        return bool(await self._renew(keys=[self.key], args=[self.token, self.ttl_ms]))
+
+    async def acquire_or_renew(self) -> bool:
+        if await self.renew():
+            return True
+        return await self.acquire()
+
+    async def release(self) -> bool:
+        return bool(await self._release(keys=[self.key], args=[self.token]))
@@ -0,0 +1,228 @@
+from __future__ import annotations
+
+import asyncio
+import hashlib
+import logging
+import time
+from typing import Any
+
+from vkposting.compact import CompactPost
+from vkposting.exceptions import VKAccessDeniedError, VKAuthError, VKClientError
+from vkposting.models import Post
+from vkposting.wall_scheduler import VKWallScheduler
+
+from app.core.security import decrypt_secret
+from app.crud.vk_scheduled_post import delete_posts, get_hashes, upsert_posts
+from app.database import AsyncSessionLocal
+from app.redis_client import get_redis_client
+from app.services.leader import RedisLeaderLock
+from app.services.schedule_index import replace_index
+from app.vk_client import build_vk_scheduler
+
+logger = logging.getLogger(__name__)
+
+
+_UPSERT_CHUNK = 1000
+
+
+def _token_key(user_id: str, provider: str) -> str:
+    return f"social_tokens:token:{user_id}:{provider}"
+
+
+def _groups_key() -> str:
+    return "vk:mirror:groups"
+
+
+def _sources_key(group_id: int) -> str:
+    return f"vk:mirror:sources:{group_id}"
+
+
+def _synced_key(group_id: int) -> str:
+    return f"vk:mirror:synced:{group_id}"
+
+
+def _leader_key(group_id: int) -> str:
+    return f"vk:mirror:leader:{group_id}"
+
+
+def _access_key(group_id: int, user_id) -> str:
+    return f"vk:mirror:access:{group_id}:{user_id}"
+
+
+def content_hash(post: CompactPost) -> str:
+    # Only what a user can change on a postponed post; ids never change.
+    h = hashlib.sha256()
+    h.update(post.text.encode("utf-8"))
+    h.update(b"\0")
+    h.update(str(post.date or 0).encode("ascii"))
+    h.update(b"\0")
+    h.update(post.attachments_raw)
+    return h.hexdigest()
+
+
+def mirror_row(group_id: int, post: CompactPost | Post) -> dict[str, Any]:
+    if isinstance(post, Post):
+        post = CompactPost.from_item(post.model_dump())
+    return {
+        "group_id": group_id,
+        "post_id": post.id,
+        "owner_id": post.owner_id,
+        "from_id": post.from_id,
+        "date": post.date or 0,
+        "text": post.text,
+        "attachments": post.attachments,
+        "postponed_id": post.postponed_id,
+        "content_hash": content_hash(post),
+    }
+
+
+async def register_source(group_id: int, user_id, *, access_ttl_s: float) -> None:
+    # Call only after the user's own token has read the group on VK. The
+    # token then serves the group's sync, and the user may read the mirror,
+    # which skips VK's per-token check, for access_ttl_s.
+    redis = get_redis_client()
+    async with redis.pipeline(transaction=False) as pipe:
+        pipe.sadd(_groups_key(), group_id)
+        pipe.sadd(_sources_key(group_id), str(user_id))
+        pipe.set(_access_key(group_id, user_id), "1", px=max(1, int(access_ttl_s * 1000)))
+        await pipe.execute()
+
+
+async def mirrored_group_ids() -> set[int]:
+    return {int(g) for g in await get_redis_client().smembers(_groups_key())}
+
+
+async def has_mirror_access(group_id: int, user_id) -> bool:
+    return bool(await get_redis_client().exists(_access_key(group_id, user_id)))
+
+
+async def _drop_source(group_id: int, user_id) -> None:
+    async with get_redis_client().pipeline(transaction=False) as pipe:
+        pipe.srem(_sources_key(group_id), str(user_id))
+        pipe.delete(_access_key(group_id, user_id))
+        await pipe.execute()
+
+
+async def is_mirror_fresh(group_id: int, max_staleness_s: float) -> bool:
+    synced_at = await get_redis_client().get(_synced_key(group_id))
+    if not synced_at:
+        return False
+    return time.time() - float(synced_at) <= max_staleness_s
+
+
+async def write_through(group_id: int, *, upsert: Post | None = None, delete_id: int | None = None) -> None:
+    # Keeps the mirror in step with writes made through the API so a read
+    # right after a write does not wait for the next sync.
+    try:
+        async with AsyncSessionLocal() as session:
+            if upsert is not None:
+                await upsert_posts(session, [mirror_row(group_id, upsert)])
+            if delete_id is not None:
+                await delete_posts(session, group_id=group_id, post_ids=[delete_id])
+            await session.commit()
+    except Exception as exc:
+        # The next sync repairs the row.
+        logger.warning("Mirror write-through failed group_id=%s: %s", group_id, exc)
+
+
+class PostMirrorSync:
+    # Mirrors each registered group's postponed posts into vk_scheduled_posts.
+    # Every process may run one; per-group Redis locks make sure each group
+    # is synced by a single process at a time.
+    def __init__(self, *, interval_s: float, leader_ttl_s: float):
+        self.interval_s = interval_s
+        self.leader_ttl_ms = int(leader_ttl_s * 1000)
+        self._locks: dict[int, RedisLeaderLock] = {}
+        self._stopped = asyncio.Event()
+
+    def stop(self) -> None:
+        self._stopped.set()
+
+    async def run(self) -> None:
+        try:
+            while not self._stopped.is_set():
+                try:
+                    await self.tick()
+                except Exception:
+                    logger.exception("Mirror sync tick failed")
+                try:
+                    await asyncio.wait_for(self._stopped.wait(), timeout=self.interval_s)
+                except asyncio.TimeoutError:
+                    pass
+        finally:
+            for lock in self._locks.values():
+                try:
+                    await lock.release()
+                except Exception as exc:
+                    logger.warning("Mirror leader release failed: %s", exc)
+
+    async def tick(self) -> None:
+        group_ids = sorted(int(g) for g in await get_redis_client().smembers(_groups_key()))
+        for group_id in group_ids:
+            if self._stopped.is_set():
+                return
+            lock = self._locks.get(group_id)
+            if lock is None:
+                lock = self._locks[group_id] = RedisLeaderLock(
+                    get_redis_client(),
+                    _leader_key(group_id),
+                    ttl_ms=self.leader_ttl_ms,
+                )
+            if not await lock.acquire_or_renew():
+                continue
+            try:
+                await self.sync_group(group_id)
+            except VKClientError as exc:
+                logger.warning("Mirror sync failed group_id=%s: %s", group_id, exc)
+
+    async def _scheduler_for(self, group_id: int) -> tuple[str, VKWallScheduler] | None:
+        redis = get_redis_client()
+        for user_id in sorted(await redis.smembers(_sources_key(group_id))):
+            token_data = await redis.hgetall(_token_key(user_id, "vk"))
+            if token_data.get("access_token"):
+                # The sync is the source of truth; a shared cache page could
+                # be vk_shared_cache_ttl_s old.
+                return user_id, build_vk_scheduler(
+                    decrypt_secret(token_data["access_token"]), group_id, cached=False
+                )
+            await _drop_source(group_id, user_id)
+        return None
+
+    async def sync_group(self, group_id: int) -> None:
+        source = await self._scheduler_for(group_id)
+        if source is None:
+            return
+        user_id, scheduler = source
+
+        try:
+            async with scheduler:
+                posts = [p async for p in scheduler.iter_scheduled_posts(compact=True)]
+        except (VKAuthError, VKAccessDeniedError):
+            # This token can no longer read the group; try another next time,
+            # and its user loses mirror access until VK lets them in again.
+            await _drop_source(group_id, user_id)
+            raise
+
+        async with AsyncSessionLocal() as session:
+            known = await get_hashes(session, group_id=group_id)
+            # Attachments are only decoded for rows that actually changed.
+            changed = [mirror_row(group_id, p) for p in posts if known.get(p.id) != content_hash(p)]
+            gone = set(known) - {post.id for post in posts}
+
+            for i in range(0, len(changed), _UPSERT_CHUNK):
+                await upsert_posts(session, changed[i : i + _UPSERT_CHUNK])
+            await delete_posts(session, group_id=group_id, post_ids=gone)
+            await session.commit()
+
+        # A full listing also repairs the calendar index for posts created
+        # outside this API.
+        await replace_index(group_id, {post.id: post.date for post in posts if post.date})
+        await get_redis_client().set(_synced_key(group_id), str(time.time()))
+        if changed or gone:
+            logger.info(
+                "Mirror synced group_id=%s posts=%d changed=%d removed=%d",
+                group_id,
+                len(posts),
+                len(changed),
+                len(gone),
+            )
@@ -0,0 +1,222 @@
+from __future__ import annotations
+
+import asyncio
+import datetime as dt
+import logging
+import time
+import uuid
+
+from sqlalchemy import func, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from vkposting.exceptions import VKAPIError, VKCircuitOpenError, VKClientError
+
+from app.core.security import decrypt_secret
+from app.database import AsyncSessionLocal
+from app.models.vk_publish_queue import FAILED, PUBLISHED, PUSHED, PUSHING, QUEUED, QueuedPost
+from app.redis_client import get_redis_client
+from app.services.leader import RedisLeaderLock
+from app.services.schedule_index import index_post
+from app.vk_client import build_vk_scheduler
+
+logger = logging.getLogger(__name__)
+
+
+LEADER_KEY = "vk:publish_queue:leader"
+
+# VK: "Too many scheduled posts" - the group's postponed list is full.
+_POSTPONED_LIMIT_ERROR = 214
+# Posts due sooner than this are published right away; VK rejects
+# publish_date values that are already in the past.
+_MIN_LEAD_S = 60
+
+
+def _token_key(user_id: str, provider: str) -> str:
+    return f"social_tokens:token:{user_id}:{provider}"
+
+
+def _utcnow() -> dt.datetime:
+    return dt.datetime.now(dt.timezone.utc)
+
+
+class PublishQueueWorker:
+    # Keeps at most window_size posts per group on VK as postponed posts and
+    # tops the window up from vk_publish_queue as they go out. Every process
+    # may run one; only the Redis lock holder does any work.
+    def __init__(
+        self,
+        *,
+        window_size: int,
+        poll_interval_s: float,
+        max_attempts: int,
+        leader_ttl_s: float,
+        stale_after_s: float,
+    ):
+        self.window_size = window_size
+        self.poll_interval_s = poll_interval_s
+        self.max_attempts = max_attempts
+        self.stale_after_s = stale_after_s
+        self._lock = RedisLeaderLock(get_redis_client(), LEADER_KEY, ttl_ms=int(leader_ttl_s * 1000))
+        self._stopped = asyncio.Event()
+
+    def stop(self) -> None:
+        self._stopped.set()
+
+    async def run(self) -> None:
+        try:
+            while not self._stopped.is_set():
+                try:
+                    if await self._lock.acquire_or_renew():
+                        await self.tick()
+                except Exception:
+                    logger.exception("Publish queue tick failed")
+                try:
+                    await asyncio.wait_for(self._stopped.wait(), timeout=self.poll_interval_s)
+                except asyncio.TimeoutError:
+                    pass
+        finally:
+            try:
+                await self._lock.release()
+            except Exception as exc:
+                logger.warning("Publish queue leader release failed: %s", exc)
+
+    async def tick(self) -> None:
+        now = _utcnow()
+        async with AsyncSessionLocal() as session:
+            # VK publishes postponed posts on its own; once their time has
+            # passed they no longer occupy the window.
+            await session.execute(
+                update(QueuedPost)
+                .where(QueuedPost.status == PUSHED, QueuedPost.publish_at <= now)
+                .values(status=PUBLISHED, updated_at=now)
+            )
+            # A worker that died mid-push leaves its row claimed; without this
+            # the row would hold a window slot forever.
+            res = await session.execute(
+                update(QueuedPost)
+                .where(
+                    QueuedPost.status == PUSHING,
+                    QueuedPost.updated_at < now - dt.timedelta(seconds=self.stale_after_s),
+                )
+                .values(
+                    status=QUEUED,
+                    attempts=QueuedPost.attempts + 1,
+                    last_error="Interrupted while pushing to VK; retried",
+                    updated_at=now,
+                )
+                .returning(QueuedPost.id)
+            )
+            stale_ids = list(res.scalars().all())
+            await session.commit()
+            if stale_ids:
+                logger.warning("Publish queue requeued %d stale pushing rows", len(stale_ids))
+
+            res = await session.execute(select(QueuedPost.group_id).where(QueuedPost.status == QUEUED).distinct())
+            group_ids = list(res.scalars().all())
+
+        tokens: dict[uuid.UUID, str | None] = {}
+        for group_id in group_ids:
+            if self._stopped.is_set():
+                return
+            if not await self._top_up(group_id, tokens):
+                return
+
+    async def _claim(self, session: AsyncSession, group_id: int) -> QueuedPost | None:
+        res = await session.execute(
+            select(func.count())
+            .select_from(QueuedPost)
+            .where(QueuedPost.group_id == group_id, QueuedPost.status.in_((PUSHING, PUSHED)))
+        )
+        if int(res.scalar_one()) >= self.window_size:
+            return None
+
+        res = await session.execute(
+            select(QueuedPost)
+            .where(QueuedPost.group_id == group_id, QueuedPost.status == QUEUED)
+            .order_by(QueuedPost.publish_at.asc(), QueuedPost.id.asc())
+            .limit(1)
+            .with_for_update(skip_locked=True)
+        )
+        row = res.scalars().first()
+        if row is not None:
+            row.status = PUSHING
+            row.updated_at = _utcnow()
+            await session.commit()
+        return row
+
+    async def _access_token(self, user_id: uuid.UUID, tokens: dict[uuid.UUID, str | None]) -> str | None:
+        if user_id not in tokens:
+            token_data = await get_redis_client().hgetall(_token_key(str(user_id), "vk"))
+            tokens[user_id] = decrypt_secret(token_data["access_token"]) if token_data.get("access_token") else None
+        return tokens[user_id]
+
+    async def _top_up(self, group_id: int, tokens: dict[uuid.UUID, str | None]) -> bool:
+        # Claims and pushes one row at a time so an error strands at most the
+        # row in hand. Returns False once the leader lock is lost.
+        async with AsyncSessionLocal() as session:
+            while not self._stopped.is_set():
+                # Renewed per post: a full window at the rate limit, with
+                # retries, can take longer than the lock TTL.
+                if not await self._lock.renew():
+                    return False
+                row = await self._claim(session, group_id)
+                if row is None:
+                    return True
+                pushed = False
+                try:
+                    pushed = await self._push(row, group_id, tokens)
+                finally:
+                    if row.status == PUSHING:
+                        row.status = QUEUED
+                    row.updated_at = _utcnow()
+                    await session.commit()
+                if not pushed:
+                    return True
+        return True
+
+    async def _push(self, row: QueuedPost, group_id: int, tokens: dict[uuid.UUID, str | None]) -> bool:
+        # Returns False when the rest of the group's batch should wait for the
+        # next tick; the caller puts those rows back in the queue.
+        access_token = await self._access_token(row.user_id, tokens)
+        if access_token is None:
+            self._record_failure(row, "VK token is not set for this user")
+            return True
+
+        publish_ts = int(row.publish_at.timestamp())
+        publish_date = publish_ts if publish_ts > time.time() + _MIN_LEAD_S else 0
+
+        scheduler = build_vk_scheduler(access_token, group_id)
+        try:
+            async with scheduler:
+                row.vk_post_id = await scheduler.create_scheduled_post(
+                    row.message,
+                    publish_date=publish_date,
+                    attachments=list(row.attachments or []),
+                    from_group=row.from_group,
+                )
+        except VKAPIError as exc:
+            if exc.error_code == _POSTPONED_LIMIT_ERROR:
+                logger.info("VK postponed limit reached group_id=%s", group_id)
+                return False
+            self._record_failure(row, str(exc))
+            return True
+        except VKCircuitOpenError:
+            return False
+        except VKClientError as exc:
+            self._record_failure(row, str(exc))
+            return True
+
+        row.status = PUSHED if publish_date else PUBLISHED
+        if publish_date:
+            try:
+                await index_post(group_id, row.vk_post_id, publish_date)
+            except Exception as exc:
+                # The post is on VK; the mirror sync rebuilds the index.
+                logger.warning("Schedule index update failed group_id=%s: %s", group_id, exc)
+        return True
+
+    def _record_failure(self, row: QueuedPost, error: str) -> None:
+        row.attempts += 1
+        row.last_error = error
+        row.status = FAILED if row.attempts >= self.max_attempts else QUEUED
+        logger.warning("Publish queue push failed id=%s attempts=%s: %s", row.id, row.attempts, error)
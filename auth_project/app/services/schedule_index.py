@@ -0,0 +1,166 @@
+from __future__ import annotations
+
+import time
+import uuid
+from dataclasses import dataclass
+from typing import Mapping
+
+from app.redis_client import get_redis_client
+
+
+# Posts publish at their slot; anything this far in the past is history.
+_PRUNE_AFTER_S = 86400
+_MAX_SHIFT_STEPS = 1000
+
+# ARGV: ts, spacing, member, shift, dry_run, prune_before, max_steps
+# The member itself never blocks, so moving a post near its old slot works.
+# Returns {1, ts} when the slot (possibly shifted) is free, otherwise
+# {0, blocking_member, blocking_ts}. Each probe is one ZREVRANGEBYSCORE on
+# the open window around ts, so a check costs O(log n) per shift step.
+_CLAIM_SCRIPT = """
+redis.call("ZREMRANGEBYSCORE", KEYS[1], "-inf", "(" .. ARGV[6])
+local ts = tonumber(ARGV[1])
+local spacing = tonumber(ARGV[2])
+for _ = 1, tonumber(ARGV[7]) do
+    local blocker = nil
+    if spacing > 0 then
+        local hits = redis.call(
+            "ZREVRANGEBYSCORE", KEYS[1], "(" .. (ts + spacing), "(" .. (ts - spacing),
+            "WITHSCORES", "LIMIT", 0, 2
+        )
+        for i = 1, #hits, 2 do
+            if hits[i] ~= ARGV[3] then
+                blocker = {hits[i], hits[i + 1]}
+                break
+            end
+        end
+    end
+    if blocker == nil then
+        if ARGV[5] == "0" then
+            redis.call("ZADD", KEYS[1], ts, ARGV[3])
+        end
+        return {1, ts}
+    end
+    if ARGV[4] == "0" then
+        return {0, blocker[1], blocker[2]}
+    end
+    ts = tonumber(blocker[2]) + spacing
+end
+return {0, "", ts}
+"""
+
+_PENDING_PREFIX = "pending:"
+
+
+def _index_key(group_id: int) -> str:
+    return f"vk:schedule:{group_id}"
+
+
+@dataclass(frozen=True)
+class SlotClaim:
+    ok: bool
+    publish_date: int
+    member: str = ""
+    conflict_post_id: int | None = None
+
+
+def _conflict_post_id(member: str) -> int | None:
+    return int(member) if member.isdigit() else None
+
+
+async def claim_slot(
+    group_id: int,
+    publish_date: int,
+    *,
+    spacing_s: int,
+    shift: bool,
+    post_id: int | None = None,
+    dry_run: bool = False,
+) -> SlotClaim:
+    # Checks publish_date against posts already in the index and, unless
+    # dry_run, reserves it in the same round trip so two concurrent creates
+    # cannot take one slot. New posts reserve under a pending member that
+    # confirm_slot() swaps for the real post id.
+    if spacing_s <= 0:
+        # Spacing is disabled: every slot is free, so there is nothing to
+        # reserve. New posts are still indexed by confirm_slot() and an
+        # edited post moves right away, which keeps the calendar current.
+        if post_id is None:
+            return SlotClaim(ok=True, publish_date=publish_date)
+        if not dry_run:
+            await index_post(group_id, post_id, publish_date)
+        return SlotClaim(ok=True, publish_date=publish_date, member=str(post_id))
+
+    redis = get_redis_client()
+    member = str(post_id) if post_id is not None else f"{_PENDING_PREFIX}{uuid.uuid4().hex}"
+    res = await redis.eval(
+        _CLAIM_SCRIPT,
+        1,
+        _index_key(group_id),
+        publish_date,
+        spacing_s,
+        member,
+        1 if shift else 0,
+        1 if dry_run else 0,
+        int(time.time()) - _PRUNE_AFTER_S,
+        _MAX_SHIFT_STEPS,
+    )
+    if int(res[0]) == 1:
+        return SlotClaim(ok=True, publish_date=int(res[1]), member=member)
+    return SlotClaim(ok=False, publish_date=int(float(res[2])), conflict_post_id=_conflict_post_id(str(res[1])))
+
+
+async def confirm_slot(group_id: int, claim: SlotClaim, post_id: int) -> None:
+    key = _index_key(group_id)
+    async with get_redis_client().pipeline(transaction=True) as pipe:
+        if claim.member:
+            pipe.zrem(key, claim.member)
+        pipe.zadd(key, {str(post_id): claim.publish_date})
+        await pipe.execute()
+
+
+async def release_slot(group_id: int, claim: SlotClaim) -> None:
+    # Claims made with spacing disabled reserved nothing.
+    if claim.member:
+        await get_redis_client().zrem(_index_key(group_id), claim.member)
+
+
+async def index_post(group_id: int, post_id: int, publish_date: int) -> None:
+    await get_redis_client().zadd(_index_key(group_id), {str(post_id): publish_date})
+
+
+async def unindex_post(group_id: int, post_id: int) -> None:
+    await get_redis_client().zrem(_index_key(group_id), str(post_id))
+
+
+async def post_slot(group_id: int, post_id: int) -> int | None:
+    score = await get_redis_client().zscore(_index_key(group_id), str(post_id))
+    return int(score) if score is not None else None
+
+
+async def range_posts(group_id: int, start: int, end: int, *, limit: int) -> list[tuple[int, int]]:
+    hits = await get_redis_client().zrangebyscore(
+        _index_key(group_id),
+        start,
+        end,
+        start=0,
+        num=limit,
+        withscores=True,
+    )
+    # Pending reservations are not posts yet.
+    return [(int(m), int(score)) for m, score in hits if not m.startswith(_PENDING_PREFIX)]
+
+
+async def replace_index(group_id: int, slots: Mapping[int, int]) -> None:
+    # Makes the index match a full listing from VK, keeping reservations of
+    # creates that are still in flight.
+    redis = get_redis_client()
+    key = _index_key(group_id)
+    current = await redis.zrange(key, 0, -1)
+    stale = [m for m in current if not m.startswith(_PENDING_PREFIX) and int(m) not in slots]
+    async with redis.pipeline(transaction=True) as pipe:
+        if stale:
+            pipe.zrem(key, *stale)
+        if slots:
+            pipe.zadd(key, {str(post_id): ts for post_id, ts in slots.items()})
+        await pipe.execute()
@@ -0,0 +1,172 @@
+from __future__ import annotations
+
+import logging
+
+from vkposting.cache import RedisResponseCache
+from vkposting.hooks import CompositeHooks, VKHooks, vk_trace_config
+from vkposting.image_prep import ImagePreprocessor
+from vkposting.loader import BatchLoaderRegistry
+from vkposting.models import Post
+from vkposting.rate_limit import VKRateLimiter
+from vkposting.retry import CircuitBreakerRegistry, RetryPolicy
+from vkposting.session_pool import VKSessionPool
+from vkposting.singleflight import SingleFlight
+from vkposting.wall_scheduler import VKWallScheduler
+
+from app.core.config import settings
+from app.core.timing import TimingVKHooks
+from app.metrics import PrometheusVKHooks
+from app.redis_client import get_redis_binary_client
+
+logger = logging.getLogger(__name__)
+
+
+_vk_session_pool: VKSessionPool | None = None
+_vk_rate_limiter: VKRateLimiter | None = None
+_vk_response_cache: RedisResponseCache | None = None
+_vk_single_flight: SingleFlight | None = None
+_vk_post_loaders: BatchLoaderRegistry[int, Post] | None = None
+_vk_retry_policy: RetryPolicy | None = None
+_vk_circuit_breakers: CircuitBreakerRegistry | None = None
+_vk_hooks: VKHooks | None = None
+_vk_image_preprocessor: ImagePreprocessor | None = None
+
+
+def get_vk_session_pool() -> VKSessionPool:
+    global _vk_session_pool
+    if _vk_session_pool is None:
+        _vk_session_pool = VKSessionPool(
+            limit=settings.vk_http_pool_limit,
+            limit_per_host=settings.vk_http_pool_limit_per_host,
+            ttl_dns_cache_s=settings.vk_http_dns_cache_ttl_s,
+            keepalive_timeout_s=settings.vk_http_keepalive_timeout_s,
+            # Connection and DNS events feed any hooks: metrics and Server-Timing.
+            trace_configs=[vk_trace_config()] if get_vk_hooks() is not None else (),
+        )
+    return _vk_session_pool
+
+
+async def close_vk_session_pool() -> None:
+    global _vk_session_pool
+    if _vk_session_pool is not None:
+        await _vk_session_pool.close()
+        _vk_session_pool = None
+
+
+def get_vk_rate_limiter() -> VKRateLimiter:
+    global _vk_rate_limiter
+    if _vk_rate_limiter is None:
+        _vk_rate_limiter = VKRateLimiter(
+            settings.vk_rate_limit_rps,
+            min_rate=settings.vk_rate_limit_min_rps,
+        )
+    return _vk_rate_limiter
+
+
+def get_vk_response_cache() -> RedisResponseCache | None:
+    # wall.get/wall.getById results shared by all workers, keyed by group.
+    global _vk_response_cache
+    if settings.vk_shared_cache_ttl_s <= 0:
+        return None
+    if _vk_response_cache is None:
+        _vk_response_cache = RedisResponseCache(
+            get_redis_binary_client(),
+            settings.vk_shared_cache_ttl_s,
+            compress_min_bytes=settings.vk_shared_cache_compress_min_bytes,
+        )
+    return _vk_response_cache
+
+
+def get_vk_single_flight() -> SingleFlight:
+    global _vk_single_flight
+    if _vk_single_flight is None:
+        _vk_single_flight = SingleFlight()
+    return _vk_single_flight
+
+
+def get_vk_post_loaders() -> BatchLoaderRegistry[int, Post]:
+    # get_post_by_id batching shared by every request in this worker.
+    global _vk_post_loaders
+    if _vk_post_loaders is None:
+        _vk_post_loaders = BatchLoaderRegistry(window_s=settings.vk_get_by_id_batch_window_s)
+    return _vk_post_loaders
+
+
+def get_vk_retry_policy() -> RetryPolicy:
+    global _vk_retry_policy
+    if _vk_retry_policy is None:
+        _vk_retry_policy = RetryPolicy(
+            max_attempts=settings.vk_retry_max_attempts,
+            base_delay_s=settings.vk_retry_base_delay_s,
+            max_delay_s=settings.vk_retry_max_delay_s,
+            deadline_s=settings.vk_retry_deadline_s or None,
+        )
+    return _vk_retry_policy
+
+
+def get_vk_circuit_breakers() -> CircuitBreakerRegistry:
+    global _vk_circuit_breakers
+    if _vk_circuit_breakers is None:
+        _vk_circuit_breakers = CircuitBreakerRegistry(
+            failure_threshold=settings.vk_circuit_failure_threshold,
+            reset_timeout_s=settings.vk_circuit_reset_timeout_s,
+        )
+    return _vk_circuit_breakers
+
+
+def get_vk_hooks() -> VKHooks | None:
+    global _vk_hooks
+    if _vk_hooks is None:
+        hooks: list[VKHooks] = []
+        if settings.metrics_enabled:
+            hooks.append(PrometheusVKHooks())
+        if settings.server_timing_enabled:
+            hooks.append(TimingVKHooks())
+        if len(hooks) == 1:
+            _vk_hooks = hooks[0]
+        elif hooks:
+            _vk_hooks = CompositeHooks(*hooks)
+    return _vk_hooks
+
+
+def get_vk_image_preprocessor() -> ImagePreprocessor | None:
+    global _vk_image_preprocessor
+    if not settings.vk_image_prep_enabled:
+        return None
+    if _vk_image_preprocessor is None:
+        _vk_image_preprocessor = ImagePreprocessor(
+            quality=settings.vk_image_prep_quality,
+            max_workers=settings.vk_image_prep_workers or None,
+            cache_dir=settings.vk_image_prep_cache_dir or None,
+            max_cache_bytes=settings.vk_image_prep_cache_max_mb * 1024 * 1024,
+        )
+    return _vk_image_preprocessor
+
+
+def close_vk_image_preprocessor() -> None:
+    global _vk_image_preprocessor
+    if _vk_image_preprocessor is not None:
+        _vk_image_preprocessor.close()
+        _vk_image_preprocessor = None
+
+
+def build_vk_scheduler(access_token: str, group_id: int, *, cached: bool = True) -> VKWallScheduler:
+    # Shared pool, limiter, caches and hooks; the scheduler itself is cheap.
+    # cached=False reads straight from VK, for reads that must be
+    # authoritative or must prove this token's access.
+    return VKWallScheduler(
+        access_token=access_token,
+        group_id=group_id,
+        api_version=settings.vk_api_version,
+        cache_ttl_s=float(settings.vk_cache_ttl_s) if cached else 0.0,
+        session_pool=get_vk_session_pool(),
+        rate_limiter=get_vk_rate_limiter(),
+        shared_cache=get_vk_response_cache() if cached else None,
+        single_flight=get_vk_single_flight() if cached else None,
+        post_loaders=get_vk_post_loaders() if cached else None,
+        retry_policy=get_vk_retry_policy(),
+        circuit_breakers=get_vk_circuit_breakers(),
+        api_base_url=settings.vk_api_base_url,
+        hooks=get_vk_hooks(),
+        image_preprocessor=get_vk_image_preprocessor(),
+    )
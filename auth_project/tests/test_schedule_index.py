@@ -0,0 +1,153 @@
+from __future__ import annotations
+
+import asyncio
+import time
+
+import pytest
+
+fakeredis = pytest.importorskip("fakeredis.aioredis")
+pytest.importorskip("lupa")
+
+import app.redis_client as redis_client  # noqa: E402
+from app.services.schedule_index import (  # noqa: E402
+    claim_slot,
+    confirm_slot,
+    index_post,
+    range_posts,
+    release_slot,
+)
+
+GROUP = 1
+SPACING = 600
+
+
+@pytest.fixture
+def redis(monkeypatch):
+    client = fakeredis.FakeRedis(decode_responses=True)
+    monkeypatch.setattr(redis_client, "_redis_client", client)
+    return client
+
+
+def _at() -> int:
+    # Far enough ahead that the claim script never prunes it as history.
+    return int(time.time()) + 86400
+
+
+def test_free_slot_is_reserved_then_confirmed(redis):
+    ts = _at()
+
+    async def run():
+        claim = await claim_slot(GROUP, ts, spacing_s=SPACING, shift=False)
+        await confirm_slot(GROUP, claim, 42)
+        return claim, await range_posts(GROUP, ts, ts, limit=10)
+
+    claim, posts = asyncio.run(run())
+    assert claim.ok and claim.publish_date == ts
+    assert posts == [(42, ts)]
+
+
+def test_close_slot_is_rejected(redis):
+    ts = _at()
+
+    async def run():
+        await index_post(GROUP, 42, ts)
+        return await claim_slot(GROUP, ts + SPACING - 1, spacing_s=SPACING, shift=False)
+
+    claim = asyncio.run(run())
+    assert not claim.ok
+    assert claim.conflict_post_id == 42
+    assert claim.publish_date == ts
+
+
+def test_slot_exactly_spacing_away_is_free(redis):
+    ts = _at()
+
+    async def run():
+        await index_post(GROUP, 42, ts)
+        return await claim_slot(GROUP, ts + SPACING, spacing_s=SPACING, shift=False)
+
+    assert asyncio.run(run()).ok
+
+
+def test_shift_moves_past_every_blocker(redis):
+    ts = _at()
+
+    async def run():
+        await index_post(GROUP, 1, ts)
+        await index_post(GROUP, 2, ts + SPACING)
+        return await claim_slot(GROUP, ts + 10, spacing_s=SPACING, shift=True)
+
+    claim = asyncio.run(run())
+    assert claim.ok
+    assert claim.publish_date == ts + 2 * SPACING
+
+
+def test_post_does_not_block_its_own_move(redis):
+    ts = _at()
+
+    async def run():
+        await index_post(GROUP, 42, ts)
+        claim = await claim_slot(GROUP, ts + 60, spacing_s=SPACING, shift=False, post_id=42)
+        return claim, await range_posts(GROUP, ts, ts + 60, limit=10)
+
+    claim, posts = asyncio.run(run())
+    assert claim.ok
+    assert posts == [(42, ts + 60)]
+
+
+def test_dry_run_reserves_nothing(redis):
+    ts = _at()
+
+    async def run():
+        await claim_slot(GROUP, ts, spacing_s=SPACING, shift=False, dry_run=True)
+        return await claim_slot(GROUP, ts, spacing_s=SPACING, shift=False)
+
+    assert asyncio.run(run()).ok
+
+
+def test_concurrent_claims_cannot_share_a_slot(redis):
+    ts = _at()
+
+    async def run():
+        return await asyncio.gather(*(claim_slot(GROUP, ts, spacing_s=SPACING, shift=False) for _ in range(5)))
+
+    claims = asyncio.run(run())
+    assert sum(c.ok for c in claims) == 1
+
+
+def test_released_reservation_frees_the_slot(redis):
+    ts = _at()
+
+    async def run():
+        claim = await claim_slot(GROUP, ts, spacing_s=SPACING, shift=False)
+        await release_slot(GROUP, claim)
+        return await claim_slot(GROUP, ts, spacing_s=SPACING, shift=False)
+
+    assert asyncio.run(run()).ok
+
+
+def test_zero_spacing_skips_the_claim_script(redis, monkeypatch):
+    ts = _at()
+    evals = []
+    monkeypatch.setattr(redis, "eval", lambda *a, **k: evals.append(a))
+
+    async def run():
+        await index_post(GROUP, 1, ts)
+        claim = await claim_slot(GROUP, ts, spacing_s=0, shift=False)
+        await confirm_slot(GROUP, claim, 2)
+        return claim, await range_posts(GROUP, ts, ts, limit=10)
+
+    claim, posts = asyncio.run(run())
+    assert claim.ok
+    assert sorted(posts) == [(1, ts), (2, ts)]
+    assert evals == []
+
+
+def test_pending_reservations_are_not_listed(redis):
+    ts = _at()
+
+    async def run():
+        await claim_slot(GROUP, ts, spacing_s=SPACING, shift=False)
+        return await range_posts(GROUP, ts, ts, limit=10)
+
+    assert asyncio.run(run()) == []
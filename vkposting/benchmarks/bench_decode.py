@@ -0,0 +1,89 @@
+import argparse
+import json
+import time
+from typing import Any, Callable
+
+from vkposting import _json
+from vkposting.models import POST_LIST_ADAPTER, Post
+
+
+_PUBLIC_FIELDS = {"id", "owner_id", "from_id", "date", "text", "attachments", "postponed_id"}
+
+
+def _photo(i: int) -> dict[str, Any]:
+    return {
+        "type": "photo",
+        "photo": {
+            "id": 457239000 + i,
+            "owner_id": -1,
+            "album_id": -7,
+            "date": 1700000000 + i,
+            "sizes": [
+                {"type": t, "url": f"https://sun9-1.userapi.com/impg/{i}/{t}.jpg", "width": w, "height": w * 3 // 4}
+                for t, w in (("s", 75), ("m", 130), ("x", 604), ("y", 807), ("z", 1280), ("w", 2560))
+            ],
+            "text": "",
+        },
+    }
+
+
+def _wall_get_body(count: int, attachments: int) -> bytes:
+    items = [
+        {
+            "id": 1000 + i,
+            "owner_id": -1,
+            "from_id": -1,
+            "date": 1700000000 + i * 60,
+            "post_type": "postpone",
+            "text": "Scheduled post text " * 20,
+            "attachments": [_photo(i * attachments + j) for j in range(attachments)],
+            "postponed_id": 1000 + i,
+            "comments": {"count": 0, "can_post": 1},
+            "likes": {"count": 0, "user_likes": 0, "can_like": 1},
+        }
+        for i in range(count)
+    ]
+    return json.dumps({"response": {"count": count, "items": items}}, ensure_ascii=False).encode("utf-8")
+
+
+def _baseline(body: bytes) -> bytes:
+    items = json.loads(body)["response"]["items"]
+    posts = [Post.model_validate(x) for x in items]
+    public = [Post.model_validate(p.model_dump()).model_dump(include=_PUBLIC_FIELDS) for p in posts]
+    return json.dumps({"items": public}).encode("utf-8")
+
+
+def _fast(body: bytes) -> bytes:
+    items = _json.loads(body)["response"]["items"]
+    posts = POST_LIST_ADAPTER.validate_python(items)
+    return b'{"items":' + POST_LIST_ADAPTER.dump_json(posts, include={"__all__": _PUBLIC_FIELDS}) + b"}"
+
+
+def _bench(fn: Callable[[bytes], bytes], body: bytes, rounds: int) -> float:
+    fn(body)
+    started = time.perf_counter()
+    for _ in range(rounds):
+        fn(body)
+    return (time.perf_counter() - started) / rounds
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Compare wall.get decode/validate/serialize paths")
+    parser.add_argument("--posts", type=int, default=100)
+    parser.add_argument("--attachments", type=int, default=4)
+    parser.add_argument("--rounds", type=int, default=200)
+    args = parser.parse_args()
+
+    body = _wall_get_body(args.posts, args.attachments)
+    assert json.loads(_baseline(body)) == json.loads(_fast(body))
+
+    backend = "orjson" if _json.orjson is not None else "json"
+    print(f"payload: {len(body) / 1024:.1f} KiB, {args.posts} posts x {args.attachments} attachments ({backend})")
+    base = _bench(_baseline, body, args.rounds)
+    fast = _bench(_fast, body, args.rounds)
+    print(f"baseline: {base * 1e3:8.3f} ms/page")
+    print(f"fast:     {fast * 1e3:8.3f} ms/page  ({base / fast:.2f}x)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,201 @@
+import argparse
+import asyncio
+import itertools
+import json
+import logging
+import math
+import os
+import tempfile
+import time
+from dataclasses import asdict, dataclass
+from typing import Any, Awaitable, Callable
+
+from fake_vk_server import FakeVKServer, add_server_args, config_from_args, start_in_thread
+
+from vkposting import RetryPolicy, VKClientError, VKRateLimiter, VKSessionPool, VKWallScheduler
+
+
+Operation = Callable[[VKWallScheduler, int], Awaitable[Any]]
+
+
+@dataclass
+class Result:
+    scenario: str
+    concurrency: int
+    ops: int
+    errors: int
+    seconds: float
+    ops_per_sec: float
+    p50_ms: float
+    p95_ms: float
+    p99_ms: float
+
+
+def _percentile(sorted_values: list[float], q: float) -> float:
+    if not sorted_values:
+        return math.nan
+    rank = max(0, math.ceil(q / 100 * len(sorted_values)) - 1)
+    return sorted_values[rank]
+
+
+def _scenarios(photo_path: str, post_ids: list[int]) -> dict[str, Operation]:
+    created = itertools.count()
+
+    async def wall_get(s: VKWallScheduler, i: int) -> Any:
+        return await s.get_scheduled_posts(count=100, offset=(i * 100) % max(len(post_ids), 1))
+
+    async def get_by_id(s: VKWallScheduler, i: int) -> Any:
+        return await s.get_post_by_id(post_ids[i % len(post_ids)])
+
+    async def create(s: VKWallScheduler, i: int) -> Any:
+        return await s.create_scheduled_post(f"bench {next(created)}", publish_date=int(time.time()) + 86400)
+
+    async def edit(s: VKWallScheduler, i: int) -> Any:
+        return await s.edit_scheduled_post(post_ids[i % len(post_ids)], message=f"edited {i}")
+
+    async def create_with_photo(s: VKWallScheduler, i: int) -> Any:
+        return await s.create_scheduled_post(
+            f"bench photo {next(created)}",
+            publish_date=int(time.time()) + 86400,
+            photo_paths=[photo_path],
+        )
+
+    return {
+        "wall.get": wall_get,
+        "get_post_by_id": get_by_id,
+        "create": create,
+        "edit": edit,
+        "create_with_photo": create_with_photo,
+    }
+
+
+async def _run_scenario(
+    name: str,
+    op: Operation,
+    *,
+    concurrency: int,
+    ops: int,
+    make_scheduler: Callable[[], VKWallScheduler],
+) -> Result:
+    latencies: list[float] = []
+    errors = 0
+    counter = itertools.count()
+    scheduler = make_scheduler()
+
+    async def worker() -> None:
+        nonlocal errors
+        while True:
+            i = next(counter)
+            if i >= ops:
+                return
+            started = time.perf_counter()
+            try:
+                await op(scheduler, i)
+            except VKClientError:
+                errors += 1
+                continue
+            latencies.append(time.perf_counter() - started)
+
+    async with scheduler:
+        started = time.perf_counter()
+        await asyncio.gather(*(worker() for _ in range(concurrency)))
+        elapsed = time.perf_counter() - started
+
+    latencies.sort()
+    return Result(
+        scenario=name,
+        concurrency=concurrency,
+        ops=ops,
+        errors=errors,
+        seconds=elapsed,
+        ops_per_sec=ops / elapsed if elapsed > 0 else math.inf,
+        p50_ms=_percentile(latencies, 50) * 1000,
+        p95_ms=_percentile(latencies, 95) * 1000,
+        p99_ms=_percentile(latencies, 99) * 1000,
+    )
+
+
+async def _run(args: argparse.Namespace, api_base_url: str, post_ids: list[int], photo_path: str) -> list[Result]:
+    pool = VKSessionPool(limit=args.pool_limit, limit_per_host=args.pool_limit)
+    limiter = VKRateLimiter(args.rps) if args.rps > 0 else None
+    retry_policy = RetryPolicy(max_attempts=args.max_attempts, base_delay_s=0.01, max_delay_s=0.1)
+
+    def make_scheduler() -> VKWallScheduler:
+        return VKWallScheduler(
+            access_token="bench-token",
+            group_id=args.group_id,
+            session_pool=pool,
+            rate_limiter=limiter,
+            retry_policy=retry_policy,
+            api_base_url=api_base_url,
+        )
+
+    scenarios = _scenarios(photo_path, post_ids)
+    selected = args.scenarios or list(scenarios)
+    results = []
+    try:
+        for name in selected:
+            for concurrency in args.concurrency:
+                result = await _run_scenario(
+                    name,
+                    scenarios[name],
+                    concurrency=concurrency,
+                    ops=args.ops,
+                    make_scheduler=make_scheduler,
+                )
+                results.append(result)
+                if not args.json:
+                    print(
+                        f"{result.scenario:<18} c={result.concurrency:<4} {result.ops_per_sec:9.1f} ops/s  "
+                        f"p50={result.p50_ms:8.2f}ms p95={result.p95_ms:8.2f}ms p99={result.p99_ms:8.2f}ms  "
+                        f"errors={result.errors}"
+                    )
+    finally:
+        await pool.close()
+    return results
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Benchmark VKWallScheduler against the local fake VK API")
+    parser.add_argument("--server-url", default="", help="Use an already running fake server (its /method URL)")
+    parser.add_argument("--scenarios", nargs="+", default=None)
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 8, 32, 128])
+    parser.add_argument("--ops", type=int, default=500, help="Operations per scenario and concurrency level")
+    parser.add_argument("--posts", type=int, default=300, help="Postponed posts to seed")
+    parser.add_argument("--photo-kb", type=int, default=256)
+    parser.add_argument("--group-id", type=int, default=1)
+    parser.add_argument("--rps", type=float, default=0.0, help="Client-side rate limit; 0 disables it")
+    parser.add_argument("--max-attempts", type=int, default=4)
+    parser.add_argument("--pool-limit", type=int, default=100)
+    parser.add_argument("--json", action="store_true", help="Print results as JSON lines")
+    add_server_args(parser)
+    args = parser.parse_args()
+
+    # Injected errors are expected; keep per-attempt warnings out of the report.
+    logging.getLogger("vkposting").setLevel(logging.ERROR)
+
+    stop_server = None
+    post_ids = list(range(1, args.posts + 1))
+    api_base_url = args.server_url
+    if not api_base_url:
+        server = FakeVKServer(config_from_args(args), group_id=args.group_id, posts=args.posts)
+        stop_server = start_in_thread(server)
+        api_base_url = server.api_base_url
+
+    fd, photo_path = tempfile.mkstemp(suffix=".jpg")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(os.urandom(args.photo_kb * 1024))
+        results = asyncio.run(_run(args, api_base_url, post_ids, photo_path))
+    finally:
+        os.unlink(photo_path)
+        if stop_server is not None:
+            stop_server()
+
+    if args.json:
+        for result in results:
+            print(json.dumps(asdict(result)))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,424 @@
+import argparse
+import asyncio
+import json
+import random
+import re
+import threading
+import time
+from collections import Counter
+from dataclasses import dataclass, field
+from typing import Any, Callable
+
+from aiohttp import web
+
+
+_ERROR_MESSAGES = {
+    3: "Unknown method passed",
+    6: "Too many requests per second",
+    9: "Flood control",
+    10: "Internal server error",
+    14: "Captcha needed",
+    100: "One of the parameters specified was missing or invalid",
+}
+
+_READ_CHUNK = 64 * 1024
+
+_EXECUTE_CALL_RE = re.compile(r"API\.([\w.]+)\(")
+
+
+@dataclass
+class FakeVKConfig:
+    # Delay added to every API method call, in seconds.
+    latency_s: float = 0.0
+    latency_jitter_s: float = 0.0
+    # Share of API calls answered with one of error_codes instead of a result.
+    error_rate: float = 0.0
+    error_codes: tuple[int, ...] = (6, 9, 10, 14)
+    # Upload throughput per request in bytes/sec; None means unthrottled.
+    upload_bandwidth_bps: float | None = None
+    # Share of chunked video uploads of which only the first half of the
+    # chunk is kept, as if the connection broke mid-chunk.
+    upload_truncate_rate: float = 0.0
+    seed: int | None = None
+
+
+@dataclass
+class _ChunkedUpload:
+    total: int
+    received: int = 0
+
+
+@dataclass
+class FakeVKState:
+    group_id: int = 1
+    posts: dict[int, dict[str, Any]] = field(default_factory=dict)
+    next_post_id: int = 1
+    next_media_id: int = 1
+    calls: Counter = field(default_factory=Counter)
+    errors: Counter = field(default_factory=Counter)
+    uploaded_bytes: int = 0
+
+    @property
+    def owner_id(self) -> int:
+        return -abs(self.group_id)
+
+    def media_id(self) -> int:
+        media_id = self.next_media_id
+        self.next_media_id += 1
+        return media_id
+
+    def add_post(self, message: str, publish_date: int, attachments: list[dict[str, Any]]) -> int:
+        post_id = self.next_post_id
+        self.next_post_id += 1
+        self.posts[post_id] = {
+            "id": post_id,
+            "owner_id": self.owner_id,
+            "from_id": self.owner_id,
+            "date": publish_date or int(time.time()),
+            "post_type": "postpone",
+            "text": message,
+            "attachments": attachments,
+            "postponed_id": post_id,
+        }
+        return post_id
+
+
+class _VKMethodError(Exception):
+    def __init__(self, code: int):
+        super().__init__(code)
+        self.code = code
+
+
+def _error_payload(code: int, method: str) -> dict[str, Any]:
+    error: dict[str, Any] = {
+        "error_code": code,
+        "error_msg": _ERROR_MESSAGES.get(code, "Unknown error"),
+        "request_params": [{"key": "method", "value": method}],
+    }
+    if code == 14:
+        error["captcha_sid"] = "1"
+        error["captcha_img"] = "https://api.vk.com/captcha.php?sid=1"
+    return {"error": error}
+
+
+def _parse_attachments(raw: str) -> list[dict[str, Any]]:
+    attachments = []
+    for item in filter(None, (x.strip() for x in raw.split(","))):
+        match = re.fullmatch(r"([a-z]+)(-?\d+)_(\d+)(?:_\w+)?", item)
+        if match is None:
+            raise _VKMethodError(100)
+        kind, owner_id, media_id = match.group(1), int(match.group(2)), int(match.group(3))
+        attachments.append({"type": kind, kind: {"id": media_id, "owner_id": owner_id}})
+    return attachments
+
+
+def _parse_execute_code(code: str) -> list[tuple[str, dict[str, Any]]]:
+    # Understands the "return [API.m({...}),...];" shape built by
+    # vkposting.batch.build_execute_code, not general VKScript.
+    decoder = json.JSONDecoder()
+    calls = []
+    pos = 0
+    while True:
+        match = _EXECUTE_CALL_RE.search(code, pos)
+        if match is None:
+            return calls
+        params, end = decoder.raw_decode(code, match.end())
+        calls.append((match.group(1), {k: str(v) for k, v in params.items()}))
+        pos = end
+
+
+class FakeVKServer:
+    def __init__(self, config: FakeVKConfig | None = None, *, group_id: int = 1, posts: int = 0):
+        self.config = config or FakeVKConfig()
+        self.state = FakeVKState(group_id=group_id)
+        self._random = random.Random(self.config.seed)
+        self._chunked: dict[str, _ChunkedUpload] = {}
+        self._runner: web.AppRunner | None = None
+        self.base_url = ""
+        self._methods: dict[str, Callable[[dict[str, str]], Any]] = {
+            "wall.get": self._wall_get,
+            "wall.getById": self._wall_get_by_id,
+            "wall.post": self._wall_post,
+            "wall.edit": self._wall_edit,
+            "wall.delete": self._wall_delete,
+            "photos.getWallUploadServer": lambda p: {"upload_url": f"{self.base_url}/upload/photo", "album_id": -14},
+            "photos.saveWallPhoto": self._photos_save,
+            "docs.getWallUploadServer": lambda p: {"upload_url": f"{self.base_url}/upload/doc"},
+            "docs.save": self._docs_save,
+            "video.save": self._video_save,
+        }
+        for i in range(posts):
+            self.state.add_post(f"Seeded post {i} " * 10, int(time.time()) + 3600 + i * 60, [])
+
+        self.app = web.Application(client_max_size=1024**3)
+        self.app.router.add_post("/method/{method}", self._handle_method)
+        self.app.router.add_post("/upload/photo", self._handle_photo_upload)
+        self.app.router.add_post("/upload/doc", self._handle_doc_upload)
+        self.app.router.add_post("/upload/video", self._handle_video_upload)
+
+    @property
+    def api_base_url(self) -> str:
+        return f"{self.base_url}/method"
+
+    async def start(self, host: str = "127.0.0.1", port: int = 0) -> str:
+        self._runner = web.AppRunner(self.app, access_log=None)
+        await self._runner.setup()
+        site = web.TCPSite(self._runner, host, port)
+        await site.start()
+        bound_port = self._runner.addresses[0][1]
+        self.base_url = f"http://{host}:{bound_port}"
+        return self.api_base_url
+
+    async def stop(self) -> None:
+        if self._runner is not None:
+            await self._runner.cleanup()
+            self._runner = None
+
+    async def __aenter__(self) -> "FakeVKServer":
+        await self.start()
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb) -> None:
+        await self.stop()
+
+    async def _handle_method(self, request: web.Request) -> web.Response:
+        method = request.match_info["method"]
+        params = {k: str(v) for k, v in (await request.post()).items()}
+        self.state.calls[method] += 1
+
+        cfg = self.config
+        delay = cfg.latency_s + (self._random.uniform(0, cfg.latency_jitter_s) if cfg.latency_jitter_s else 0.0)
+        if delay > 0:
+            await asyncio.sleep(delay)
+        if cfg.error_rate and cfg.error_codes and self._random.random() < cfg.error_rate:
+            code = self._random.choice(cfg.error_codes)
+            self.state.errors[code] += 1
+            return web.json_response(_error_payload(code, method))
+
+        if method == "execute":
+            return web.json_response(self._execute(params.get("code", "")))
+        handler = self._methods.get(method)
+        if handler is None:
+            return web.json_response(_error_payload(3, method))
+        try:
+            return web.json_response({"response": handler(params)})
+        except _VKMethodError as e:
+            return web.json_response(_error_payload(e.code, method))
+
+    def _execute(self, code: str) -> dict[str, Any]:
+        results: list[Any] = []
+        errors: list[dict[str, Any]] = []
+        for method, params in _parse_execute_code(code):
+            handler = self._methods.get(method)
+            try:
+                if handler is None:
+                    raise _VKMethodError(3)
+                results.append(handler(params))
+            except _VKMethodError as e:
+                results.append(False)
+                errors.append({"method": method, **_error_payload(e.code, method)["error"]})
+        payload: dict[str, Any] = {"response": results}
+        if errors:
+            payload["execute_errors"] = errors
+        return payload
+
+    def _wall_get(self, params: dict[str, str]) -> dict[str, Any]:
+        count = int(params.get("count", 20))
+        offset = int(params.get("offset", 0))
+        posts = sorted(self.state.posts.values(), key=lambda p: p["date"])
+        return {"count": len(posts), "items": posts[offset : offset + count]}
+
+    def _wall_get_by_id(self, params: dict[str, str]) -> dict[str, Any]:
+        items = []
+        for ref in filter(None, params.get("posts", "").split(",")):
+            _, _, post_id = ref.partition("_")
+            post = self.state.posts.get(int(post_id))
+            if post is not None:
+                items.append(post)
+        return {"items": items}
+
+    def _wall_post(self, params: dict[str, str]) -> dict[str, Any]:
+        attachments = _parse_attachments(params.get("attachments", ""))
+        post_id = self.state.add_post(params.get("message", ""), int(params.get("publish_date", 0)), attachments)
+        return {"post_id": post_id}
+
+    def _wall_edit(self, params: dict[str, str]) -> int:
+        post = self.state.posts.get(int(params.get("post_id", 0)))
+        if post is None:
+            raise _VKMethodError(100)
+        if "message" in params:
+            post["text"] = params["message"]
+        if "publish_date" in params:
+            post["date"] = int(params["publish_date"])
+        if "attachments" in params:
+            post["attachments"] = _parse_attachments(params["attachments"])
+        return 1
+
+    def _wall_delete(self, params: dict[str, str]) -> int:
+        if self.state.posts.pop(int(params.get("post_id", 0)), None) is None:
+            raise _VKMethodError(100)
+        return 1
+
+    def _photos_save(self, params: dict[str, str]) -> list[dict[str, Any]]:
+        try:
+            photos = json.loads(params.get("photo", ""))
+        except ValueError:
+            raise _VKMethodError(100)
+        return [
+            {"id": self.state.media_id(), "owner_id": self.state.owner_id, "access_key": "k"}
+            for _ in photos
+        ]
+
+    def _docs_save(self, params: dict[str, str]) -> dict[str, Any]:
+        if not params.get("file"):
+            raise _VKMethodError(100)
+        return {"type": "doc", "doc": {"id": self.state.media_id(), "owner_id": self.state.owner_id}}
+
+    def _video_save(self, params: dict[str, str]) -> dict[str, Any]:
+        video_id = self.state.media_id()
+        return {
+            "upload_url": f"{self.base_url}/upload/video?video_id={video_id}",
+            "video_id": video_id,
+            "owner_id": self.state.owner_id,
+            "access_key": "k",
+        }
+
+    async def _throttle(self, nbytes: int) -> None:
+        self.state.uploaded_bytes += nbytes
+        bps = self.config.upload_bandwidth_bps
+        if bps:
+            await asyncio.sleep(nbytes / bps)
+
+    async def _read_multipart(self, request: web.Request) -> list[tuple[str, int]]:
+        files = []
+        reader = await request.multipart()
+        async for part in reader:
+            size = 0
+            while True:
+                chunk = await part.read_chunk(_READ_CHUNK)
+                if not chunk:
+                    break
+                size += len(chunk)
+                await self._throttle(len(chunk))
+            files.append((part.name or "", size))
+        return files
+
+    async def _read_body(self, request: web.Request) -> int:
+        size = 0
+        async for chunk in request.content.iter_chunked(_READ_CHUNK):
+            size += len(chunk)
+            await self._throttle(len(chunk))
+        return size
+
+    async def _handle_photo_upload(self, request: web.Request) -> web.Response:
+        files = await self._read_multipart(request)
+        photos = [{"photo": f"p{i}", "size": size} for i, (_, size) in enumerate(files)]
+        return web.json_response({"server": 1, "photo": json.dumps(photos), "hash": "h"})
+
+    async def _handle_doc_upload(self, request: web.Request) -> web.Response:
+        await self._read_multipart(request)
+        return web.json_response({"file": f"doc{self.state.next_media_id}"})
+
+    async def _handle_video_upload(self, request: web.Request) -> web.Response:
+        video_id = int(request.query.get("video_id", 0))
+        content_range = request.headers.get("Content-Range")
+        if content_range is None:
+            files = await self._read_multipart(request)
+            size = sum(s for _, s in files)
+            return web.json_response({"video_id": video_id, "owner_id": self.state.owner_id, "size": size})
+
+        match = re.fullmatch(r"bytes (\d+)-(\d+)/(\d+)", content_range)
+        session_id = request.headers.get("Session-ID", "")
+        if match is None or not session_id:
+            return web.Response(status=400, text="bad Content-Range")
+        start, end, total = (int(x) for x in match.groups())
+        size = await self._read_body(request)
+        if self.config.upload_truncate_rate and self._random.random() < self.config.upload_truncate_rate:
+            end = start + size // 2 - 1
+        upload = self._chunked.setdefault(session_id, _ChunkedUpload(total=total))
+        if start <= upload.received:
+            upload.received = max(upload.received, end + 1)
+        if upload.received >= upload.total:
+            del self._chunked[session_id]
+            return web.json_response({"video_id": video_id, "owner_id": self.state.owner_id, "size": total})
+        return web.Response(status=201, text=f"0-{upload.received - 1}/{upload.total}")
+
+
+def start_in_thread(server: FakeVKServer, host: str = "127.0.0.1", port: int = 0) -> Callable[[], None]:
+    # Runs the server on its own event loop so it does not compete with the
+    # client being measured. Returns a function that stops it.
+    loop = asyncio.new_event_loop()
+    started = threading.Event()
+
+    def run() -> None:
+        asyncio.set_event_loop(loop)
+        loop.run_until_complete(server.start(host, port))
+        started.set()
+        loop.run_forever()
+        loop.run_until_complete(server.stop())
+        loop.close()
+
+    thread = threading.Thread(target=run, name="fake-vk-server", daemon=True)
+    thread.start()
+    started.wait()
+
+    def stop() -> None:
+        loop.call_soon_threadsafe(loop.stop)
+        thread.join()
+
+    return stop
+
+
+def config_from_args(args: argparse.Namespace) -> FakeVKConfig:
+    return FakeVKConfig(
+        latency_s=args.latency_ms / 1000,
+        latency_jitter_s=args.jitter_ms / 1000,
+        error_rate=args.error_rate,
+        error_codes=tuple(args.error_codes),
+        upload_bandwidth_bps=args.upload_kbps * 1024 if args.upload_kbps else None,
+        upload_truncate_rate=args.upload_truncate_rate,
+        seed=args.seed,
+    )
+
+
+def add_server_args(parser: argparse.ArgumentParser) -> None:
+    parser.add_argument("--latency-ms", type=float, default=0.0)
+    parser.add_argument("--jitter-ms", type=float, default=0.0)
+    parser.add_argument("--error-rate", type=float, default=0.0, help="Share of API calls that fail, 0..1")
+    parser.add_argument("--error-codes", type=int, nargs="+", default=[6, 9, 10, 14])
+    parser.add_argument("--upload-kbps", type=float, default=0.0, help="Upload bandwidth per request; 0 = unlimited")
+    parser.add_argument(
+        "--upload-truncate-rate",
+        type=float,
+        default=0.0,
+        help="Share of video upload chunks cut in half, 0..1",
+    )
+    parser.add_argument("--seed", type=int, default=None)
+
+
+async def _serve(args: argparse.Namespace) -> None:
+    server = FakeVKServer(config_from_args(args), group_id=args.group_id, posts=args.posts)
+    api_base_url = await server.start(args.host, args.port)
+    print(f"fake VK API listening, set VK_API_BASE_URL={api_base_url}")
+    try:
+        await asyncio.Event().wait()
+    finally:
+        await server.stop()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Local stand-in for the VK API used by vkposting benchmarks")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8089)
+    parser.add_argument("--group-id", type=int, default=1)
+    parser.add_argument("--posts", type=int, default=0, help="Number of postponed posts to seed")
+    add_server_args(parser)
+    args = parser.parse_args()
+    try:
+        asyncio.run(_serve(args))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,256 @@
+import argparse
+import asyncio
+import csv
+import hashlib
+import json
+import logging
+import time
+from pathlib import Path
+from typing import Any, Iterator, TextIO
+
+from vkposting import (
+    VKAccessDeniedError,
+    VKAuthError,
+    VKClientError,
+    load_scheduler_from_env,
+    parse_datetime_to_unix,
+    vk_exception_handler,
+)
+from vkposting.uploads import gather_cancel_on_error
+
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# CSV cells holding several values (attachments, file paths) use this separator.
+_LIST_SEPARATOR = ";"
+_LIST_FIELDS = ("attachments", "photos", "docs", "videos")
+
+
+def _as_list(value: Any, field: str) -> list[str]:
+    if value is None or value == "":
+        return []
+    if isinstance(value, str):
+        return [v.strip() for v in value.split(_LIST_SEPARATOR) if v.strip()]
+    if not isinstance(value, list) or not all(isinstance(v, str) for v in value):
+        raise ValueError(f"{field} must be a string or a list of strings")
+    return value
+
+
+def _as_bool(value: Any, default: bool) -> bool:
+    if value is None or value == "":
+        return default
+    if isinstance(value, bool):
+        return value
+    return str(value).strip().lower() in ("1", "true", "yes", "y")
+
+
+def _read_rows(path: Path, fmt: str) -> Iterator[str | dict[str, Any]]:
+    # JSONL lines are yielded raw and parsed per row, so one malformed line
+    # fails that row instead of the whole import.
+    with path.open(encoding="utf-8", newline="") as f:
+        if fmt == "csv":
+            yield from csv.DictReader(f)
+            return
+        for line in f:
+            if line.strip():
+                yield line
+
+
+def _parse_row(raw: str | dict[str, Any]) -> dict[str, Any]:
+    if isinstance(raw, dict):
+        return raw
+    row = json.loads(raw)
+    if not isinstance(row, dict):
+        raise ValueError("row must be a JSON object")
+    return row
+
+
+def _normalize(row: dict[str, Any]) -> dict[str, Any]:
+    # Rows come from untrusted files: a wrong JSON type is a bad row, so
+    # everything raises ValueError and the row fails on its own.
+    message = row.get("message") or ""
+    if not isinstance(message, str):
+        raise ValueError("message must be a string")
+    if row.get("publish_date") not in (None, ""):
+        value = row["publish_date"]
+        if isinstance(value, bool) or not isinstance(value, (int, float, str)) or value in (float("inf"), float("-inf")):
+            raise ValueError("publish_date must be a unix timestamp")
+        publish_date = int(value)
+    elif row.get("publish_iso"):
+        if not isinstance(row["publish_iso"], str):
+            raise ValueError("publish_iso must be a string")
+        publish_date = parse_datetime_to_unix(row["publish_iso"])
+    else:
+        raise ValueError("publish_date or publish_iso is required")
+
+    post = {
+        "message": message,
+        "publish_date": publish_date,
+        "from_group": _as_bool(row.get("from_group"), True),
+    }
+    for field in _LIST_FIELDS:
+        post[field] = _as_list(row.get(field), field)
+    return post
+
+
+class _RowKeys:
+    # An explicit "key" column wins. Otherwise the key is a hash of the row's
+    # content, numbered per occurrence, so resuming still works after rows
+    # are inserted or reordered. Rows must be keyed in file order.
+    def __init__(self) -> None:
+        self._seen: dict[str, int] = {}
+
+    def key_for(self, row: dict[str, Any]) -> str:
+        key = str(row.get("key") or "")
+        if not key:
+            digest = hashlib.sha256(json.dumps(row, sort_keys=True, ensure_ascii=False).encode("utf-8")).hexdigest()
+            n = self._seen.get(digest, 0)
+            self._seen[digest] = n + 1
+            key = f"{digest[:32]}#{n}"
+        return key
+
+
+def _load_checkpoint(path: Path) -> set[str]:
+    if not path.exists():
+        return set()
+    done = set()
+    with path.open(encoding="utf-8") as f:
+        for line in f:
+            key = line.split("\t", 1)[0].strip()
+            if key:
+                done.add(key)
+    return done
+
+
+class _Progress:
+    def __init__(self, interval_s: float):
+        self.interval_s = interval_s
+        self.started = time.perf_counter()
+        self.last_report = self.started
+        self.created = 0
+        self.skipped = 0
+        self.failed = 0
+
+    def report(self, *, final: bool = False) -> None:
+        now = time.perf_counter()
+        if not final and now - self.last_report < self.interval_s:
+            return
+        self.last_report = now
+        elapsed = now - self.started
+        rate = self.created / elapsed if elapsed > 0 else 0.0
+        logger.info(
+            "%s created=%d skipped=%d failed=%d elapsed=%.1fs rate=%.2f posts/s",
+            "Done" if final else "Progress",
+            self.created,
+            self.skipped,
+            self.failed,
+            elapsed,
+            rate,
+        )
+
+
+async def _run(
+    *,
+    path: Path,
+    fmt: str,
+    checkpoint_path: Path,
+    concurrency: int,
+    progress_interval_s: float,
+    dry_run: bool,
+) -> int:
+    done = _load_checkpoint(checkpoint_path)
+    progress = _Progress(progress_interval_s)
+    rows = enumerate(_read_rows(path, fmt), start=1)
+    keys = _RowKeys()
+    scheduler = load_scheduler_from_env()
+
+    async def worker(checkpoint: TextIO) -> None:
+        # Workers pull from one shared iterator, so the file is streamed and
+        # at most `concurrency` posts are in flight.
+        for line_no, raw in rows:
+            try:
+                # No await before key_for(), so keys follow file order.
+                row = _parse_row(raw)
+                key = keys.key_for(row)
+                if key in done:
+                    progress.skipped += 1
+                    continue
+                post = _normalize(row)
+                if dry_run:
+                    post_id = 0
+                else:
+                    post_id = await scheduler.create_scheduled_post(
+                        message=post["message"],
+                        publish_date=post["publish_date"],
+                        from_group=post["from_group"],
+                        attachments=post["attachments"],
+                        photo_paths=post["photos"],
+                        doc_paths=post["docs"],
+                        video_paths=post["videos"],
+                    )
+            except (VKAuthError, VKAccessDeniedError):
+                # Every remaining row would fail the same way.
+                raise
+            except (VKClientError, ValueError, OSError) as exc:
+                progress.failed += 1
+                logger.warning("Row %d failed: %s", line_no, exc)
+                continue
+
+            done.add(key)
+            progress.created += 1
+            if not dry_run:
+                checkpoint.write(f"{key}\t{post_id}\t{line_no}\n")
+                checkpoint.flush()
+            progress.report()
+
+    with checkpoint_path.open("a", encoding="utf-8") as checkpoint:
+        async with scheduler:
+            # An auth error in one worker cancels the rest before the
+            # session closes.
+            await gather_cancel_on_error(*(worker(checkpoint) for _ in range(concurrency)))
+
+    progress.report(final=True)
+    return progress.failed
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Bulk-create scheduled VK wall posts from a JSONL or CSV file")
+    parser.add_argument("path", type=Path)
+    parser.add_argument("--format", choices=("jsonl", "csv"), default=None, help="Defaults to the file extension")
+    parser.add_argument(
+        "--checkpoint",
+        type=Path,
+        default=None,
+        help="Completed row keys are appended here; defaults to <path>.checkpoint",
+    )
+    parser.add_argument("--concurrency", type=int, default=4)
+    parser.add_argument("--progress-interval", type=float, default=5.0, help="Seconds between progress lines")
+    parser.add_argument("--dry-run", action="store_true", help="Validate rows without calling VK")
+    args = parser.parse_args()
+
+    fmt = args.format or ("csv" if args.path.suffix.lower() == ".csv" else "jsonl")
+    checkpoint_path = args.checkpoint or args.path.with_name(args.path.name + ".checkpoint")
+
+    # The handler logs and swallows VK errors (auth errors stop the run);
+    # a run that did not reach the end must still exit non-zero.
+    finished = False
+    failed = 0
+    with vk_exception_handler(logger=logger):
+        failed = asyncio.run(
+            _run(
+                path=args.path,
+                fmt=fmt,
+                checkpoint_path=checkpoint_path,
+                concurrency=max(1, args.concurrency),
+                progress_interval_s=args.progress_interval,
+                dry_run=args.dry_run,
+            )
+        )
+        finished = True
+    if not finished or failed:
+        raise SystemExit(1)
+
+
+if __name__ == "__main__":
+    main()
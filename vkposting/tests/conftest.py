@@ -0,0 +1,43 @@
+from __future__ import annotations
+
+import sys
+from pathlib import Path
+from typing import Callable
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "benchmarks"))
+
+from fake_vk_server import FakeVKConfig, FakeVKServer, start_in_thread  # noqa: E402
+
+from vkposting import RetryPolicy, VKWallScheduler  # noqa: E402
+
+
+# No backoff sleeps, so retry tests stay fast.
+FAST_RETRY = RetryPolicy(max_attempts=3, base_delay_s=0, max_delay_s=0)
+
+
+@pytest.fixture
+def make_fake_vk() -> Callable[..., FakeVKServer]:
+    # Each server runs on its own thread and loop, like the benchmarks do,
+    # so the test can drive the client with asyncio.run().
+    stops = []
+
+    def make(config: FakeVKConfig | None = None, *, posts: int = 5) -> FakeVKServer:
+        srv = FakeVKServer(config or FakeVKConfig(seed=1), group_id=1, posts=posts)
+        stops.append(start_in_thread(srv))
+        return srv
+
+    yield make
+    for stop in stops:
+        stop()
+
+
+@pytest.fixture
+def fake_vk(make_fake_vk) -> FakeVKServer:
+    return make_fake_vk()
+
+
+def make_scheduler(srv: FakeVKServer, **kwargs) -> VKWallScheduler:
+    kwargs.setdefault("retry_policy", FAST_RETRY)
+    return VKWallScheduler("test-token", srv.state.group_id, api_base_url=srv.api_base_url, **kwargs)
@@ -0,0 +1,61 @@
+from __future__ import annotations
+
+import asyncio
+
+from conftest import make_scheduler
+
+from vkposting import EXECUTE_MAX_CALLS, VKClientError, VKParameterError
+
+
+def test_failed_calls_do_not_fail_siblings(fake_vk):
+    async def run():
+        async with make_scheduler(fake_vk) as s:
+            async with s.batch() as batch:
+                created = batch.create_scheduled_post("hello")
+                missing_edit = batch.edit_scheduled_post(999, message="x")
+                found = batch.get_post_by_id(1)
+                missing_get = batch.get_post_by_id(998)
+            results = {r.index: r for r in batch.results}
+            return results[created], results[missing_edit], results[found], results[missing_get]
+
+    created, missing_edit, found, missing_get = asyncio.run(run())
+
+    assert created.ok and isinstance(created.value, int)
+    assert isinstance(missing_edit.error, VKParameterError)
+    assert found.value.id == 1
+    assert missing_get.ok and missing_get.value is None
+    assert fake_vk.state.calls["execute"] == 1
+
+
+def test_unparsable_item_is_isolated(fake_vk):
+    def broken(resp):
+        return resp["no_such_field"]
+
+    async def run():
+        async with make_scheduler(fake_vk) as s:
+            async with s.batch() as batch:
+                bad = batch.add("wall.getById", {"posts": "-1_1"}, broken)
+                good = batch.get_post_by_id(2)
+            results = {r.index: r for r in batch.results}
+            return results[bad], results[good]
+
+    bad, good = asyncio.run(run())
+
+    assert isinstance(bad.error, VKClientError)
+    assert isinstance(bad.error.__cause__, KeyError)
+    assert good.value.id == 2
+
+
+def test_large_batch_is_split_into_execute_chunks(fake_vk):
+    n = EXECUTE_MAX_CALLS + 3
+
+    async def run():
+        async with make_scheduler(fake_vk) as s:
+            return await s.bulk_create({"message": f"post {i}"} for i in range(n))
+
+    results = asyncio.run(run())
+
+    assert [r.index for r in results] == list(range(n))
+    assert all(r.ok for r in results)
+    assert fake_vk.state.calls["execute"] == 2
+    assert len(fake_vk.state.posts) == 5 + n
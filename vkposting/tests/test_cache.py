@@ -0,0 +1,112 @@
+from __future__ import annotations
+
+import asyncio
+
+import pytest
+from conftest import make_scheduler
+
+from vkposting import RedisResponseCache, ResponseCache, SingleFlight
+
+
+def test_invalidation_drops_entries_of_the_owner():
+    cache = ResponseCache(ttl_s=60)
+    cache.set("a", [1], owners={-1})
+    cache.set("b", [2], owners={-2})
+
+    assert cache.invalidate_owner(-1) == 1
+    assert cache.get("a") is None
+    assert cache.get("b") == [2]
+
+
+def test_fill_after_invalidation_is_discarded():
+    cache = ResponseCache(ttl_s=60)
+    gens = cache.generations({-1})
+    # A write lands while the read is in flight.
+    cache.invalidate_owner(-1)
+    cache.set("a", ["stale"], owners={-1}, generations=gens)
+    assert cache.get("a") is None
+
+    cache.set("a", ["fresh"], owners={-1}, generations=cache.generations({-1}))
+    assert cache.get("a") == ["fresh"]
+
+
+def test_shared_fill_after_invalidation_is_discarded():
+    fakeredis = pytest.importorskip("fakeredis.aioredis")
+    pytest.importorskip("lupa")
+
+    async def run():
+        cache = RedisResponseCache(fakeredis.FakeRedis(), ttl_s=60)
+        gen = await cache.generation(-1)
+        await cache.invalidate_owner(-1)
+        await cache.set("a", ["stale"], owner_id=-1, generation=gen)
+        stale = await cache.get("a", owner_id=-1)
+
+        await cache.set("a", ["fresh"], owner_id=-1, generation=await cache.generation(-1))
+        return stale, await cache.get("a", owner_id=-1)
+
+    assert asyncio.run(run()) == (None, ["fresh"])
+
+
+def test_write_invalidates_cached_listing(fake_vk):
+    async def run():
+        async with make_scheduler(fake_vk, cache_ttl_s=60) as s:
+            before = await s.get_scheduled_posts(count=100)
+            await s.get_scheduled_posts(count=100)
+            await s.create_scheduled_post("new")
+            after = await s.get_scheduled_posts(count=100)
+            return len(before), len(after)
+
+    assert asyncio.run(run()) == (5, 6)
+    assert fake_vk.state.calls["wall.get"] == 2
+
+
+def test_single_flight_shares_one_call():
+    calls = 0
+
+    async def fetch():
+        nonlocal calls
+        calls += 1
+        await asyncio.sleep(0.01)
+        return calls
+
+    async def run():
+        sf = SingleFlight()
+        results = await asyncio.gather(*(sf.do("k", fetch) for _ in range(10)))
+        return results, len(sf)
+
+    results, inflight = asyncio.run(run())
+    assert results == [1] * 10
+    assert calls == 1
+    assert inflight == 0
+
+
+def test_single_flight_shares_the_error_and_forgets_it():
+    calls = 0
+
+    async def fail():
+        nonlocal calls
+        calls += 1
+        await asyncio.sleep(0)
+        raise RuntimeError("boom")
+
+    async def run():
+        sf = SingleFlight()
+        results = await asyncio.gather(sf.do("k", fail), sf.do("k", fail), return_exceptions=True)
+        # A later call starts a new flight instead of replaying the error.
+        with pytest.raises(RuntimeError):
+            await sf.do("k", fail)
+        return results
+
+    results = asyncio.run(run())
+    assert all(isinstance(r, RuntimeError) for r in results)
+    assert calls == 2
+
+
+def test_concurrent_reads_reach_vk_once(fake_vk):
+    async def run():
+        async with make_scheduler(fake_vk) as s:
+            return await asyncio.gather(*(s.get_scheduled_posts(count=10) for _ in range(5)))
+
+    results = asyncio.run(run())
+    assert all(len(r) == 5 for r in results)
+    assert fake_vk.state.calls["wall.get"] == 1
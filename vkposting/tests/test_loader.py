@@ -0,0 +1,102 @@
+from __future__ import annotations
+
+import asyncio
+
+import pytest
+from conftest import make_scheduler
+
+from vkposting import BatchLoader, BatchLoaderRegistry
+
+
+def test_loads_in_one_tick_share_a_fetch():
+    batches = []
+
+    async def fetch(keys):
+        batches.append(keys)
+        return {k: k * 10 for k in keys if k != 3}
+
+    async def run():
+        loader = BatchLoader(fetch)
+        return await asyncio.gather(*(loader.load(k) for k in (1, 2, 2, 3)))
+
+    assert asyncio.run(run()) == [10, 20, 20, None]
+    assert batches == [[1, 2, 3]]
+
+
+def test_full_batch_is_dispatched_at_once():
+    batches = []
+
+    async def fetch(keys):
+        batches.append(keys)
+        return {k: k for k in keys}
+
+    async def run():
+        loader = BatchLoader(fetch, max_batch=2)
+        return await asyncio.gather(*(loader.load(k) for k in range(5)))
+
+    assert asyncio.run(run()) == list(range(5))
+    assert batches == [[0, 1], [2, 3], [4]]
+
+
+def test_fetch_error_reaches_every_waiter():
+    async def fetch(keys):
+        raise RuntimeError("boom")
+
+    async def run():
+        loader = BatchLoader(fetch)
+        return await asyncio.gather(loader.load(1), loader.load(2), return_exceptions=True)
+
+    assert all(isinstance(r, RuntimeError) for r in asyncio.run(run()))
+
+
+def test_get_post_by_id_calls_are_coalesced(fake_vk):
+    async def run():
+        async with make_scheduler(fake_vk) as s:
+            return await asyncio.gather(*(s.get_post_by_id(i) for i in (1, 2, 3, 999)))
+
+    posts = asyncio.run(run())
+    assert [p and p.id for p in posts] == [1, 2, 3, None]
+    assert fake_vk.state.calls["wall.getById"] == 1
+
+
+def test_registry_coalesces_across_schedulers(fake_vk):
+    registry = BatchLoaderRegistry(window_s=0.005)
+
+    async def one(post_id):
+        # A fresh scheduler per call, like one per API request.
+        async with make_scheduler(fake_vk, post_loaders=registry) as s:
+            return await s.get_post_by_id(post_id)
+
+    async def run():
+        return await asyncio.gather(*(one(i) for i in (1, 2, 3)))
+
+    assert [p.id for p in asyncio.run(run())] == [1, 2, 3]
+    assert fake_vk.state.calls["wall.getById"] == 1
+    assert len(registry) == 0
+
+
+def test_registry_keeps_scopes_apart():
+    fetched = []
+
+    def fetcher(scope):
+        async def fetch(keys):
+            fetched.append((scope, keys))
+            return {k: scope for k in keys}
+
+        return fetch
+
+    async def run():
+        registry = BatchLoaderRegistry()
+        return await asyncio.gather(
+            registry.load("a", 1, fetcher("a")),
+            registry.load("b", 1, fetcher("b")),
+            registry.load("a", 2, fetcher("a")),
+        )
+
+    assert asyncio.run(run()) == ["a", "b", "a"]
+    assert sorted(fetched) == [("a", [1, 2]), ("b", [1])]
+
+
+def test_invalid_window_is_rejected():
+    with pytest.raises(ValueError):
+        BatchLoaderRegistry(window_s=-1)
@@ -0,0 +1,142 @@
+from __future__ import annotations
+
+import asyncio
+import time
+
+import pytest
+from conftest import make_scheduler
+from fake_vk_server import FakeVKConfig
+
+from vkposting import (
+    CircuitBreaker,
+    CircuitBreakerRegistry,
+    RetryPolicy,
+    VKCircuitOpenError,
+    VKInternalServerError,
+    VKParameterError,
+    VKRateLimitError,
+    VKTransportError,
+)
+
+
+def _server_error() -> VKInternalServerError:
+    return VKInternalServerError(10, "Internal server error", is_retryable=True)
+
+
+def test_max_attempts_bounds_calls_without_deadline():
+    policy = RetryPolicy(max_attempts=3)
+    assert policy.should_retry(_server_error(), method="wall.get", attempt=2)
+    assert not policy.should_retry(_server_error(), method="wall.get", attempt=3)
+
+
+def test_deadline_wins_over_max_attempts():
+    policy = RetryPolicy(max_attempts=2, deadline_s=5)
+    now = time.monotonic()
+    assert policy.should_retry(_server_error(), method="wall.get", attempt=4, started_at=now)
+    assert not policy.should_retry(_server_error(), method="wall.get", attempt=1, started_at=now - 6)
+
+
+def test_writes_are_not_resent_after_transport_errors():
+    exc = VKTransportError("connection reset")
+    assert not RetryPolicy().should_retry(exc, method="wall.post", attempt=1)
+    assert RetryPolicy().should_retry(exc, method="wall.get", attempt=1)
+    assert RetryPolicy(retry_writes_on_transport_error=True).should_retry(exc, method="wall.post", attempt=1)
+
+
+def test_breaker_opens_and_recovers_through_a_probe():
+    breaker = CircuitBreaker(failure_threshold=2, reset_timeout_s=0.01)
+    breaker.record_failure()
+    breaker.record_failure()
+    with pytest.raises(VKCircuitOpenError):
+        breaker.before_call()
+
+    time.sleep(0.02)
+    breaker.before_call()
+    # Only one probe at a time while half-open.
+    with pytest.raises(VKCircuitOpenError):
+        breaker.before_call()
+    breaker.record_success()
+    assert breaker.state == CircuitBreaker.CLOSED
+
+
+def test_failed_probe_reopens_the_breaker():
+    breaker = CircuitBreaker(failure_threshold=1, reset_timeout_s=0.01)
+    breaker.record_failure()
+    time.sleep(0.02)
+    breaker.before_call()
+    breaker.record_failure()
+    assert breaker.state == CircuitBreaker.OPEN
+
+
+def test_released_probe_frees_the_slot_without_a_verdict():
+    breaker = CircuitBreaker(failure_threshold=1, reset_timeout_s=0.01)
+    breaker.record_failure()
+    time.sleep(0.02)
+    breaker.before_call()
+    breaker.release_probe()
+    assert breaker.state == CircuitBreaker.HALF_OPEN
+    breaker.before_call()
+
+
+def test_aborted_probe_does_not_hold_the_slot():
+    breaker = CircuitBreaker(failure_threshold=1, reset_timeout_s=0.01)
+    breaker.record_failure()
+    time.sleep(0.02)
+    breaker.before_call()
+    breaker.abort_call()
+    assert breaker.state == CircuitBreaker.OPEN
+
+
+def test_retryable_errors_are_retried_up_to_max_attempts(make_fake_vk):
+    srv = make_fake_vk(FakeVKConfig(error_rate=1.0, error_codes=(10,), seed=1))
+
+    async def run():
+        async with make_scheduler(srv) as s:
+            await s.get_scheduled_posts()
+
+    with pytest.raises(VKInternalServerError):
+        asyncio.run(run())
+    assert srv.state.calls["wall.get"] == 3
+
+
+def test_non_retryable_errors_fail_at_once(fake_vk):
+    async def run():
+        async with make_scheduler(fake_vk) as s:
+            await s.edit_scheduled_post(999, message="x")
+
+    with pytest.raises(VKParameterError):
+        asyncio.run(run())
+    assert fake_vk.state.calls["wall.edit"] == 1
+
+
+def test_open_circuit_fails_fast_without_calling_vk(make_fake_vk):
+    srv = make_fake_vk(FakeVKConfig(error_rate=1.0, error_codes=(10,), seed=1))
+    breakers = CircuitBreakerRegistry(failure_threshold=3, reset_timeout_s=60)
+
+    async def run():
+        async with make_scheduler(srv, circuit_breakers=breakers) as s:
+            with pytest.raises(VKInternalServerError):
+                await s.get_scheduled_posts()
+            with pytest.raises(VKCircuitOpenError):
+                await s.get_scheduled_posts()
+
+    asyncio.run(run())
+    assert srv.state.calls["wall.get"] == 3
+
+
+def test_throttling_does_not_trip_or_reset_the_breaker(make_fake_vk):
+    srv = make_fake_vk(FakeVKConfig(error_rate=1.0, error_codes=(6,), seed=1))
+    breakers = CircuitBreakerRegistry(failure_threshold=2, reset_timeout_s=60)
+    breaker = breakers.get("wall.get", make_scheduler(srv)._token_key)
+    breaker.record_failure()
+
+    async def run():
+        async with make_scheduler(srv, circuit_breakers=breakers) as s:
+            await s.get_scheduled_posts()
+
+    with pytest.raises(VKRateLimitError):
+        asyncio.run(run())
+    assert breaker.state == CircuitBreaker.CLOSED
+    # The earlier outage failure still counts: one more opens the circuit.
+    breaker.record_failure()
+    assert breaker.state == CircuitBreaker.OPEN
@@ -0,0 +1,78 @@
+from __future__ import annotations
+
+import asyncio
+
+import aiohttp
+import pytest
+from fake_vk_server import FakeVKConfig
+
+from vkposting import VKClientError
+from vkposting.uploads import _acknowledged_end, upload_file_chunked
+
+
+def _video(tmp_path, size: int):
+    path = tmp_path / "clip.mp4"
+    path.write_bytes(bytes(i % 251 for i in range(size)))
+    return path
+
+
+def _upload(srv, path, **kwargs):
+    async def run():
+        async with aiohttp.ClientSession() as session:
+            return await upload_file_chunked(
+                session,
+                f"{srv.base_url}/upload/video?video_id=7",
+                path,
+                retry_delay_s=0,
+                **kwargs,
+            )
+
+    return asyncio.run(run())
+
+
+def test_chunks_are_sent_in_order(fake_vk, tmp_path):
+    path = _video(tmp_path, 10_000)
+    sent = []
+
+    result = _upload(fake_vk, path, chunk_size=4096, progress=lambda p: sent.append(p.bytes_sent))
+
+    assert result == {"video_id": 7, "owner_id": -1, "size": 10_000}
+    assert sent == [4096, 8192, 10_000]
+    assert fake_vk.state.uploaded_bytes == 10_000
+
+
+def test_upload_resumes_from_the_acknowledged_offset(make_fake_vk, tmp_path):
+    # Half of the chunks are cut short; each resend starts where the
+    # server's acknowledgement ended, not at the chunk boundary.
+    srv = make_fake_vk(FakeVKConfig(upload_truncate_rate=0.5, seed=3))
+    path = _video(tmp_path, 40_000)
+    sent = []
+
+    result = _upload(srv, path, chunk_size=4096, progress=lambda p: sent.append(p.bytes_sent))
+
+    assert result["size"] == 40_000
+    assert sent == sorted(sent) and sent[-1] == 40_000
+    assert any(n % 4096 and n != 40_000 for n in sent)
+    assert 40_000 < srv.state.uploaded_bytes < 2 * 40_000
+
+
+def test_upload_gives_up_without_progress(make_fake_vk, tmp_path):
+    srv = make_fake_vk(FakeVKConfig(upload_truncate_rate=1.0, seed=1))
+    path = _video(tmp_path, 10)
+
+    # A 1-byte chunk halved is nothing, so no request makes progress.
+    with pytest.raises(VKClientError):
+        _upload(srv, path, chunk_size=1, max_retries=2)
+
+
+@pytest.mark.parametrize(
+    ("body", "expected"),
+    [
+        (b"0-1023/4096", 1024),
+        (b"0-1023,1024-2047/4096", 2048),
+        (b"0-1023,2048-3071/4096", 1024),
+        (b"garbage", 512),
+    ],
+)
+def test_acknowledged_end_counts_only_the_contiguous_prefix(body, expected):
+    assert _acknowledged_end(body, 512) == expected
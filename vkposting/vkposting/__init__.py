@@ -1,6 +1,10 @@
+from .batch import EXECUTE_MAX_CALLS, BatchItemResult, VKBatch
+from .cache import CacheStats, RedisResponseCache, ResponseCache
+from .compact import CompactPost
 from .exceptions import (
     VKAccessDeniedError,
     VKAPIError,
+    VKCircuitOpenError,
     VKAuthError,
     VKCaptchaRequiredError,
     VKClientError,
@@ -9,21 +13,84 @@ from .exceptions import (
     VKNotFoundError,
     VKParameterError,
     VKRateLimitError,
+    VKTimeoutError,
+    VKTransportError,
     VKUnknownMethodError,
     VKValidationRequiredError,
     vk_exception_handler,
 )
-from .models import Post, PostCreate, PostEdit, parse_datetime_to_unix
+from .fanout import FanoutResult
+from .hooks import (
+    CompositeHooks,
+    VKCacheEvent,
+    VKConnectionEvent,
+    VKHooks,
+    VKRequestEvent,
+    VKUploadEvent,
+    vk_trace_config,
+)
+from .image_prep import VK_MAX_PHOTO_SIDE, ImagePreprocessor, ImagePrepStats
+from .loader import WALL_GET_BY_ID_MAX, BatchLoader, BatchLoaderRegistry
+from .models import POST_LIST_ADAPTER, Post, PostCreate, PostEdit, parse_datetime_to_unix
+from .rate_limit import GROUP_TOKEN_RPS, USER_TOKEN_RPS, TokenBucket, VKRateLimiter, get_default_rate_limiter
+from .retry import CircuitBreaker, CircuitBreakerRegistry, RetryPolicy
+from .session_pool import VKSessionPool, close_default_session_pool, get_default_session_pool
+from .singleflight import SingleFlight
+from .upload_cache import MemoryUploadCache, RedisUploadCache, SQLiteUploadCache, UploadCache, hash_file
+from .uploads import UploadProgress
 from .wall_scheduler import VKWallScheduler, load_scheduler_from_env
 
 __all__ = [
     "VKWallScheduler",
     "load_scheduler_from_env",
+    "VKSessionPool",
+    "get_default_session_pool",
+    "close_default_session_pool",
+    "VKRateLimiter",
+    "TokenBucket",
+    "get_default_rate_limiter",
+    "USER_TOKEN_RPS",
+    "GROUP_TOKEN_RPS",
+    "UploadProgress",
+    "UploadCache",
+    "MemoryUploadCache",
+    "SQLiteUploadCache",
+    "RedisUploadCache",
+    "hash_file",
+    "ImagePreprocessor",
+    "ImagePrepStats",
+    "VK_MAX_PHOTO_SIDE",
+    "ResponseCache",
+    "CacheStats",
+    "RedisResponseCache",
+    "BatchLoader",
+    "BatchLoaderRegistry",
+    "WALL_GET_BY_ID_MAX",
+    "SingleFlight",
+    "RetryPolicy",
+    "CircuitBreaker",
+    "CircuitBreakerRegistry",
+    "VKHooks",
+    "CompositeHooks",
+    "VKRequestEvent",
+    "VKConnectionEvent",
+    "VKCacheEvent",
+    "VKUploadEvent",
+    "vk_trace_config",
+    "VKBatch",
+    "BatchItemResult",
+    "FanoutResult",
+    "EXECUTE_MAX_CALLS",
     "Post",
+    "CompactPost",
+    "POST_LIST_ADAPTER",
     "PostCreate",
     "PostEdit",
     "parse_datetime_to_unix",
     "VKClientError",
+    "VKTransportError",
+    "VKTimeoutError",
+    "VKCircuitOpenError",
     "VKAPIError",
     "VKAuthError",
     "VKAccessDeniedError",
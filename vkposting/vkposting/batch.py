@@ -0,0 +1,197 @@
+from __future__ import annotations
+
+import json
+from dataclasses import dataclass
+from typing import TYPE_CHECKING, Any, Callable
+
+from .cache import WRITE_METHODS
+from .exceptions import VKAPIError, VKClientError, vk_api_error_from_payload
+from .models import Post, PostCreate, PostEdit, get_by_id_items
+
+if TYPE_CHECKING:
+    from .wall_scheduler import VKWallScheduler
+
+
+# VK rejects execute requests with more than 25 API calls inside.
+EXECUTE_MAX_CALLS = 25
+
+_UPLOAD_KWARGS = ("photo_paths", "doc_paths", "video_paths")
+
+
+@dataclass(frozen=True)
+class BatchItemResult:
+    index: int
+    method: str
+    value: Any = None
+    error: VKClientError | None = None
+
+    @property
+    def ok(self) -> bool:
+        return self.error is None
+
+    def unwrap(self) -> Any:
+        if self.error is not None:
+            raise self.error
+        return self.value
+
+
+@dataclass(frozen=True)
+class _BatchCall:
+    index: int
+    method: str
+    params: dict[str, Any]
+    parse: Callable[[Any], Any]
+
+
+def _identity(value: Any) -> Any:
+    return value
+
+
+def _parse_first_post(resp: Any) -> Post | None:
+    items = get_by_id_items(resp)
+    return Post.model_validate(items[0]) if items else None
+
+
+def build_execute_code(calls: list[tuple[str, dict[str, Any]]]) -> str:
+    if not calls:
+        raise ValueError("execute requires at least one call")
+    if len(calls) > EXECUTE_MAX_CALLS:
+        raise ValueError(f"VK limits execute to {EXECUTE_MAX_CALLS} calls per request")
+    parts = [f"API.{method}({json.dumps(params, ensure_ascii=False)})" for method, params in calls]
+    return f"return [{','.join(parts)}];"
+
+
+class VKBatch:
+    def __init__(self, scheduler: "VKWallScheduler"):
+        self._scheduler = scheduler
+        self._pending: list[_BatchCall] = []
+        self._next_index = 0
+        self.results: list[BatchItemResult] = []
+
+    async def __aenter__(self) -> "VKBatch":
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb) -> None:
+        if exc_type is None:
+            await self.flush()
+
+    def __len__(self) -> int:
+        return len(self._pending)
+
+    def add(self, method: str, params: dict[str, Any], parse: Callable[[Any], Any] | None = None) -> int:
+        index = self._next_index
+        self._next_index += 1
+        self._pending.append(_BatchCall(index=index, method=method, params=params, parse=parse or _identity))
+        return index
+
+    def create_scheduled_post(
+        self,
+        message: str,
+        publish_date: int = 0,
+        attachments: list[str] | None = None,
+        from_group: bool = True,
+        **kwargs: Any,
+    ) -> int:
+        self._reject_uploads(kwargs)
+        payload = PostCreate(
+            message=message,
+            publish_date=publish_date,
+            attachments=attachments or [],
+            from_group=from_group,
+            **kwargs,
+        )
+        s = self._scheduler
+        return self.add("wall.post", s._post_params(payload), s._parse_post_id)
+
+    def edit_scheduled_post(self, post_id: int, **kwargs: Any) -> int:
+        if post_id <= 0:
+            raise ValueError("post_id must be positive")
+        self._reject_uploads(kwargs)
+        payload = PostEdit(**kwargs)
+        s = self._scheduler
+        return self.add("wall.edit", s._edit_params(post_id, payload), s._parse_edit_ok)
+
+    def delete_scheduled_post(self, post_id: int) -> int:
+        if post_id <= 0:
+            raise ValueError("post_id must be positive")
+        return self.add("wall.delete", self._scheduler._delete_params(post_id), lambda resp: bool(resp == 1))
+
+    def get_post_by_id(self, post_id: int) -> int:
+        if post_id <= 0:
+            raise ValueError("post_id must be positive")
+        return self.add(
+            "wall.getById",
+            {"posts": f"{self._scheduler._owner_id()}_{post_id}"},
+            _parse_first_post,
+        )
+
+    async def flush(self) -> list[BatchItemResult]:
+        flushed: list[BatchItemResult] = []
+        while self._pending:
+            chunk = self._pending[:EXECUTE_MAX_CALLS]
+            chunk_results = await self._execute(chunk)
+            del self._pending[: len(chunk)]
+            flushed.extend(chunk_results)
+            self.results.extend(chunk_results)
+        return flushed
+
+    async def _execute(self, chunk: list[_BatchCall]) -> list[BatchItemResult]:
+        code = build_execute_code([(c.method, c.params) for c in chunk])
+        try:
+            data = await self._scheduler._vk_request("execute", {"code": code})
+        finally:
+            # Even a failed execute may have applied some writes.
+            for call in chunk:
+                if call.method in WRITE_METHODS:
+                    self._scheduler._invalidate_after_write(call.params)
+                    await self._scheduler._invalidate_shared_after_write(call.params)
+
+        responses = data.get("response")
+        if not isinstance(responses, list) or len(responses) != len(chunk):
+            raise VKClientError("VK execute returned unexpected response")
+
+        # VK returns `false` in place of every failed call and lists the errors
+        # in execute_errors, in the same order as the failed calls.
+        errors = list(data.get("execute_errors") or [])
+        results: list[BatchItemResult] = []
+        for call, value in zip(chunk, responses):
+            if value is False:
+                results.append(
+                    BatchItemResult(index=call.index, method=call.method, error=self._pop_error(errors, call))
+                )
+                continue
+            try:
+                parsed = call.parse(value)
+            except VKClientError as e:
+                results.append(BatchItemResult(index=call.index, method=call.method, error=e))
+                continue
+            except Exception as e:
+                # A malformed item must not discard its siblings' results.
+                error = VKClientError(f"VK {call.method} returned unexpected response")
+                error.__cause__ = e
+                results.append(BatchItemResult(index=call.index, method=call.method, error=error))
+                continue
+            results.append(BatchItemResult(index=call.index, method=call.method, value=parsed))
+        return results
+
+    def _pop_error(self, errors: list[dict[str, Any]], call: _BatchCall) -> VKAPIError:
+        payload = errors.pop(0) if errors else {"error_code": -1, "error_msg": "execute call failed"}
+        return vk_api_error_from_payload(
+            payload,
+            method=call.method,
+            params=self._scheduler._sanitize_params_for_log(call.params),
+        )
+
+    @staticmethod
+    def _reject_uploads(kwargs: dict[str, Any]) -> None:
+        for name in _UPLOAD_KWARGS:
+            if kwargs.get(name):
+                raise ValueError(f"{name} is not supported in batch; upload media first and pass attachments")
+
+
+__all__ = [
+    "EXECUTE_MAX_CALLS",
+    "BatchItemResult",
+    "VKBatch",
+    "build_execute_code",
+]
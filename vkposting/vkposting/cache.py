@@ -0,0 +1,307 @@
+from __future__ import annotations
+
+import hashlib
+import json
+import logging
+import time
+import zlib
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any
+
+from ._json import dumps as _dumps
+from ._json import loads as _loads
+
+
+logger = logging.getLogger(__name__)
+
+
+CACHEABLE_METHODS = frozenset({"wall.get", "wall.getById"})
+WRITE_METHODS = frozenset({"wall.post", "wall.edit", "wall.delete"})
+
+# Credentials and the API version never take part in the key.
+_KEY_EXCLUDED_PARAMS = frozenset({"access_token", "v"})
+
+
+def response_cache_key(method: str, params: dict[str, Any]) -> str:
+    normalized = {k: v for k, v in params.items() if k not in _KEY_EXCLUDED_PARAMS}
+    raw = json.dumps([method, normalized], sort_keys=True, separators=(",", ":"), default=str)
+    return hashlib.blake2b(raw.encode("utf-8"), digest_size=16).hexdigest()
+
+
+def owner_ids_of(params: dict[str, Any]) -> set[int]:
+    owners: set[int] = set()
+    if params.get("owner_id") is not None:
+        owners.add(int(params["owner_id"]))
+    posts = params.get("posts")
+    if posts:
+        for item in str(posts).split(","):
+            owner, _, _ = item.strip().partition("_")
+            if owner:
+                owners.add(int(owner))
+    return owners
+
+
+def _estimate_size(value: Any) -> int:
+    # A rough byte count of the JSON-like value; cheap enough to run per write.
+    if isinstance(value, str):
+        return len(value) + 2
+    if isinstance(value, dict):
+        return sum(len(str(k)) + 4 + _estimate_size(v) for k, v in value.items()) + 2
+    if isinstance(value, (list, tuple)):
+        return sum(_estimate_size(v) + 1 for v in value) + 2
+    return 8
+
+
+@dataclass(frozen=True)
+class CacheStats:
+    hits: int
+    misses: int
+    evictions: int
+    expirations: int
+    invalidations: int
+    entries: int
+    size_bytes: int
+
+
+@dataclass
+class _Entry:
+    value: Any
+    expires_at: float
+    size: int
+    owners: frozenset[int]
+
+
+class ResponseCache:
+    def __init__(self, ttl_s: float, *, max_entries: int = 1024, max_bytes: int = 16 * 1024 * 1024):
+        if ttl_s <= 0:
+            raise ValueError("ttl_s must be > 0")
+        if max_entries <= 0 or max_bytes <= 0:
+            raise ValueError("max_entries and max_bytes must be > 0")
+        self._ttl_s = float(ttl_s)
+        self._max_entries = max_entries
+        self._max_bytes = max_bytes
+        self._entries: OrderedDict[str, _Entry] = OrderedDict()
+        self._by_owner: dict[int, set[str]] = {}
+        # Bumped by invalidate_owner(); see generations().
+        self._generations: dict[int, int] = {}
+        self._size = 0
+        self._hits = 0
+        self._misses = 0
+        self._evictions = 0
+        self._expirations = 0
+        self._invalidations = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, key: str) -> Any | None:
+        entry = self._entries.get(key)
+        if entry is None:
+            self._misses += 1
+            return None
+        if time.monotonic() >= entry.expires_at:
+            self._remove(key)
+            self._expirations += 1
+            self._misses += 1
+            return None
+        self._entries.move_to_end(key)
+        self._hits += 1
+        return entry.value
+
+    def generations(self, owners: set[int] | frozenset[int]) -> dict[int, int]:
+        # Read before a fetch and pass to set(): if an owner was invalidated
+        # while the request was in flight, the result predates the write.
+        return {owner: self._generations.get(owner, 0) for owner in owners}
+
+    def set(
+        self,
+        key: str,
+        value: Any,
+        *,
+        owners: set[int] | frozenset[int] = frozenset(),
+        generations: dict[int, int] | None = None,
+    ) -> None:
+        if generations is not None and any(self._generations.get(o, 0) != g for o, g in generations.items()):
+            return
+        size = _estimate_size(value)
+        if size > self._max_bytes:
+            return
+        if key in self._entries:
+            self._remove(key)
+        entry = _Entry(value=value, expires_at=time.monotonic() + self._ttl_s, size=size, owners=frozenset(owners))
+        self._entries[key] = entry
+        self._size += size
+        for owner in entry.owners:
+            self._by_owner.setdefault(owner, set()).add(key)
+        while len(self._entries) > self._max_entries or self._size > self._max_bytes:
+            oldest = next(iter(self._entries))
+            self._remove(oldest)
+            self._evictions += 1
+
+    def invalidate_owner(self, owner_id: int) -> int:
+        self._generations[owner_id] = self._generations.get(owner_id, 0) + 1
+        keys = self._by_owner.pop(owner_id, set())
+        for key in list(keys):
+            self._remove(key)
+        self._invalidations += len(keys)
+        return len(keys)
+
+    def clear(self) -> None:
+        self._entries.clear()
+        self._by_owner.clear()
+        self._size = 0
+
+    def stats(self) -> CacheStats:
+        return CacheStats(
+            hits=self._hits,
+            misses=self._misses,
+            evictions=self._evictions,
+            expirations=self._expirations,
+            invalidations=self._invalidations,
+            entries=len(self._entries),
+            size_bytes=self._size,
+        )
+
+    def _remove(self, key: str) -> None:
+        entry = self._entries.pop(key, None)
+        if entry is None:
+            return
+        self._size -= entry.size
+        for owner in entry.owners:
+            keys = self._by_owner.get(owner)
+            if keys is not None:
+                keys.discard(key)
+                if not keys:
+                    del self._by_owner[owner]
+
+
+_RAW = b"j"
+_ZLIB = b"z"
+
+# KEYS: owner hash, generation key. ARGV: expected generation, field, blob,
+# ttl. Fills the entry only if no invalidation happened since the read.
+_SET_IF_GENERATION_SCRIPT = """
+if (redis.call("GET", KEYS[2]) or "") ~= ARGV[1] then
+    return 0
+end
+redis.call("HSET", KEYS[1], ARGV[2], ARGV[3])
+redis.call("EXPIRE", KEYS[1], ARGV[4])
+return 1
+"""
+
+
+class RedisResponseCache:
+    # Shared across processes. Entries of one owner live in a single Redis
+    # hash, so a write invalidates the whole group with one DEL. Accepts any
+    # redis.asyncio client created with decode_responses=False.
+    def __init__(
+        self,
+        client: Any,
+        ttl_s: float,
+        *,
+        prefix: str = "vk:resp:",
+        compress_min_bytes: int | None = 1024,
+    ):
+        if ttl_s <= 0:
+            raise ValueError("ttl_s must be > 0")
+        self._client = client
+        self._ttl_s = float(ttl_s)
+        self._prefix = prefix
+        self._compress_min_bytes = compress_min_bytes
+        self.hits = 0
+        self.misses = 0
+
+    def _owner_key(self, owner_id: int) -> str:
+        return f"{self._prefix}{owner_id}"
+
+    def _generation_key(self, owner_id: int) -> str:
+        # One small counter per group, kept without a TTL so a reader can
+        # never see it reset between its read and its fill.
+        return f"{self._prefix}gen:{owner_id}"
+
+    def encode(self, value: Any, expires_at: float) -> bytes:
+        raw = _dumps([expires_at, value])
+        if self._compress_min_bytes is not None and len(raw) >= self._compress_min_bytes:
+            return _ZLIB + zlib.compress(raw, 1)
+        return _RAW + raw
+
+    @staticmethod
+    def decode(blob: bytes) -> tuple[float, Any]:
+        header, body = blob[:1], blob[1:]
+        if header == _ZLIB:
+            body = zlib.decompress(body)
+        expires_at, value = _loads(body)
+        return float(expires_at), value
+
+    async def get(self, key: str, *, owner_id: int) -> Any | None:
+        try:
+            blob = await self._client.hget(self._owner_key(owner_id), key)
+        except Exception as exc:
+            logger.warning("VK shared cache redis error: %s", exc)
+            return None
+        if blob is None:
+            self.misses += 1
+            return None
+        try:
+            expires_at, value = self.decode(blob)
+        except (ValueError, TypeError, zlib.error) as exc:
+            logger.warning("VK shared cache entry is corrupt: %s", exc)
+            self.misses += 1
+            return None
+        if time.time() >= expires_at:
+            self.misses += 1
+            return None
+        self.hits += 1
+        return value
+
+    async def generation(self, owner_id: int) -> bytes | None:
+        # None when Redis is unavailable; the caller then skips the fill.
+        try:
+            return await self._client.get(self._generation_key(owner_id)) or b""
+        except Exception as exc:
+            logger.warning("VK shared cache redis error: %s", exc)
+            return None
+
+    async def set(self, key: str, value: Any, *, owner_id: int, generation: bytes | None = None) -> None:
+        owner_key = self._owner_key(owner_id)
+        blob = self.encode(value, time.time() + self._ttl_s)
+        try:
+            if generation is not None:
+                await self._client.eval(
+                    _SET_IF_GENERATION_SCRIPT,
+                    2,
+                    owner_key,
+                    self._generation_key(owner_id),
+                    generation,
+                    key,
+                    blob,
+                    max(1, int(self._ttl_s)),
+                )
+                return
+            pipe = self._client.pipeline(transaction=False)
+            pipe.hset(owner_key, key, blob)
+            pipe.expire(owner_key, max(1, int(self._ttl_s)))
+            await pipe.execute()
+        except Exception as exc:
+            logger.warning("VK shared cache redis error: %s", exc)
+
+    async def invalidate_owner(self, owner_id: int) -> None:
+        try:
+            pipe = self._client.pipeline(transaction=True)
+            pipe.incr(self._generation_key(owner_id))
+            pipe.delete(self._owner_key(owner_id))
+            await pipe.execute()
+        except Exception as exc:
+            logger.warning("VK shared cache redis error: %s", exc)
+
+
+__all__ = [
+    "CACHEABLE_METHODS",
+    "WRITE_METHODS",
+    "CacheStats",
+    "ResponseCache",
+    "RedisResponseCache",
+    "owner_ids_of",
+    "response_cache_key",
+]
@@ -0,0 +1,104 @@
+from __future__ import annotations
+
+from typing import Any, Iterable
+
+from . import _json
+from .models import Post
+
+
+class CompactPost:
+    # A memory-lean view of a wall post for large listings. Only the fields
+    # the listing needs are kept as plain attributes; attachments are
+    # re-encoded to compact JSON bytes and decoded on every access, so
+    # nothing big is pinned in memory unless the caller holds on to the
+    # result. The response is still parsed in full first (neither orjson nor
+    # json reports byte offsets to slice from), so this trims what a listing
+    # keeps alive, not the peak while parsing it.
+    __slots__ = ("id", "owner_id", "from_id", "date", "text", "postponed_id", "_attachments_raw")
+
+    def __init__(
+        self,
+        id: int,
+        owner_id: int,
+        *,
+        from_id: int | None = None,
+        date: int | None = None,
+        text: str = "",
+        postponed_id: int | None = None,
+        attachments_raw: bytes = b"",
+    ):
+        self.id = id
+        self.owner_id = owner_id
+        self.from_id = from_id
+        self.date = date
+        self.text = text
+        self.postponed_id = postponed_id
+        self._attachments_raw = attachments_raw
+
+    @classmethod
+    def from_item(cls, item: dict[str, Any]) -> "CompactPost":
+        # item is one element of an already parsed response; the parsed
+        # attachments become garbage as soon as the response dict does.
+        attachments = item.get("attachments")
+        return cls(
+            int(item["id"]),
+            int(item["owner_id"]),
+            from_id=_optional_int(item.get("from_id")),
+            date=_optional_int(item.get("date")),
+            text=str(item.get("text") or ""),
+            postponed_id=_optional_int(item.get("postponed_id")),
+            attachments_raw=_json.dumps(attachments) if attachments else b"",
+        )
+
+    @property
+    def attachments_raw(self) -> bytes:
+        return self._attachments_raw
+
+    @property
+    def has_attachments(self) -> bool:
+        return bool(self._attachments_raw)
+
+    @property
+    def attachments(self) -> list[dict[str, Any]]:
+        if not self._attachments_raw:
+            return []
+        return _json.loads(self._attachments_raw)
+
+    def to_post(self) -> Post:
+        # Fields were already coerced in from_item, so skip re-validation.
+        return Post.model_construct(
+            id=self.id,
+            owner_id=self.owner_id,
+            from_id=self.from_id,
+            date=self.date,
+            text=self.text,
+            attachments=self.attachments,
+            postponed_id=self.postponed_id,
+        )
+
+    def __eq__(self, other: object) -> bool:
+        if not isinstance(other, CompactPost):
+            return NotImplemented
+        return all(getattr(self, name) == getattr(other, name) for name in self.__slots__)
+
+    __hash__ = None  # type: ignore[assignment]
+
+    def __repr__(self) -> str:
+        return (
+            f"CompactPost(id={self.id}, owner_id={self.owner_id}, date={self.date}, "
+            f"text={self.text[:40]!r}, attachments_bytes={len(self._attachments_raw)})"
+        )
+
+
+def _optional_int(value: Any) -> int | None:
+    return None if value is None else int(value)
+
+
+def compact_posts_from_items(items: Iterable[dict[str, Any]]) -> list[CompactPost]:
+    return [CompactPost.from_item(x) for x in items]
+
+
+__all__ = [
+    "CompactPost",
+    "compact_posts_from_items",
+]
@@ -9,6 +9,19 @@ class VKClientError(Exception):
     pass
 
 
+class VKTransportError(VKClientError):
+    # The request may or may not have reached VK.
+    is_retryable = True
+
+
+class VKTimeoutError(VKTransportError):
+    pass
+
+
+class VKCircuitOpenError(VKClientError):
+    is_retryable = False
+
+
 @dataclass
 class VKAPIError(VKClientError):
     error_code: int
@@ -159,8 +172,16 @@ def vk_api_error_from_payload(
     return VKAPIError(code, msg, req_params_list, method=method, params=params, is_retryable=False)
 
 
+def is_outage_error(exc: BaseException) -> bool:
+    # Failures that say VK itself is unavailable, as opposed to a bad request.
+    return isinstance(exc, (VKTransportError, VKInternalServerError))
+
+
 __all__ = [
     "VKClientError",
+    "VKTransportError",
+    "VKTimeoutError",
+    "VKCircuitOpenError",
     "VKAPIError",
     "VKAuthError",
     "VKAccessDeniedError",
@@ -173,6 +194,7 @@ __all__ = [
     "VKUnknownMethodError",
     "VKParameterError",
     "vk_api_error_from_payload",
+    "is_outage_error",
     "VKExceptionHandler",
     "vk_exception_handler",
 ]
@@ -0,0 +1,25 @@
+from __future__ import annotations
+
+from dataclasses import dataclass
+
+from .exceptions import VKClientError
+
+
+@dataclass(frozen=True)
+class FanoutResult:
+    group_id: int
+    post_id: int | None = None
+    error: VKClientError | None = None
+
+    @property
+    def ok(self) -> bool:
+        return self.error is None
+
+    def unwrap(self) -> int:
+        if self.error is not None:
+            raise self.error
+        assert self.post_id is not None
+        return self.post_id
+
+
+__all__ = ["FanoutResult"]
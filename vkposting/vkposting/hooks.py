@@ -0,0 +1,165 @@
+from __future__ import annotations
+
+import time
+from dataclasses import dataclass
+from types import SimpleNamespace
+from typing import Any
+
+import aiohttp
+
+
+@dataclass(frozen=True)
+class VKRequestEvent:
+    method: str
+    attempt: int
+    duration_s: float
+    # Time spent waiting for a rate limiter token before the request was sent.
+    queue_wait_s: float
+    error_code: int | None = None
+    error: BaseException | None = None
+
+    @property
+    def ok(self) -> bool:
+        return self.error is None
+
+
+@dataclass(frozen=True)
+class VKConnectionEvent:
+    method: str
+    host: str
+    reused: bool
+    # None when the address came from the DNS cache or the connection was reused.
+    dns_s: float | None = None
+    # TCP connect plus TLS handshake; aiohttp does not report them separately.
+    connect_s: float | None = None
+
+
+@dataclass(frozen=True)
+class VKCacheEvent:
+    method: str
+    layer: str
+    hit: bool
+
+
+@dataclass(frozen=True)
+class VKUploadEvent:
+    kind: str
+    files: int
+    bytes_sent: int
+    duration_s: float
+    error: BaseException | None = None
+
+
+class VKHooks:
+    # Subclass and override what you need. Callbacks run inline on the event
+    # loop, so they must be quick and must not raise.
+    def on_request_start(self, method: str, attempt: int) -> None:
+        pass
+
+    def on_request_end(self, event: VKRequestEvent) -> None:
+        pass
+
+    def on_connection(self, event: VKConnectionEvent) -> None:
+        pass
+
+    def on_cache(self, event: VKCacheEvent) -> None:
+        pass
+
+    def on_upload(self, event: VKUploadEvent) -> None:
+        pass
+
+
+class CompositeHooks(VKHooks):
+    def __init__(self, *hooks: VKHooks):
+        self._hooks = tuple(hooks)
+
+    def on_request_start(self, method: str, attempt: int) -> None:
+        for h in self._hooks:
+            h.on_request_start(method, attempt)
+
+    def on_request_end(self, event: VKRequestEvent) -> None:
+        for h in self._hooks:
+            h.on_request_end(event)
+
+    def on_connection(self, event: VKConnectionEvent) -> None:
+        for h in self._hooks:
+            h.on_connection(event)
+
+    def on_cache(self, event: VKCacheEvent) -> None:
+        for h in self._hooks:
+            h.on_cache(event)
+
+    def on_upload(self, event: VKUploadEvent) -> None:
+        for h in self._hooks:
+            h.on_upload(event)
+
+
+async def _on_request_start(session: Any, ctx: SimpleNamespace, params: Any) -> None:
+    ctx.dns_started = ctx.connect_started = None
+    ctx.dns_s = ctx.connect_s = None
+    ctx.reused = False
+
+
+async def _on_dns_start(session: Any, ctx: SimpleNamespace, params: Any) -> None:
+    ctx.dns_started = time.perf_counter()
+
+
+async def _on_dns_end(session: Any, ctx: SimpleNamespace, params: Any) -> None:
+    if ctx.dns_started is not None:
+        ctx.dns_s = time.perf_counter() - ctx.dns_started
+
+
+async def _on_connect_start(session: Any, ctx: SimpleNamespace, params: Any) -> None:
+    ctx.connect_started = time.perf_counter()
+
+
+async def _on_connect_end(session: Any, ctx: SimpleNamespace, params: Any) -> None:
+    if ctx.connect_started is not None:
+        # Resolution happens inside connection creation; report it separately.
+        ctx.connect_s = max(0.0, time.perf_counter() - ctx.connect_started - (ctx.dns_s or 0.0))
+
+
+async def _on_connection_reused(session: Any, ctx: SimpleNamespace, params: Any) -> None:
+    ctx.reused = True
+
+
+async def _on_request_done(session: Any, ctx: SimpleNamespace, params: Any) -> None:
+    request_ctx = ctx.trace_request_ctx
+    if not request_ctx or "hooks" not in request_ctx:
+        return
+    request_ctx["hooks"].on_connection(
+        VKConnectionEvent(
+            method=request_ctx["method"],
+            host=params.url.host or "",
+            reused=ctx.reused,
+            dns_s=ctx.dns_s,
+            connect_s=ctx.connect_s,
+        )
+    )
+
+
+def vk_trace_config() -> aiohttp.TraceConfig:
+    # Bridges aiohttp connection tracing to VKHooks.on_connection. Attach it to
+    # the session (VKSessionPool(trace_configs=...)); requests made without a
+    # hooks-carrying trace_request_ctx are ignored.
+    config = aiohttp.TraceConfig()
+    config.on_request_start.append(_on_request_start)
+    config.on_dns_resolvehost_start.append(_on_dns_start)
+    config.on_dns_resolvehost_end.append(_on_dns_end)
+    config.on_connection_create_start.append(_on_connect_start)
+    config.on_connection_create_end.append(_on_connect_end)
+    config.on_connection_reuseconn.append(_on_connection_reused)
+    config.on_request_end.append(_on_request_done)
+    config.on_request_exception.append(_on_request_done)
+    return config
+
+
+__all__ = [
+    "CompositeHooks",
+    "VKCacheEvent",
+    "VKConnectionEvent",
+    "VKHooks",
+    "VKRequestEvent",
+    "VKUploadEvent",
+    "vk_trace_config",
+]
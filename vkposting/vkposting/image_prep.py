@@ -0,0 +1,237 @@
+from __future__ import annotations
+
+import asyncio
+import contextlib
+import logging
+import multiprocessing
+import os
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+from pathlib import Path
+
+from .upload_cache import hash_file
+
+try:
+    import PIL
+except ImportError:  # pragma: no cover - optional dependency
+    PIL = None
+
+
+logger = logging.getLogger(__name__)
+
+# VK keeps wall photos at most 2560px on the long side; anything larger is
+# downscaled on their end after we paid to upload it.
+VK_MAX_PHOTO_SIDE = 2560
+
+_REENCODE_FORMATS = {"JPEG", "MPO", "PNG", "WEBP", "BMP", "TIFF"}
+
+# Files used this recently survive pruning even over the cap: a prepare()
+# call may have just handed them to an upload.
+_PRUNE_GRACE_S = 300
+
+
+def _prepare_sync(src: str, base: str, max_side: int, quality: int) -> str | None:
+    # Runs in a worker process. Writes base + ".jpg" (or ".png" for images
+    # with transparency) and returns that path, or None when the original
+    # should be uploaded as is.
+    from PIL import Image, ImageOps
+
+    with Image.open(src) as im:
+        if im.format not in _REENCODE_FORMATS:
+            return None
+        # Bake EXIF rotation into the pixels before the EXIF block is dropped.
+        im = ImageOps.exif_transpose(im)
+        if max(im.size) > max_side:
+            im.thumbnail((max_side, max_side), Image.Resampling.LANCZOS)
+
+        has_alpha = im.mode in ("RGBA", "LA", "PA") or (im.mode == "P" and "transparency" in im.info)
+        dst = base + (".png" if has_alpha else ".jpg")
+        tmp = f"{dst}.{os.getpid()}.tmp"
+        # Saving without exif/icc/info arguments strips all metadata.
+        if has_alpha:
+            im.save(tmp, format="PNG", optimize=True)
+        else:
+            if im.mode not in ("RGB", "L"):
+                im = im.convert("RGB")
+            im.save(tmp, format="JPEG", quality=quality, optimize=True, progressive=True)
+
+    size = os.path.getsize(tmp)
+    if size >= os.path.getsize(src):
+        os.unlink(tmp)
+        return None
+    os.replace(tmp, dst)
+    return dst
+
+
+@dataclass
+class ImagePrepStats:
+    files: int = 0
+    processed: int = 0
+    cache_hits: int = 0
+    # Unsupported, unreadable, or already smaller than a re-encode.
+    passthrough: int = 0
+    bytes_in: int = 0
+    bytes_out: int = 0
+
+    @property
+    def bytes_saved(self) -> int:
+        return self.bytes_in - self.bytes_out
+
+
+class ImagePreprocessor:
+    # Shrinks photos before upload: downsizes to max_side, strips metadata
+    # and re-encodes at `quality`. Decoding and encoding run in a process
+    # pool; results are cached on disk by content hash, so re-posting the
+    # same file costs one hash. The cache is pruned least-recently-used
+    # first once it exceeds max_cache_bytes; with max_cache_bytes=None the
+    # caller owns cleaning cache_dir. Share one instance across schedulers
+    # and close() it on shutdown.
+    def __init__(
+        self,
+        *,
+        max_side: int = VK_MAX_PHOTO_SIDE,
+        quality: int = 85,
+        max_workers: int | None = None,
+        cache_dir: str | os.PathLike[str] | None = None,
+        max_cache_bytes: int | None = 512 * 1024 * 1024,
+    ):
+        if PIL is None:
+            raise ImportError("ImagePreprocessor requires Pillow: pip install 'vkposting[images]'")
+        if max_side < 1:
+            raise ValueError("max_side must be >= 1")
+        if not 1 <= quality <= 95:
+            raise ValueError("quality must be in 1..95")
+        if max_cache_bytes is not None and max_cache_bytes < 0:
+            raise ValueError("max_cache_bytes must be >= 0")
+        self.max_side = max_side
+        self.quality = quality
+        self._max_workers = max_workers
+        self._max_cache_bytes = max_cache_bytes
+        self._cache_dir = Path(cache_dir) if cache_dir is not None else Path(tempfile.gettempdir()) / "vkposting-images"
+        self._executor: ProcessPoolExecutor | None = None
+        self.stats = ImagePrepStats()
+
+    async def __aenter__(self) -> "ImagePreprocessor":
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb) -> None:
+        self.close()
+
+    def close(self) -> None:
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+    def _get_executor(self) -> ProcessPoolExecutor:
+        if self._executor is None:
+            # spawn: forking a process that runs an event loop (and maybe
+            # other threads) is not safe.
+            self._executor = ProcessPoolExecutor(
+                max_workers=self._max_workers,
+                mp_context=multiprocessing.get_context("spawn"),
+            )
+        return self._executor
+
+    async def prepare(self, paths: list[Path]) -> list[Path]:
+        # Repeated paths and files with the same content are prepared once
+        # and map to the same output.
+        unique = list(dict.fromkeys(paths))
+        digests = dict(zip(unique, await asyncio.gather(*(hash_file(p) for p in unique))))
+        sources: dict[str, Path] = {}
+        for path in unique:
+            sources.setdefault(digests[path], path)
+
+        processed = self.stats.processed
+        results = await asyncio.gather(*(self._prepare_one(p, d) for d, p in sources.items()))
+        prepared = dict(zip(sources, results))
+        if self._max_cache_bytes is not None and self.stats.processed > processed:
+            await asyncio.to_thread(self._prune_cache, self._max_cache_bytes)
+        return [prepared[digests[p]] for p in paths]
+
+    def _prune_cache(self, max_bytes: int) -> None:
+        # Oldest mtime first; cache hits touch their file, so this is LRU.
+        entries: list[tuple[float, int, str]] = []
+        total = 0
+        with os.scandir(self._cache_dir) as it:
+            for entry in it:
+                try:
+                    if not entry.is_file():
+                        continue
+                    st = entry.stat()
+                except FileNotFoundError:
+                    continue
+                total += st.st_size
+                entries.append((st.st_mtime, st.st_size, entry.path))
+        if total <= max_bytes:
+            return
+
+        cutoff = time.time() - _PRUNE_GRACE_S
+        removed = 0
+        for mtime, size, path in sorted(entries):
+            if total <= max_bytes or mtime >= cutoff:
+                break
+            with contextlib.suppress(FileNotFoundError):
+                os.unlink(path)
+            total -= size
+            removed += 1
+        logger.debug("Image cache pruned files=%d size=%d", removed, total)
+
+    @staticmethod
+    def _touch(path: Path) -> None:
+        with contextlib.suppress(OSError):
+            os.utime(path)
+
+    async def _prepare_one(self, path: Path, digest: str) -> Path:
+        size_in = path.stat().st_size
+        self.stats.files += 1
+        self.stats.bytes_in += size_in
+
+        base = self._cache_dir / f"{digest}-{self.max_side}-q{self.quality}"
+        for cached in (base.with_suffix(".jpg"), base.with_suffix(".png")):
+            if cached.exists():
+                self._touch(cached)
+                self.stats.cache_hits += 1
+                self.stats.bytes_out += cached.stat().st_size
+                return cached
+        # Records "keep the original" so the file is not decoded again.
+        keep_marker = base.with_suffix(".orig")
+        if keep_marker.exists():
+            self._touch(keep_marker)
+            self.stats.cache_hits += 1
+            self.stats.passthrough += 1
+            self.stats.bytes_out += size_in
+            return path
+
+        self._cache_dir.mkdir(parents=True, exist_ok=True)
+        loop = asyncio.get_running_loop()
+        try:
+            out = await loop.run_in_executor(
+                self._get_executor(),
+                _prepare_sync,
+                str(path),
+                str(base),
+                self.max_side,
+                self.quality,
+            )
+        except Exception as exc:
+            # Not cached: a broken pool or a full disk may be temporary.
+            logger.warning("Image preprocessing failed for %s: %s", path.name, exc)
+            self.stats.passthrough += 1
+            self.stats.bytes_out += size_in
+            return path
+
+        if out is None:
+            keep_marker.touch()
+            self.stats.passthrough += 1
+            self.stats.bytes_out += size_in
+            return path
+
+        prepared = Path(out)
+        self.stats.processed += 1
+        self.stats.bytes_out += prepared.stat().st_size
+        return prepared
+
+
+__all__ = ["ImagePreprocessor", "ImagePrepStats", "VK_MAX_PHOTO_SIDE"]
@@ -0,0 +1,118 @@
+from __future__ import annotations
+
+import asyncio
+from typing import Awaitable, Callable, Generic, Hashable, TypeVar
+
+
+# wall.getById accepts at most 100 posts per call.
+WALL_GET_BY_ID_MAX = 100
+
+K = TypeVar("K", bound=Hashable)
+V = TypeVar("V")
+
+
+class BatchLoader(Generic[K, V]):
+    # Collects load() calls made in the same event-loop tick (or within
+    # window_s) and resolves them with a single fetch of all keys.
+    def __init__(
+        self,
+        fetch: Callable[[list[K]], Awaitable[dict[K, V]]],
+        *,
+        window_s: float = 0.0,
+        max_batch: int = WALL_GET_BY_ID_MAX,
+    ):
+        if window_s < 0:
+            raise ValueError("window_s must be >= 0")
+        if max_batch < 1:
+            raise ValueError("max_batch must be >= 1")
+        self._fetch = fetch
+        self._window_s = window_s
+        self._max_batch = max_batch
+        self._pending: dict[K, asyncio.Future[V | None]] = {}
+        self._handle: asyncio.Handle | asyncio.TimerHandle | None = None
+        self._tasks: set[asyncio.Task[None]] = set()
+
+    @property
+    def has_pending(self) -> bool:
+        return bool(self._pending)
+
+    async def load(self, key: K) -> V | None:
+        loop = asyncio.get_running_loop()
+        fut = self._pending.get(key)
+        if fut is None:
+            fut = loop.create_future()
+            self._pending[key] = fut
+            if len(self._pending) >= self._max_batch:
+                self._dispatch()
+            elif self._handle is None:
+                if self._window_s > 0:
+                    self._handle = loop.call_later(self._window_s, self._dispatch)
+                else:
+                    self._handle = loop.call_soon(self._dispatch)
+        # Shield so one cancelled caller does not cancel the shared result.
+        return await asyncio.shield(fut)
+
+    def _dispatch(self) -> None:
+        if self._handle is not None:
+            self._handle.cancel()
+            self._handle = None
+        batch, self._pending = self._pending, {}
+        if not batch:
+            return
+        task = asyncio.ensure_future(self._run(batch))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    async def _run(self, batch: dict[K, asyncio.Future[V | None]]) -> None:
+        try:
+            found = await self._fetch(list(batch))
+        except BaseException as e:
+            for fut in batch.values():
+                if not fut.done():
+                    fut.set_exception(e)
+                    # Mark as retrieved in case every waiter was cancelled.
+                    fut.exception()
+            if not isinstance(e, Exception):
+                raise
+            return
+        for key, fut in batch.items():
+            if not fut.done():
+                fut.set_result(found.get(key))
+
+
+class BatchLoaderRegistry(Generic[K, V]):
+    # One BatchLoader per scope (token and wall), shared by every scheduler
+    # built for that scope, so loads from concurrent requests coalesce too.
+    # A loader is dropped once nothing is pending on it; a batch already in
+    # flight keeps its own reference.
+    def __init__(self, *, window_s: float = 0.0, max_batch: int = WALL_GET_BY_ID_MAX):
+        if window_s < 0:
+            raise ValueError("window_s must be >= 0")
+        if max_batch < 1:
+            raise ValueError("max_batch must be >= 1")
+        self._window_s = window_s
+        self._max_batch = max_batch
+        self._loaders: dict[Hashable, BatchLoader[K, V]] = {}
+
+    def __len__(self) -> int:
+        return len(self._loaders)
+
+    async def load(self, scope: Hashable, key: K, fetch: Callable[[list[K]], Awaitable[dict[K, V]]]) -> V | None:
+        # fetch is only used when the scope has no loader yet; every caller
+        # of a scope must fetch the same data.
+        loader = self._loaders.get(scope)
+        if loader is None:
+            loader = BatchLoader(fetch, window_s=self._window_s, max_batch=self._max_batch)
+            self._loaders[scope] = loader
+        try:
+            return await loader.load(key)
+        finally:
+            if not loader.has_pending and self._loaders.get(scope) is loader:
+                del self._loaders[scope]
+
+
+__all__ = [
+    "WALL_GET_BY_ID_MAX",
+    "BatchLoader",
+    "BatchLoaderRegistry",
+]
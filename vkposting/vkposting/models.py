@@ -3,7 +3,7 @@ from __future__ import annotations
 from datetime import datetime, timezone
 from typing import Any
 
-from pydantic import BaseModel, Field, field_validator, model_validator
+from pydantic import BaseModel, Field, TypeAdapter, field_validator, model_validator
 
 
 class Post(BaseModel):
@@ -19,6 +19,17 @@ class Post(BaseModel):
     postponed_id: int | None = None
 
 
+# Validates a whole wall.get page in one pass instead of per item.
+POST_LIST_ADAPTER: TypeAdapter[list[Post]] = TypeAdapter(list[Post])
+
+
+def get_by_id_items(resp: Any) -> list[dict[str, Any]]:
+    # Newer API versions wrap the wall.getById list in {"items": [...]}.
+    if isinstance(resp, dict):
+        return resp.get("items") or []
+    return resp or []
+
+
 class PostCreate(BaseModel):
     message: str = Field(min_length=1)
     publish_date: int = Field(default=0, description="Unix timestamp; 0 means publish immediately")
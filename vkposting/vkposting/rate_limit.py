@@ -0,0 +1,158 @@
+from __future__ import annotations
+
+import asyncio
+import hashlib
+import time
+from collections import OrderedDict
+
+
+# VK allows 3 requests/second for user tokens and 20 for community tokens.
+USER_TOKEN_RPS = 3.0
+GROUP_TOKEN_RPS = 20.0
+
+
+class TokenBucket:
+    def __init__(
+        self,
+        rate: float,
+        *,
+        burst: float | None = None,
+        min_rate: float = 0.5,
+        decrease_factor: float = 0.5,
+        recovery_step: float = 0.5,
+        recovery_interval_s: float = 5.0,
+    ):
+        if rate <= 0:
+            raise ValueError("rate must be > 0")
+        if not 0 < decrease_factor < 1:
+            raise ValueError("decrease_factor must be in (0, 1)")
+        self.max_rate = float(rate)
+        self.rate = float(rate)
+        self.min_rate = min(float(min_rate), self.max_rate)
+        self.capacity = float(burst) if burst is not None else max(1.0, self.max_rate)
+        self._decrease_factor = decrease_factor
+        self._recovery_step = recovery_step
+        self._recovery_interval_s = recovery_interval_s
+        self._tokens = self.capacity
+        self._updated_at = time.monotonic()
+        self._adjusted_at = self._updated_at
+        # asyncio.Lock wakes waiters in FIFO order, so callers queue fairly.
+        self._lock = asyncio.Lock()
+
+    def _refill(self, now: float) -> None:
+        elapsed = now - self._updated_at
+        if elapsed > 0:
+            self._tokens = min(self.capacity, self._tokens + elapsed * self.rate)
+            self._updated_at = now
+
+    async def acquire(self) -> float:
+        started = time.monotonic()
+        async with self._lock:
+            while True:
+                now = time.monotonic()
+                self._refill(now)
+                if self._tokens >= 1.0:
+                    self._tokens -= 1.0
+                    break
+                await asyncio.sleep((1.0 - self._tokens) / self.rate)
+        return time.monotonic() - started
+
+    def penalize(self) -> None:
+        now = time.monotonic()
+        self._refill(now)
+        self.rate = max(self.min_rate, self.rate * self._decrease_factor)
+        self._tokens = min(self._tokens, 0.0)
+        self._adjusted_at = now
+
+    def record_success(self) -> None:
+        if self.rate >= self.max_rate:
+            return
+        now = time.monotonic()
+        if now - self._adjusted_at < self._recovery_interval_s:
+            return
+        self._refill(now)
+        self.rate = min(self.max_rate, self.rate + self._recovery_step)
+        self._adjusted_at = now
+
+
+class VKRateLimiter:
+    def __init__(
+        self,
+        requests_per_second: float = USER_TOKEN_RPS,
+        *,
+        burst: float | None = None,
+        min_rate: float = 0.5,
+        decrease_factor: float = 0.5,
+        recovery_step: float = 0.5,
+        recovery_interval_s: float = 5.0,
+        idle_ttl_s: float = 600.0,
+    ):
+        if requests_per_second <= 0:
+            raise ValueError("requests_per_second must be > 0")
+        if idle_ttl_s <= 0:
+            raise ValueError("idle_ttl_s must be > 0")
+        self._bucket_kwargs = {
+            "rate": requests_per_second,
+            "burst": burst,
+            "min_rate": min_rate,
+            "decrease_factor": decrease_factor,
+            "recovery_step": recovery_step,
+            "recovery_interval_s": recovery_interval_s,
+        }
+        # Least recently used first. A bucket idle for idle_ttl_s has refilled
+        # long ago and is dropped; one that comes back starts fresh.
+        self._buckets: OrderedDict[str, tuple[TokenBucket, float]] = OrderedDict()
+        self._idle_ttl_s = idle_ttl_s
+
+    def __len__(self) -> int:
+        return len(self._buckets)
+
+    @staticmethod
+    def _key(access_token: str) -> str:
+        # Buckets are keyed by a digest so raw tokens are not kept around.
+        return hashlib.sha256(access_token.encode("utf-8")).hexdigest()[:32]
+
+    def bucket(self, access_token: str) -> TokenBucket:
+        now = time.monotonic()
+        self._evict_idle(now)
+        key = self._key(access_token)
+        entry = self._buckets.pop(key, None)
+        bucket = entry[0] if entry is not None else TokenBucket(**self._bucket_kwargs)
+        self._buckets[key] = (bucket, now)
+        return bucket
+
+    def _evict_idle(self, now: float) -> None:
+        while self._buckets:
+            key, (bucket, used_at) = next(iter(self._buckets.items()))
+            # A held lock means callers are still queued on this bucket.
+            if now - used_at < self._idle_ttl_s or bucket._lock.locked():
+                return
+            del self._buckets[key]
+
+    async def acquire(self, access_token: str) -> float:
+        return await self.bucket(access_token).acquire()
+
+    def penalize(self, access_token: str) -> None:
+        self.bucket(access_token).penalize()
+
+    def record_success(self, access_token: str) -> None:
+        self.bucket(access_token).record_success()
+
+
+_default_rate_limiter: VKRateLimiter | None = None
+
+
+def get_default_rate_limiter() -> VKRateLimiter:
+    global _default_rate_limiter
+    if _default_rate_limiter is None:
+        _default_rate_limiter = VKRateLimiter()
+    return _default_rate_limiter
+
+
+__all__ = [
+    "USER_TOKEN_RPS",
+    "GROUP_TOKEN_RPS",
+    "TokenBucket",
+    "VKRateLimiter",
+    "get_default_rate_limiter",
+]
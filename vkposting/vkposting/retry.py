@@ -0,0 +1,152 @@
+from __future__ import annotations
+
+import random
+import time
+from dataclasses import dataclass
+
+from .cache import WRITE_METHODS
+from .exceptions import VKCircuitOpenError, VKTransportError
+
+
+# Methods that must not be blindly resent after a transport error: the
+# first attempt may already have created the post/doc/video.
+NON_IDEMPOTENT_METHODS = WRITE_METHODS | frozenset({"execute", "docs.save", "photos.saveWallPhoto", "video.save"})
+
+
+@dataclass(frozen=True)
+class RetryPolicy:
+    max_attempts: int = 4
+    base_delay_s: float = 0.35
+    max_delay_s: float = 8.0
+    # Total time budget for one call including retries; wins over max_attempts.
+    deadline_s: float | None = None
+    retry_writes_on_transport_error: bool = False
+
+    def __post_init__(self) -> None:
+        if self.max_attempts < 1:
+            raise ValueError("max_attempts must be >= 1")
+        if self.base_delay_s < 0 or self.max_delay_s < 0:
+            raise ValueError("delays must be >= 0")
+        if self.deadline_s is not None and self.deadline_s <= 0:
+            raise ValueError("deadline_s must be > 0")
+
+    def backoff(self, attempt: int) -> float:
+        # Exponential backoff with full jitter.
+        cap = min(self.max_delay_s, self.base_delay_s * (2 ** max(0, attempt - 1)))
+        return random.uniform(0, cap)
+
+    def should_retry(
+        self,
+        exc: BaseException,
+        *,
+        method: str,
+        attempt: int,
+        started_at: float | None = None,
+    ) -> bool:
+        # With a deadline the remaining budget decides; max_attempts only
+        # bounds calls that have no deadline.
+        remaining = self.remaining_s(started_at) if started_at is not None else None
+        if remaining is not None:
+            if remaining <= 0:
+                return False
+        elif attempt >= self.max_attempts:
+            return False
+        if isinstance(exc, VKTransportError) and method in NON_IDEMPOTENT_METHODS:
+            return self.retry_writes_on_transport_error
+        return bool(getattr(exc, "is_retryable", False))
+
+    def remaining_s(self, started_at: float) -> float | None:
+        if self.deadline_s is None:
+            return None
+        return self.deadline_s - (time.monotonic() - started_at)
+
+
+class CircuitBreaker:
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+    def __init__(self, *, failure_threshold: int = 5, reset_timeout_s: float = 30.0, half_open_max_calls: int = 1):
+        if failure_threshold < 1:
+            raise ValueError("failure_threshold must be >= 1")
+        if half_open_max_calls < 1:
+            raise ValueError("half_open_max_calls must be >= 1")
+        self._failure_threshold = failure_threshold
+        self._reset_timeout_s = reset_timeout_s
+        self._half_open_max_calls = half_open_max_calls
+        self._state = self.CLOSED
+        self._failures = 0
+        self._opened_at = 0.0
+        self._probes = 0
+
+    @property
+    def state(self) -> str:
+        if self._state == self.OPEN and time.monotonic() - self._opened_at >= self._reset_timeout_s:
+            return self.HALF_OPEN
+        return self._state
+
+    def before_call(self, method: str | None = None) -> None:
+        state = self.state
+        if state == self.CLOSED:
+            return
+        if state == self.HALF_OPEN:
+            if self._state == self.OPEN:
+                self._state = self.HALF_OPEN
+                self._probes = 0
+            if self._probes < self._half_open_max_calls:
+                self._probes += 1
+                return
+        raise VKCircuitOpenError(f"VK circuit is open for {method or 'method'}; failing fast")
+
+    def record_success(self) -> None:
+        self._state = self.CLOSED
+        self._failures = 0
+        self._probes = 0
+
+    def abort_call(self) -> None:
+        # The call ended without a verdict (cancelled, or a non-VK error). A
+        # probe that vanishes would hold its half-open slot forever, so it
+        # counts as failed; calls made while closed count for nothing.
+        if self._state == self.HALF_OPEN:
+            self.record_failure()
+
+    def release_probe(self) -> None:
+        # VK answered, but with an error that says nothing about its health
+        # (throttling, bad params). Neither close nor reopen the circuit, just
+        # free the half-open slot so another probe can run.
+        if self._state == self.HALF_OPEN and self._probes > 0:
+            self._probes -= 1
+
+    def record_failure(self) -> None:
+        self._failures += 1
+        if self._state == self.HALF_OPEN or self._failures >= self._failure_threshold:
+            self._state = self.OPEN
+            self._opened_at = time.monotonic()
+            self._probes = 0
+
+
+class CircuitBreakerRegistry:
+    # One breaker per (method, token); share the registry across schedulers.
+    def __init__(self, *, failure_threshold: int = 5, reset_timeout_s: float = 30.0, half_open_max_calls: int = 1):
+        self._kwargs = {
+            "failure_threshold": failure_threshold,
+            "reset_timeout_s": reset_timeout_s,
+            "half_open_max_calls": half_open_max_calls,
+        }
+        self._breakers: dict[tuple[str, str], CircuitBreaker] = {}
+
+    def get(self, method: str, token_key: str) -> CircuitBreaker:
+        key = (method, token_key)
+        breaker = self._breakers.get(key)
+        if breaker is None:
+            breaker = CircuitBreaker(**self._kwargs)
+            self._breakers[key] = breaker
+        return breaker
+
+
+__all__ = [
+    "NON_IDEMPOTENT_METHODS",
+    "RetryPolicy",
+    "CircuitBreaker",
+    "CircuitBreakerRegistry",
+]
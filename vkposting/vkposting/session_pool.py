@@ -0,0 +1,77 @@
+from __future__ import annotations
+
+from typing import Iterable
+
+import aiohttp
+
+
+class VKSessionPool:
+    def __init__(
+        self,
+        *,
+        limit: int = 100,
+        limit_per_host: int = 20,
+        ttl_dns_cache_s: int = 300,
+        keepalive_timeout_s: float = 30.0,
+        timeout_s: float = 30.0,
+        trace_configs: Iterable[aiohttp.TraceConfig] = (),
+    ):
+        if limit < 0 or limit_per_host < 0:
+            raise ValueError("connection limits must be >= 0")
+        self._limit = limit
+        self._limit_per_host = limit_per_host
+        self._ttl_dns_cache_s = ttl_dns_cache_s
+        self._keepalive_timeout_s = keepalive_timeout_s
+        self._timeout = aiohttp.ClientTimeout(total=timeout_s)
+        self._trace_configs = list(trace_configs)
+        self._session: aiohttp.ClientSession | None = None
+
+    @property
+    def closed(self) -> bool:
+        return self._session is None or self._session.closed
+
+    def get_session(self) -> aiohttp.ClientSession:
+        # Must be called from a running event loop; the session is bound to it.
+        if self._session is None or self._session.closed:
+            connector = aiohttp.TCPConnector(
+                limit=self._limit,
+                limit_per_host=self._limit_per_host,
+                ttl_dns_cache=self._ttl_dns_cache_s,
+                use_dns_cache=True,
+                keepalive_timeout=self._keepalive_timeout_s,
+            )
+            self._session = aiohttp.ClientSession(
+                connector=connector,
+                timeout=self._timeout,
+                trace_configs=self._trace_configs or None,
+            )
+        return self._session
+
+    async def close(self) -> None:
+        if self._session is not None and not self._session.closed:
+            await self._session.close()
+        self._session = None
+
+
+_default_pool: VKSessionPool | None = None
+
+
+def get_default_session_pool() -> VKSessionPool:
+    global _default_pool
+    if _default_pool is None:
+        _default_pool = VKSessionPool()
+    return _default_pool
+
+
+async def close_default_session_pool() -> None:
+    global _default_pool
+    if _default_pool is not None:
+        await _default_pool.close()
+        _default_pool = None
+
+
+__all__ = [
+    "VKSessionPool",
+    "get_default_session_pool",
+    "close_default_session_pool",
+]
@@ -0,0 +1,37 @@
+from __future__ import annotations
+
+import asyncio
+from typing import Any, Awaitable, Callable, TypeVar
+
+
+T = TypeVar("T")
+
+
+class SingleFlight:
+    # Concurrent do() calls with the same key share one in-flight call and
+    # its result or exception. Nothing is kept once the call finishes.
+    def __init__(self) -> None:
+        self._inflight: dict[str, asyncio.Future[Any]] = {}
+
+    def __len__(self) -> int:
+        return len(self._inflight)
+
+    async def do(self, key: str, factory: Callable[[], Awaitable[T]]) -> T:
+        fut = self._inflight.get(key)
+        if fut is None:
+            fut = asyncio.ensure_future(factory())
+            self._inflight[key] = fut
+            fut.add_done_callback(lambda f: self._forget(key, f))
+        # A cancelled waiter must not cancel the call the others are sharing.
+        return await asyncio.shield(fut)
+
+    def _forget(self, key: str, fut: asyncio.Future[Any]) -> None:
+        if self._inflight.get(key) is fut:
+            del self._inflight[key]
+        if not fut.cancelled():
+            # Retrieve the exception so it is not reported as unhandled when
+            # every waiter has gone away.
+            fut.exception()
+
+
+__all__ = ["SingleFlight"]
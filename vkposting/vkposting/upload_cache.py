@@ -0,0 +1,126 @@
+from __future__ import annotations
+
+import asyncio
+import hashlib
+import mmap
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, Protocol
+
+
+_HASH_BLOCK_SIZE = 1024 * 1024
+
+
+class UploadCache(Protocol):
+    async def get(self, key: str) -> str | None: ...
+
+    async def set(self, key: str, attachment: str) -> None: ...
+
+
+def upload_cache_key(kind: str, group_id: int, digest: str) -> str:
+    return f"{kind}:{abs(group_id)}:{digest}"
+
+
+def _hash_file_sync(path: Path) -> str:
+    h = hashlib.sha256()
+    with path.open("rb") as f:
+        size = os.fstat(f.fileno()).st_size
+        if size == 0:
+            return h.hexdigest()
+        # mmap lets hashlib walk the file without copying it into Python memory.
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            view = memoryview(mm)
+            try:
+                for start in range(0, size, _HASH_BLOCK_SIZE):
+                    h.update(view[start : start + _HASH_BLOCK_SIZE])
+            finally:
+                view.release()
+    return h.hexdigest()
+
+
+async def hash_file(path: str | os.PathLike[str]) -> str:
+    return await asyncio.to_thread(_hash_file_sync, Path(path))
+
+
+class MemoryUploadCache:
+    def __init__(self, max_entries: int = 10_000):
+        if max_entries <= 0:
+            raise ValueError("max_entries must be > 0")
+        self._max_entries = max_entries
+        self._entries: OrderedDict[str, str] = OrderedDict()
+
+    async def get(self, key: str) -> str | None:
+        value = self._entries.get(key)
+        if value is not None:
+            self._entries.move_to_end(key)
+        return value
+
+    async def set(self, key: str, attachment: str) -> None:
+        self._entries[key] = attachment
+        self._entries.move_to_end(key)
+        while len(self._entries) > self._max_entries:
+            self._entries.popitem(last=False)
+
+
+class SQLiteUploadCache:
+    def __init__(self, path: str | os.PathLike[str]):
+        self._conn = sqlite3.connect(str(path), check_same_thread=False)
+        self._lock = threading.Lock()
+        with self._lock, self._conn:
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS upload_cache ("
+                "key TEXT PRIMARY KEY, attachment TEXT NOT NULL, created_at REAL NOT NULL)"
+            )
+
+    def _get_sync(self, key: str) -> str | None:
+        with self._lock:
+            row = self._conn.execute("SELECT attachment FROM upload_cache WHERE key = ?", (key,)).fetchone()
+        return row[0] if row else None
+
+    def _set_sync(self, key: str, attachment: str) -> None:
+        with self._lock, self._conn:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO upload_cache (key, attachment, created_at) VALUES (?, ?, ?)",
+                (key, attachment, time.time()),
+            )
+
+    async def get(self, key: str) -> str | None:
+        return await asyncio.to_thread(self._get_sync, key)
+
+    async def set(self, key: str, attachment: str) -> None:
+        await asyncio.to_thread(self._set_sync, key, attachment)
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+
+class RedisUploadCache:
+    # Accepts any redis.asyncio client; redis is not a dependency of vkposting.
+    def __init__(self, client: Any, *, prefix: str = "vk:upload:", ttl_s: int | None = None):
+        self._client = client
+        self._prefix = prefix
+        self._ttl_s = ttl_s
+
+    async def get(self, key: str) -> str | None:
+        value = await self._client.get(self._prefix + key)
+        if isinstance(value, bytes):
+            return value.decode("utf-8")
+        return value
+
+    async def set(self, key: str, attachment: str) -> None:
+        await self._client.set(self._prefix + key, attachment, ex=self._ttl_s)
+
+
+__all__ = [
+    "UploadCache",
+    "MemoryUploadCache",
+    "SQLiteUploadCache",
+    "RedisUploadCache",
+    "hash_file",
+    "upload_cache_key",
+]
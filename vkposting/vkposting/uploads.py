@@ -0,0 +1,163 @@
+from __future__ import annotations
+
+import asyncio
+import time
+import uuid
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Awaitable, Callable
+
+import aiohttp
+
+from . import _json
+from .exceptions import VKClientError
+
+
+DEFAULT_CHUNK_SIZE = 5 * 1024 * 1024
+
+
+@dataclass(frozen=True)
+class UploadProgress:
+    filename: str
+    bytes_sent: int
+    total_bytes: int
+    bytes_per_sec: float
+
+    @property
+    def fraction(self) -> float:
+        if self.total_bytes <= 0:
+            return 1.0
+        return self.bytes_sent / self.total_bytes
+
+
+ProgressCallback = Callable[[UploadProgress], None]
+
+
+async def gather_cancel_on_error(*aws: Awaitable[Any]) -> list[Any]:
+    # Like asyncio.gather, but the first failure cancels and awaits the
+    # siblings so no upload keeps running in the background.
+    tasks = [asyncio.ensure_future(a) for a in aws]
+    if not tasks:
+        return []
+    try:
+        _, pending = await asyncio.wait(tasks, return_when=asyncio.FIRST_EXCEPTION)
+    except BaseException:
+        for t in tasks:
+            t.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        raise
+
+    if pending:
+        for t in pending:
+            t.cancel()
+        await asyncio.gather(*pending, return_exceptions=True)
+
+    # Every exception is retrieved, not just the first, so asyncio does not
+    # log the others as never retrieved.
+    errors = [t.exception() for t in tasks if t.done() and not t.cancelled()]
+    first = next((e for e in errors if e is not None), None)
+    if first is not None:
+        raise first
+    return [t.result() for t in tasks]
+
+
+def _acknowledged_end(body: bytes, fallback: int) -> int:
+    # Partial chunks are answered with the received ranges, e.g.
+    # "0-1048575/52428800" or "0-1048575,2097152-3145727/52428800".
+    # Only the contiguous prefix starting at 0 counts as acknowledged.
+    try:
+        ranges_part = body.decode("ascii").strip().split("/", 1)[0]
+        ranges = sorted(tuple(int(x) for x in r.split("-", 1)) for r in ranges_part.split(",") if r)
+    except (UnicodeDecodeError, ValueError):
+        return fallback
+    acked = 0
+    for start, end in ranges:
+        if start > acked:
+            break
+        acked = max(acked, end + 1)
+    return acked if ranges else fallback
+
+
+async def upload_file_chunked(
+    session: aiohttp.ClientSession,
+    url: str,
+    path: Path,
+    *,
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+    timeout: aiohttp.ClientTimeout | None = None,
+    max_retries: int = 5,
+    retry_delay_s: float = 1.0,
+    progress: ProgressCallback | None = None,
+) -> Any:
+    if chunk_size <= 0:
+        raise ValueError("chunk_size must be > 0")
+    total = path.stat().st_size
+    if total == 0:
+        raise ValueError(f"file is empty: {path}")
+
+    session_id = uuid.uuid4().hex
+    offset = 0
+    failures = 0
+    started = time.monotonic()
+
+    with path.open("rb") as f:
+        while True:
+            end = min(offset + chunk_size, total) - 1
+            f.seek(offset)
+            # Only one chunk is held in memory at a time.
+            chunk = await asyncio.to_thread(f.read, end - offset + 1)
+            headers = {
+                "Content-Type": "application/octet-stream",
+                "Content-Disposition": f'attachment; filename="{path.name}"',
+                "Content-Range": f"bytes {offset}-{end}/{total}",
+                "Session-ID": session_id,
+            }
+            try:
+                async with session.post(url, data=chunk, headers=headers, timeout=timeout) as resp:
+                    status = resp.status
+                    body = await resp.read()
+            except (asyncio.TimeoutError, aiohttp.ClientError) as e:
+                failures += 1
+                if failures > max_retries:
+                    raise VKClientError(f"VK chunked upload failed at offset {offset}: {e!r}") from e
+                # Resend from the last acknowledged offset.
+                await asyncio.sleep(retry_delay_s * failures)
+                continue
+
+            if status >= 400:
+                raise VKClientError(f"VK chunked upload returned HTTP {status}")
+
+            acked = total if status == 200 else _acknowledged_end(body, end + 1)
+            if acked <= offset:
+                failures += 1
+                if failures > max_retries:
+                    raise VKClientError(f"VK chunked upload made no progress at offset {offset}")
+                await asyncio.sleep(retry_delay_s * failures)
+                continue
+            failures = 0
+            if progress is not None:
+                elapsed = max(time.monotonic() - started, 1e-9)
+                progress(
+                    UploadProgress(
+                        filename=path.name,
+                        bytes_sent=acked,
+                        total_bytes=total,
+                        bytes_per_sec=acked / elapsed,
+                    )
+                )
+
+            if status == 200:
+                try:
+                    return _json.loads(body)
+                except ValueError as e:
+                    raise VKClientError("VK chunked upload returned unexpected response") from e
+            offset = min(acked, total)
+
+
+__all__ = [
+    "DEFAULT_CHUNK_SIZE",
+    "UploadProgress",
+    "ProgressCallback",
+    "gather_cancel_on_error",
+    "upload_file_chunked",
+]
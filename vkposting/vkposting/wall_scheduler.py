@@ -2,35 +2,68 @@ from __future__ import annotations
 
 import asyncio
 import contextlib
+import copy
+import hashlib
 import logging
 import os
-from dataclasses import dataclass
-from pathlib import Path
-from typing import Any, Optional
 import time
+from collections import deque
+from pathlib import Path
+from typing import Any, AsyncIterator, Iterable, Iterator, Mapping, Optional
 
 import aiohttp
 from dotenv import load_dotenv
 
+from . import _json
+from .batch import BatchItemResult, VKBatch
+from .cache import (
+    CACHEABLE_METHODS,
+    WRITE_METHODS,
+    RedisResponseCache,
+    ResponseCache,
+    owner_ids_of,
+    response_cache_key,
+)
+from .compact import CompactPost, compact_posts_from_items
 from .exceptions import (
     VKAPIError,
     VKAuthError,
     VKAccessDeniedError,
     VKClientError,
+    VKFloodControlError,
     VKNotFoundError,
     VKRateLimitError,
+    VKTimeoutError,
+    VKTransportError,
+    is_outage_error,
     vk_api_error_from_payload,
 )
-from .models import Post, PostCreate, PostEdit
+from .fanout import FanoutResult
+from .hooks import VKCacheEvent, VKHooks, VKRequestEvent, VKUploadEvent, vk_trace_config
+from .image_prep import ImagePreprocessor
+from .loader import WALL_GET_BY_ID_MAX, BatchLoader, BatchLoaderRegistry
+from .models import POST_LIST_ADAPTER, Post, PostCreate, PostEdit, get_by_id_items
+from .rate_limit import VKRateLimiter, get_default_rate_limiter
+from .retry import CircuitBreakerRegistry, RetryPolicy
+from .session_pool import VKSessionPool
+from .singleflight import SingleFlight
+from .upload_cache import UploadCache, hash_file, upload_cache_key
+from .uploads import ProgressCallback, gather_cancel_on_error, upload_file_chunked
 
 
 logger = logging.getLogger(__name__)
 
+DEFAULT_API_BASE_URL = "https://api.vk.com/method"
+
+
+async def _empty_attachments() -> list[str]:
+    return []
+
 
-@dataclass(frozen=True)
-class _CacheEntry:
-    expires_at: float
-    value: Any
+def _parse_posts(items: list[dict[str, Any]], compact: bool) -> list[Post] | list[CompactPost]:
+    if compact:
+        return compact_posts_from_items(items)
+    return POST_LIST_ADAPTER.validate_python(items)
 
 
 class VKWallScheduler:
@@ -42,20 +75,61 @@ class VKWallScheduler:
         *,
         timeout_s: float = 30.0,
         cache_ttl_s: float = 0.0,
+        session_pool: VKSessionPool | None = None,
+        rate_limiter: VKRateLimiter | None = None,
+        upload_concurrency: int = 4,
+        video_chunk_size: int | None = None,
+        upload_progress: ProgressCallback | None = None,
+        upload_cache: UploadCache | None = None,
+        cache: ResponseCache | None = None,
+        shared_cache: RedisResponseCache | None = None,
+        get_by_id_batch_window_s: float = 0.0,
+        post_loaders: BatchLoaderRegistry[int, Post] | None = None,
+        single_flight: SingleFlight | None = None,
+        retry_policy: RetryPolicy | None = None,
+        circuit_breakers: CircuitBreakerRegistry | None = None,
+        api_base_url: str = DEFAULT_API_BASE_URL,
+        hooks: VKHooks | None = None,
+        image_preprocessor: ImagePreprocessor | None = None,
     ):
         if not access_token:
             raise ValueError("access_token is required")
         if group_id == 0:
             raise ValueError("group_id must be non-zero")
+        if upload_concurrency < 1:
+            raise ValueError("upload_concurrency must be >= 1")
         self._access_token = access_token
+        self._token_key = hashlib.sha256(access_token.encode("utf-8")).hexdigest()[:16]
         self._group_id = group_id
         self._api_version = api_version
+        self._api_base_url = api_base_url.rstrip("/")
         self._timeout = aiohttp.ClientTimeout(total=timeout_s)
         self._session: aiohttp.ClientSession | None = None
-        self._cache_ttl_s = float(cache_ttl_s)
-        self._cache: dict[str, _CacheEntry] = {}
-        self._max_retries = 3
-        self._retry_base_delay_s = 0.35
+        self._session_pool = session_pool
+        self._rate_limiter = rate_limiter
+        self._upload_semaphore = asyncio.Semaphore(upload_concurrency)
+        self._video_chunk_size = video_chunk_size
+        self._upload_progress = upload_progress
+        self._upload_cache = upload_cache
+        if cache is None and cache_ttl_s > 0:
+            cache = ResponseCache(ttl_s=cache_ttl_s)
+        self._cache = cache
+        self._shared_cache = shared_cache
+        self._single_flight = single_flight if single_flight is not None else SingleFlight()
+        self._get_by_id_batch_window_s = get_by_id_batch_window_s
+        self._post_loader: BatchLoader[int, Post] = BatchLoader(
+            self._fetch_posts_by_ids,
+            window_s=get_by_id_batch_window_s,
+        )
+        # When set, get_post_by_id batches with every scheduler sharing the
+        # registry instead of only with calls on this instance.
+        self._post_loaders = post_loaders
+        # Set on with_group() siblings, which borrow the parent's session.
+        self._parent: VKWallScheduler | None = None
+        self._retry_policy = retry_policy or RetryPolicy()
+        self._circuit_breakers = circuit_breakers
+        self._hooks = hooks
+        self._image_preprocessor = image_preprocessor
 
     async def __aenter__(self) -> "VKWallScheduler":
         await self._ensure_session()
@@ -65,29 +139,50 @@ class VKWallScheduler:
         await self.close()
 
     async def close(self) -> None:
-        if self._session is not None and not self._session.closed:
+        # A session borrowed from a pool or a parent scheduler stays open.
+        if self._parent is None and self._session_pool is None and self._session is not None and not self._session.closed:
             await self._session.close()
         self._session = None
 
     async def _ensure_session(self) -> None:
+        if self._parent is not None:
+            await self._parent._ensure_session()
+            self._session = self._parent._session
+            return
         if self._session is None or self._session.closed:
-            self._session = aiohttp.ClientSession(timeout=self._timeout)
-
-    def _cache_get(self, key: str) -> Any | None:
-        if self._cache_ttl_s <= 0:
-            return None
-        entry = self._cache.get(key)
-        if not entry:
-            return None
-        if time.time() >= entry.expires_at:
-            self._cache.pop(key, None)
-            return None
-        return entry.value
-
-    def _cache_set(self, key: str, value: Any) -> None:
-        if self._cache_ttl_s <= 0:
+            if self._session_pool is not None:
+                self._session = self._session_pool.get_session()
+            else:
+                trace_configs = [vk_trace_config()] if self._hooks is not None else None
+                self._session = aiohttp.ClientSession(timeout=self._timeout, trace_configs=trace_configs)
+
+    def with_group(self, group_id: int) -> "VKWallScheduler":
+        # Same token, session, limiter, caches and hooks, aimed at another
+        # wall. Cheap enough to create per call; closing it is a no-op.
+        if group_id == 0:
+            raise ValueError("group_id must be non-zero")
+        sibling = copy.copy(self)
+        sibling._group_id = group_id
+        sibling._parent = self._parent or self
+        sibling._session = None
+        sibling._post_loader = BatchLoader(sibling._fetch_posts_by_ids, window_s=self._get_by_id_batch_window_s)
+        return sibling
+
+    @property
+    def cache(self) -> ResponseCache | None:
+        return self._cache
+
+    def _invalidate_after_write(self, params: dict[str, Any]) -> None:
+        if self._cache is None:
+            return
+        for owner_id in owner_ids_of(params):
+            self._cache.invalidate_owner(owner_id)
+
+    async def _invalidate_shared_after_write(self, params: dict[str, Any]) -> None:
+        if self._shared_cache is None:
             return
-        self._cache[key] = _CacheEntry(expires_at=time.time() + self._cache_ttl_s, value=value)
+        for owner_id in owner_ids_of(params):
+            await self._shared_cache.invalidate_owner(owner_id)
 
     def _sanitize_params_for_log(self, params: dict[str, Any]) -> dict[str, Any]:
         sanitized = dict(params)
@@ -96,78 +191,218 @@ class VKWallScheduler:
         return sanitized
 
     async def _vk_call(self, method: str, params: dict[str, Any]) -> Any:
+        if method not in CACHEABLE_METHODS:
+            try:
+                data = await self._vk_request(method, params)
+            finally:
+                # A write that timed out may still have been applied by VK.
+                if method in WRITE_METHODS:
+                    self._invalidate_after_write(params)
+                    await self._invalidate_shared_after_write(params)
+            return data.get("response")
+
+        cache_key = response_cache_key(method, params)
+        owners = owner_ids_of(params)
+        cached = await self._cache_lookup(method, cache_key, owners)
+        if cached is not None:
+            return cached
+
+        # Identical reads already in flight share a single request.
+        return await self._single_flight.do(
+            f"{self._token_key}:{cache_key}",
+            lambda: self._fetch_and_cache(method, params, cache_key, owners),
+        )
+
+    async def _cache_lookup(self, method: str, cache_key: str, owners: set[int]) -> Any | None:
+        hooks = self._hooks
+        if self._cache is not None:
+            cached = self._cache.get(cache_key)
+            if hooks is not None:
+                hooks.on_cache(VKCacheEvent(method=method, layer="local", hit=cached is not None))
+            if cached is not None:
+                return cached
+        if self._shared_cache is not None and len(owners) == 1:
+            cached = await self._shared_cache.get(cache_key, owner_id=next(iter(owners)))
+            if hooks is not None:
+                hooks.on_cache(VKCacheEvent(method=method, layer="shared", hit=cached is not None))
+            if cached is not None:
+                if self._cache is not None:
+                    self._cache.set(cache_key, cached, owners=owners)
+                return cached
+        return None
+
+    async def _fetch_and_cache(self, method: str, params: dict[str, Any], cache_key: str, owners: set[int]) -> Any:
+        # Generations are read before the request: a write that invalidates
+        # the owner while it is in flight makes the result too old to cache.
+        local_gens = self._cache.generations(owners) if self._cache is not None else None
+        shared_owner = next(iter(owners)) if self._shared_cache is not None and len(owners) == 1 else None
+        shared_gen = None
+        if shared_owner is not None:
+            shared_gen = await self._shared_cache.generation(shared_owner)
+
+        data = await self._vk_request(method, params)
+        result = data.get("response")
+        if self._cache is not None:
+            self._cache.set(cache_key, result, owners=owners, generations=local_gens)
+        if shared_owner is not None and shared_gen is not None:
+            await self._shared_cache.set(cache_key, result, owner_id=shared_owner, generation=shared_gen)
+        return result
+
+    async def _vk_request(self, method: str, params: dict[str, Any]) -> dict[str, Any]:
         await self._ensure_session()
         assert self._session is not None
 
-        url = f"https://api.vk.com/method/{method}"
+        url = f"{self._api_base_url}/{method}"
         req_params = {
             **params,
             "access_token": self._access_token,
             "v": self._api_version,
         }
 
-        cache_key = None
-        if method == "wall.get" and self._cache_ttl_s > 0:
-            cache_key = f"{method}:{sorted(req_params.items())}"
-            cached = self._cache_get(cache_key)
-            if cached is not None:
-                return cached
-
+        policy = self._retry_policy
+        breaker = self._circuit_breakers.get(method, self._token_key) if self._circuit_breakers is not None else None
+        hooks = self._hooks
+        trace_ctx = {"hooks": hooks, "method": method} if hooks is not None else None
+        started_at = time.monotonic()
         attempt = 0
         while True:
             attempt += 1
+            if breaker is not None:
+                breaker.before_call(method)
+            if hooks is not None:
+                hooks.on_request_start(method, attempt)
+            queue_wait_s = 0.0
+            attempt_started = time.monotonic()
             try:
-                async with self._session.post(url, data=req_params) as resp:
-                    data = await resp.json(content_type=None)
-            except asyncio.TimeoutError as e:
-                if attempt <= self._max_retries:
-                    await asyncio.sleep(self._retry_base_delay_s * attempt)
-                    continue
-                raise VKClientError("VK request timed out") from e
-            except aiohttp.ClientError as e:
-                if attempt <= self._max_retries:
-                    await asyncio.sleep(self._retry_base_delay_s * attempt)
-                    continue
-                raise VKClientError(f"VK HTTP client error: {e}") from e
-
-            if "error" in data:
-                err = data["error"]
-                exc = vk_api_error_from_payload(err, method=method, params=self._sanitize_params_for_log(req_params))
-
-                logger.warning(
-                    "VK API error method=%s code=%s msg=%s attempt=%s",
-                    method,
-                    exc.error_code,
-                    exc.error_msg,
-                    attempt,
+                if self._rate_limiter is not None:
+                    queue_wait_s = await self._rate_limiter.acquire(self._access_token)
+                    attempt_started = time.monotonic()
+                data = await self._post_api(url, req_params, self._attempt_timeout(started_at), trace_ctx=trace_ctx)
+                if "error" in data:
+                    exc = vk_api_error_from_payload(
+                        data["error"], method=method, params=self._sanitize_params_for_log(req_params)
+                    )
+                    logger.warning(
+                        "VK API error method=%s code=%s msg=%s attempt=%s",
+                        method,
+                        exc.error_code,
+                        exc.error_msg,
+                        attempt,
+                    )
+                    raise exc
+            except VKClientError as exc:
+                if hooks is not None:
+                    hooks.on_request_end(
+                        VKRequestEvent(
+                            method=method,
+                            attempt=attempt,
+                            duration_s=time.monotonic() - attempt_started,
+                            queue_wait_s=queue_wait_s,
+                            error_code=getattr(exc, "error_code", None),
+                            error=exc,
+                        )
+                    )
+                if breaker is not None:
+                    if is_outage_error(exc):
+                        breaker.record_failure()
+                    else:
+                        breaker.release_probe()
+                if self._rate_limiter is not None and isinstance(exc, (VKRateLimitError, VKFloodControlError)):
+                    self._rate_limiter.penalize(self._access_token)
+
+                if not policy.should_retry(exc, method=method, attempt=attempt, started_at=started_at):
+                    raise
+                delay = policy.backoff(attempt)
+                remaining = policy.remaining_s(started_at)
+                if remaining is not None and delay >= remaining:
+                    raise
+                await asyncio.sleep(delay)
+                continue
+            except BaseException:
+                if breaker is not None:
+                    breaker.abort_call()
+                raise
+
+            if hooks is not None:
+                hooks.on_request_end(
+                    VKRequestEvent(
+                        method=method,
+                        attempt=attempt,
+                        duration_s=time.monotonic() - attempt_started,
+                        queue_wait_s=queue_wait_s,
+                    )
                 )
-
-                if exc.is_retryable and attempt <= self._max_retries:
-                    await asyncio.sleep(self._retry_base_delay_s * attempt)
-                    continue
-
-                raise exc
-            break
-
-        result = data.get("response")
-        if cache_key is not None:
-            self._cache_set(cache_key, result)
-        return result
+            if breaker is not None:
+                breaker.record_success()
+            if self._rate_limiter is not None:
+                self._rate_limiter.record_success(self._access_token)
+            return data
+
+    def _attempt_timeout(self, started_at: float) -> aiohttp.ClientTimeout:
+        remaining = self._retry_policy.remaining_s(started_at)
+        if remaining is None or (self._timeout.total is not None and self._timeout.total <= remaining):
+            return self._timeout
+        return aiohttp.ClientTimeout(total=max(remaining, 0.001))
+
+    async def _post_api(
+        self,
+        url: str,
+        data: dict[str, Any],
+        timeout: aiohttp.ClientTimeout,
+        *,
+        trace_ctx: dict[str, Any] | None = None,
+    ) -> dict[str, Any]:
+        assert self._session is not None
+        try:
+            async with self._session.post(url, data=data, timeout=timeout, trace_request_ctx=trace_ctx) as resp:
+                body = await resp.read()
+        except asyncio.TimeoutError as e:
+            raise VKTimeoutError("VK request timed out") from e
+        except aiohttp.ClientError as e:
+            raise VKTransportError(f"VK HTTP client error: {e}") from e
+        try:
+            return _json.loads(body)
+        except ValueError as e:
+            # Usually an HTML error page from a proxy in front of VK.
+            raise VKTransportError("VK returned a non-JSON response") from e
 
     async def _upload_call(self, url: str, form: aiohttp.FormData) -> Any:
         await self._ensure_session()
         assert self._session is not None
 
         try:
-            async with self._session.post(url, data=form) as resp:
+            async with self._session.post(url, data=form, timeout=self._timeout) as resp:
                 data = await resp.json(content_type=None)
         except asyncio.TimeoutError as e:
-            raise VKClientError("VK upload request timed out") from e
+            raise VKTimeoutError("VK upload request timed out") from e
         except aiohttp.ClientError as e:
-            raise VKClientError(f"VK upload HTTP client error: {e}") from e
+            raise VKTransportError(f"VK upload HTTP client error: {e}") from e
 
         return data
 
+    @contextlib.contextmanager
+    def _track_upload(self, kind: str, paths: list[Path]) -> Iterator[None]:
+        hooks = self._hooks
+        if hooks is None:
+            yield
+            return
+        started = time.monotonic()
+        try:
+            yield
+        except BaseException as e:
+            hooks.on_upload(
+                VKUploadEvent(kind=kind, files=len(paths), bytes_sent=0, duration_s=time.monotonic() - started, error=e)
+            )
+            raise
+        hooks.on_upload(
+            VKUploadEvent(
+                kind=kind,
+                files=len(paths),
+                bytes_sent=sum(p.stat().st_size for p in paths),
+                duration_s=time.monotonic() - started,
+            )
+        )
+
     def _owner_id(self) -> int:
         # VK wall methods expect negative owner_id for communities.
         return -abs(self._group_id)
@@ -213,32 +448,66 @@ class VKWallScheduler:
         if len(paths) > 5:
             raise ValueError("VK limits wall photo upload to 5 files per request")
 
-        server = await self._vk_call(
-            "photos.getWallUploadServer",
-            {"group_id": self._group_id_positive()},
-        )
-        upload_url = (server or {}).get("upload_url")
-        if not upload_url:
-            raise VKClientError("VK returned no upload_url for photos")
-
-        form = aiohttp.FormData()
-        opened = []
-        try:
-            for i, path in enumerate(paths, start=1):
-                f = path.open("rb")
-                opened.append(f)
-                form.add_field(
-                    name=f"photo{i}",
-                    value=f,
-                    filename=path.name,
-                    content_type="application/octet-stream",
-                )
+        if self._upload_cache is None:
+            return await self._upload_wall_photo_files(paths)
+
+        digests = await asyncio.gather(*(hash_file(p) for p in paths))
+        keys = [upload_cache_key("photo", self._group_id, d) for d in digests]
+        cached = [await self._upload_cache.get(k) for k in keys]
+        missing = [i for i, hit in enumerate(cached) if hit is None]
+        if missing:
+            uploaded = await self._upload_wall_photo_files([paths[i] for i in missing])
+            if len(uploaded) != len(missing):
+                raise VKClientError("VK photo save returned unexpected number of photos")
+            for i, attachment in zip(missing, uploaded):
+                cached[i] = attachment
+                await self._upload_cache.set(keys[i], attachment)
+        return [x for x in cached if x is not None]
+
+    async def _upload_wall_photo_files(self, paths: list[Path]) -> list[str]:
+        # After the upload cache lookup, so cache hits never pay for decoding.
+        if self._image_preprocessor is not None:
+            paths = await self._image_preprocessor.prepare(paths)
+        # The same file listed twice (or two files that prepare() mapped to
+        # one cached output) is uploaded once.
+        unique = list(dict.fromkeys(paths))
+        if len(unique) == len(paths):
+            return await self._upload_photo_form(paths)
+        attachments = await self._upload_photo_form(unique)
+        if len(attachments) != len(unique):
+            raise VKClientError("VK photo save returned unexpected number of photos")
+        by_path = dict(zip(unique, attachments))
+        return [by_path[p] for p in paths]
+
+    async def _upload_photo_form(self, paths: list[Path]) -> list[str]:
+        async with self._upload_semaphore:
+            server = await self._vk_call(
+                "photos.getWallUploadServer",
+                {"group_id": self._group_id_positive()},
+            )
+            upload_url = (server or {}).get("upload_url")
+            if not upload_url:
+                raise VKClientError("VK returned no upload_url for photos")
 
-            uploaded = await self._upload_call(upload_url, form)
-        finally:
-            for f in opened:
-                with contextlib.suppress(Exception):
-                    f.close()
+            form = aiohttp.FormData()
+            opened = []
+            try:
+                for i, path in enumerate(paths, start=1):
+                    f = path.open("rb")
+                    opened.append(f)
+                    form.add_field(
+                        name=f"photo{i}",
+                        value=f,
+                        filename=path.name,
+                        content_type="application/octet-stream",
+                    )
+
+                with self._track_upload("photo", paths):
+                    uploaded = await self._upload_call(upload_url, form)
+            finally:
+                for f in opened:
+                    with contextlib.suppress(Exception):
+                        f.close()
 
         photo = uploaded.get("photo")
         server_id = uploaded.get("server")
@@ -266,13 +535,32 @@ class VKWallScheduler:
             attachments.append(self._to_attachment_string("photo", owner_id, media_id, access_key))
         return attachments
 
-    async def upload_videos(self, video_paths: list[str | os.PathLike[str]], *, name: str | None = None) -> list[str]:
+    async def upload_videos(
+        self,
+        video_paths: list[str | os.PathLike[str]],
+        *,
+        name: str | None = None,
+        chunk_size: int | None = None,
+        progress: ProgressCallback | None = None,
+    ) -> list[str]:
         paths = self._validate_files_exist(video_paths)
         if not paths:
             return []
+        chunk_size = chunk_size or self._video_chunk_size
+        progress = progress or self._upload_progress
+        return await gather_cancel_on_error(
+            *(self._upload_video(path, name=name, chunk_size=chunk_size, progress=progress) for path in paths)
+        )
 
-        attachments: list[str] = []
-        for path in paths:
+    async def _upload_video(
+        self,
+        path: Path,
+        *,
+        name: str | None = None,
+        chunk_size: int | None = None,
+        progress: ProgressCallback | None = None,
+    ) -> str:
+        async with self._upload_semaphore:
             resp = await self._vk_call(
                 "video.save",
                 {
@@ -288,43 +576,63 @@ class VKWallScheduler:
             if not upload_url:
                 raise VKClientError("VK returned no upload_url for video")
 
-            form = aiohttp.FormData()
-            f = None
-            try:
-                f = path.open("rb")
-                form.add_field(
-                    name="video_file",
-                    value=f,
-                    filename=path.name,
-                    content_type="application/octet-stream",
-                )
-                uploaded = await self._upload_call(upload_url, form)
-            finally:
-                if f is not None:
-                    with contextlib.suppress(Exception):
-                        f.close()
-
-            if "error" in uploaded:
-                raise VKClientError(f"VK video upload returned error: {uploaded.get('error')}")
-
-            if owner_id is None or video_id is None:
-                owner_id = uploaded.get("owner_id", owner_id)
-                video_id = uploaded.get("video_id", video_id)
-
-            if owner_id is None or video_id is None:
-                raise VKClientError("VK video upload returned unexpected response")
-
-            attachments.append(self._to_attachment_string("video", int(owner_id), int(video_id), access_key))
-
-        return attachments
+            if chunk_size:
+                await self._ensure_session()
+                assert self._session is not None
+                with self._track_upload("video", [path]):
+                    uploaded = await upload_file_chunked(
+                        self._session,
+                        upload_url,
+                        path,
+                        chunk_size=chunk_size,
+                        timeout=self._timeout,
+                        progress=progress,
+                    )
+            else:
+                form = aiohttp.FormData()
+                f = None
+                try:
+                    f = path.open("rb")
+                    form.add_field(
+                        name="video_file",
+                        value=f,
+                        filename=path.name,
+                        content_type="application/octet-stream",
+                    )
+                    with self._track_upload("video", [path]):
+                        uploaded = await self._upload_call(upload_url, form)
+                finally:
+                    if f is not None:
+                        with contextlib.suppress(Exception):
+                            f.close()
+
+        if "error" in uploaded:
+            raise VKClientError(f"VK video upload returned error: {uploaded.get('error')}")
+
+        if owner_id is None or video_id is None:
+            owner_id = uploaded.get("owner_id", owner_id)
+            video_id = uploaded.get("video_id", video_id)
+
+        if owner_id is None or video_id is None:
+            raise VKClientError("VK video upload returned unexpected response")
+
+        return self._to_attachment_string("video", int(owner_id), int(video_id), access_key)
 
     async def upload_docs(self, doc_paths: list[str | os.PathLike[str]]) -> list[str]:
         paths = self._validate_files_exist(doc_paths)
         if not paths:
             return []
+        return await gather_cancel_on_error(*(self._upload_doc(path) for path in paths))
 
-        attachments: list[str] = []
-        for path in paths:
+    async def _upload_doc(self, path: Path) -> str:
+        cache_key = None
+        if self._upload_cache is not None:
+            cache_key = upload_cache_key("doc", self._group_id, await hash_file(path))
+            cached = await self._upload_cache.get(cache_key)
+            if cached is not None:
+                return cached
+
+        async with self._upload_semaphore:
             server = await self._vk_call(
                 "docs.getWallUploadServer",
                 {"group_id": self._group_id_positive()},
@@ -343,7 +651,8 @@ class VKWallScheduler:
                     filename=path.name,
                     content_type="application/octet-stream",
                 )
-                uploaded = await self._upload_call(upload_url, form)
+                with self._track_upload("doc", [path]):
+                    uploaded = await self._upload_call(upload_url, form)
             finally:
                 if f is not None:
                     with contextlib.suppress(Exception):
@@ -360,23 +669,100 @@ class VKWallScheduler:
                     "title": path.stem,
                 },
             )
-            doc = (saved or {}).get("doc")
-            if not doc:
-                raise VKClientError("VK doc save returned unexpected response")
-            owner_id = int(doc.get("owner_id"))
-            media_id = int(doc.get("id"))
-            access_key = doc.get("access_key")
-            attachments.append(self._to_attachment_string("doc", owner_id, media_id, access_key))
+        doc = (saved or {}).get("doc")
+        if not doc:
+            raise VKClientError("VK doc save returned unexpected response")
+        owner_id = int(doc.get("owner_id"))
+        media_id = int(doc.get("id"))
+        access_key = doc.get("access_key")
+        attachment = self._to_attachment_string("doc", owner_id, media_id, access_key)
+        if cache_key is not None:
+            await self._upload_cache.set(cache_key, attachment)
+        return attachment
 
-        return attachments
+    async def _upload_media(
+        self,
+        photo_paths: Optional[list[str | os.PathLike[str]]] = None,
+        doc_paths: Optional[list[str | os.PathLike[str]]] = None,
+        video_paths: Optional[list[str | os.PathLike[str]]] = None,
+    ) -> tuple[list[str], list[str], list[str]]:
+        # Photos, docs and videos upload in parallel; each group keeps the
+        # caller's file order so the merged attachment list is deterministic.
+        photos, docs, videos = await gather_cancel_on_error(
+            self.upload_wall_photos(list(photo_paths)) if photo_paths else _empty_attachments(),
+            self.upload_docs(list(doc_paths)) if doc_paths else _empty_attachments(),
+            self.upload_videos(list(video_paths)) if video_paths else _empty_attachments(),
+        )
+        return photos, docs, videos
 
-    async def get_scheduled_posts(self, count: int = 10, offset: int = 0) -> list[Post]:
+    async def get_scheduled_posts(
+        self,
+        count: int = 10,
+        offset: int = 0,
+        *,
+        compact: bool = False,
+    ) -> list[Post] | list[CompactPost]:
         if count <= 0 or count > 100:
             raise ValueError("count must be in 1..100")
         if offset < 0:
             raise ValueError("offset must be >= 0")
 
-        resp = await self._vk_call(
+        resp = await self._get_postponed_page(count, offset)
+        return _parse_posts((resp or {}).get("items", []), compact)
+
+    async def iter_scheduled_posts(
+        self,
+        *,
+        page_size: int = 100,
+        prefetch: int = 10,
+        compact: bool = False,
+    ) -> AsyncIterator[Post | CompactPost]:
+        if page_size <= 0 or page_size > 100:
+            raise ValueError("page_size must be in 1..100")
+        if prefetch < 1:
+            raise ValueError("prefetch must be >= 1")
+
+        first = await self._get_postponed_page(page_size, 0)
+        total = int((first or {}).get("count", 0))
+        seen: set[int] = set()
+
+        # Posts can be published mid-iteration and shift later pages, so skip
+        # anything already yielded instead of emitting duplicates.
+        def fresh(resp: Any) -> list[Post | CompactPost]:
+            posts = []
+            for post in _parse_posts((resp or {}).get("items", []), compact):
+                if post.id not in seen:
+                    seen.add(post.id)
+                    posts.append(post)
+            return posts
+
+        for post in fresh(first):
+            yield post
+
+        offsets = iter(range(page_size, total, page_size))
+        pending: deque[asyncio.Task[Any]] = deque()
+
+        def fill() -> None:
+            while len(pending) < prefetch:
+                offset = next(offsets, None)
+                if offset is None:
+                    return
+                pending.append(asyncio.ensure_future(self._get_postponed_page(page_size, offset)))
+
+        try:
+            fill()
+            while pending:
+                resp = await pending.popleft()
+                fill()
+                for post in fresh(resp):
+                    yield post
+        finally:
+            for task in pending:
+                task.cancel()
+            await asyncio.gather(*pending, return_exceptions=True)
+
+    async def _get_postponed_page(self, count: int, offset: int) -> Any:
+        return await self._vk_call(
             "wall.get",
             {
                 "owner_id": self._owner_id(),
@@ -385,22 +771,34 @@ class VKWallScheduler:
                 "offset": offset,
             },
         )
-        items = (resp or {}).get("items", [])
-        return [Post.model_validate(x) for x in items]
 
     async def get_post_by_id(self, post_id: int) -> Post | None:
         if post_id <= 0:
             raise ValueError("post_id must be positive")
+        if self._post_loaders is not None:
+            return await self._post_loaders.load((self._token_key, self._owner_id()), post_id, self._fetch_posts_by_ids)
+        return await self._post_loader.load(post_id)
 
+    async def get_posts_by_ids(self, post_ids: Iterable[int]) -> list[Post | None]:
+        ids = list(post_ids)
+        if any(post_id <= 0 for post_id in ids):
+            raise ValueError("post_id must be positive")
+        unique = list(dict.fromkeys(ids))
+        chunks = [unique[i : i + WALL_GET_BY_ID_MAX] for i in range(0, len(unique), WALL_GET_BY_ID_MAX)]
+        found: dict[int, Post] = {}
+        for part in await asyncio.gather(*(self._fetch_posts_by_ids(chunk) for chunk in chunks)):
+            found.update(part)
+        return [found.get(post_id) for post_id in ids]
+
+    async def _fetch_posts_by_ids(self, post_ids: list[int]) -> dict[int, Post]:
+        owner_id = self._owner_id()
         resp = await self._vk_call(
             "wall.getById",
             {
-                "posts": f"{self._owner_id()}_{post_id}",
+                "posts": ",".join(f"{owner_id}_{post_id}" for post_id in post_ids),
             },
         )
-        if not resp:
-            return None
-        return Post.model_validate(resp[0])
+        return {post.id: post for post in POST_LIST_ADAPTER.validate_python(get_by_id_items(resp))}
 
     async def create_scheduled_post(
         self,
@@ -413,15 +811,7 @@ class VKWallScheduler:
         from_group: bool = True,
         **kwargs: Any,
     ) -> int:
-        uploaded_photos: list[str] = []
-        uploaded_docs: list[str] = []
-        uploaded_videos: list[str] = []
-        if photo_paths:
-            uploaded_photos = await self.upload_wall_photos(list(photo_paths))
-        if doc_paths:
-            uploaded_docs = await self.upload_docs(list(doc_paths))
-        if video_paths:
-            uploaded_videos = await self.upload_videos(list(video_paths))
+        uploaded_photos, uploaded_docs, uploaded_videos = await self._upload_media(photo_paths, doc_paths, video_paths)
 
         merged_attachments = self._merge_attachments(attachments or [], uploaded_photos, uploaded_docs, uploaded_videos)
 
@@ -433,6 +823,122 @@ class VKWallScheduler:
             **kwargs,
         )
 
+        resp = await self._vk_call("wall.post", self._post_params(payload))
+        return self._parse_post_id(resp)
+
+    async def fanout_create_scheduled_post(
+        self,
+        group_ids: Iterable[int],
+        message: str,
+        publish_date: int = 0,
+        attachments: Optional[list[str]] = None,
+        photo_paths: Optional[list[str | os.PathLike[str]]] = None,
+        doc_paths: Optional[list[str | os.PathLike[str]]] = None,
+        video_paths: Optional[list[str | os.PathLike[str]]] = None,
+        from_group: bool = True,
+        *,
+        reuse_uploads: bool = True,
+        concurrency: int = 8,
+        publish_dates: Mapping[int, int] | None = None,
+        **kwargs: Any,
+    ) -> dict[int, FanoutResult]:
+        # One post per group, keyed by positive group id. Media is uploaded
+        # once and its attachment strings (with access keys) are reused on
+        # every wall; pass reuse_uploads=False for closed groups whose
+        # uploads other walls cannot see. publish_dates overrides
+        # publish_date per group id.
+        targets = list(dict.fromkeys(abs(int(g)) for g in group_ids))
+        if not targets:
+            return {}
+        if 0 in targets:
+            raise ValueError("group_id must be non-zero")
+        if concurrency < 1:
+            raise ValueError("concurrency must be >= 1")
+
+        # Fail on a bad payload before anything is uploaded or posted.
+        PostCreate(message=message, publish_date=publish_date, attachments=attachments or [], from_group=from_group, **kwargs)
+
+        def scheduler_for(group_id: int) -> VKWallScheduler:
+            return self if group_id == abs(self._group_id) else self.with_group(group_id)
+
+        await self._ensure_session()
+        media: dict[str, Any] = {"photo_paths": photo_paths, "doc_paths": doc_paths, "video_paths": video_paths}
+        if reuse_uploads and any(media.values()):
+            uploader = self if abs(self._group_id) in targets else scheduler_for(targets[0])
+            uploaded = await uploader._upload_media(photo_paths, doc_paths, video_paths)
+            attachments = self._merge_attachments(attachments or [], *uploaded)
+            media = {}
+
+        semaphore = asyncio.Semaphore(concurrency)
+
+        async def post_to(group_id: int) -> FanoutResult:
+            async with semaphore:
+                try:
+                    post_id = await scheduler_for(group_id).create_scheduled_post(
+                        message,
+                        publish_date=(publish_dates or {}).get(group_id, publish_date),
+                        attachments=attachments,
+                        from_group=from_group,
+                        **media,
+                        **kwargs,
+                    )
+                except VKClientError as exc:
+                    return FanoutResult(group_id=group_id, error=exc)
+            return FanoutResult(group_id=group_id, post_id=post_id)
+
+        results = await asyncio.gather(*(post_to(g) for g in targets))
+        return {r.group_id: r for r in results}
+
+    async def edit_scheduled_post(self, post_id: int, **kwargs: Any) -> bool:
+        if post_id <= 0:
+            raise ValueError("post_id must be positive")
+
+        photo_paths = kwargs.pop("photo_paths", None)
+        doc_paths = kwargs.pop("doc_paths", None)
+        video_paths = kwargs.pop("video_paths", None)
+        payload = PostEdit(**kwargs)
+
+        uploaded_photos, uploaded_docs, uploaded_videos = await self._upload_media(photo_paths, doc_paths, video_paths)
+
+        params = self._edit_params(post_id, payload, uploaded_photos, uploaded_docs, uploaded_videos)
+        resp = await self._vk_call("wall.edit", params)
+        return self._parse_edit_ok(resp)
+
+    async def delete_scheduled_post(self, post_id: int) -> bool:
+        if post_id <= 0:
+            raise ValueError("post_id must be positive")
+
+        resp = await self._vk_call("wall.delete", self._delete_params(post_id))
+        return bool(resp == 1)
+
+    def batch(self) -> VKBatch:
+        return VKBatch(self)
+
+    async def bulk_create(self, posts: Iterable[PostCreate | dict[str, Any]]) -> list[BatchItemResult]:
+        async with self.batch() as batch:
+            for post in posts:
+                payload = post if isinstance(post, PostCreate) else PostCreate(**post)
+                batch.create_scheduled_post(**payload.model_dump())
+        return batch.results
+
+    async def bulk_edit(
+        self,
+        edits: Mapping[int, PostEdit | dict[str, Any]] | Iterable[tuple[int, PostEdit | dict[str, Any]]],
+    ) -> list[BatchItemResult]:
+        items = edits.items() if isinstance(edits, Mapping) else edits
+        async with self.batch() as batch:
+            for post_id, edit in items:
+                payload = edit if isinstance(edit, PostEdit) else PostEdit(**edit)
+                batch.edit_scheduled_post(post_id, **payload.model_dump(exclude_unset=True))
+        return batch.results
+
+    async def bulk_delete(self, post_ids: Iterable[int]) -> list[BatchItemResult]:
+        async with self.batch() as batch:
+            for post_id in post_ids:
+                batch.delete_scheduled_post(post_id)
+        return batch.results
+
+    def _post_params(self, payload: PostCreate) -> dict[str, Any]:
         params: dict[str, Any] = {
             "owner_id": self._owner_id(),
             "message": payload.message,
@@ -451,32 +957,16 @@ class VKWallScheduler:
             params["friends_only"] = 1 if payload.friends_only else 0
         if payload.signed is not None:
             params["signed"] = 1 if payload.signed else 0
+        return params
 
-        resp = await self._vk_call("wall.post", params)
-        post_id = int((resp or {}).get("post_id", 0))
-        if post_id <= 0:
-            raise VKClientError("VK returned invalid post_id")
-        return post_id
-
-    async def edit_scheduled_post(self, post_id: int, **kwargs: Any) -> bool:
-        if post_id <= 0:
-            raise ValueError("post_id must be positive")
-
-        photo_paths = kwargs.pop("photo_paths", None)
-        doc_paths = kwargs.pop("doc_paths", None)
-        video_paths = kwargs.pop("video_paths", None)
-        payload = PostEdit(**kwargs)
-
-        uploaded_photos: list[str] = []
-        uploaded_docs: list[str] = []
-        uploaded_videos: list[str] = []
-        if photo_paths:
-            uploaded_photos = await self.upload_wall_photos(list(photo_paths))
-        if doc_paths:
-            uploaded_docs = await self.upload_docs(list(doc_paths))
-        if video_paths:
-            uploaded_videos = await self.upload_videos(list(video_paths))
-
+    def _edit_params(
+        self,
+        post_id: int,
+        payload: PostEdit,
+        uploaded_photos: Optional[list[str]] = None,
+        uploaded_docs: Optional[list[str]] = None,
+        uploaded_videos: Optional[list[str]] = None,
+    ) -> dict[str, Any]:
         params: dict[str, Any] = {
             "owner_id": self._owner_id(),
             "post_id": post_id,
@@ -499,22 +989,24 @@ class VKWallScheduler:
             params["friends_only"] = 1 if payload.friends_only else 0
         if payload.signed is not None:
             params["signed"] = 1 if payload.signed else 0
+        return params
 
-        resp = await self._vk_call("wall.edit", params)
-        return bool(resp == 1 or (isinstance(resp, dict) and resp.get("success") == 1))
+    def _delete_params(self, post_id: int) -> dict[str, Any]:
+        return {
+            "owner_id": self._owner_id(),
+            "post_id": post_id,
+        }
 
-    async def delete_scheduled_post(self, post_id: int) -> bool:
+    @staticmethod
+    def _parse_post_id(resp: Any) -> int:
+        post_id = int((resp or {}).get("post_id", 0))
         if post_id <= 0:
-            raise ValueError("post_id must be positive")
+            raise VKClientError("VK returned invalid post_id")
+        return post_id
 
-        resp = await self._vk_call(
-            "wall.delete",
-            {
-                "owner_id": self._owner_id(),
-                "post_id": post_id,
-            },
-        )
-        return bool(resp == 1)
+    @staticmethod
+    def _parse_edit_ok(resp: Any) -> bool:
+        return bool(resp == 1 or (isinstance(resp, dict) and resp.get("success") == 1))
 
 
 def load_scheduler_from_env() -> VKWallScheduler:
@@ -524,6 +1016,9 @@ def load_scheduler_from_env() -> VKWallScheduler:
     group_id_raw = os.getenv("VK_GROUP_ID", "0")
     api_version = os.getenv("VK_API_VERSION", "5.199")
     cache_ttl_s = float(os.getenv("VK_CACHE_TTL_S", "0") or "0")
+    rate_limit_rps = float(os.getenv("VK_RATE_LIMIT_RPS", "0") or "0")
+    video_chunk_size = int(os.getenv("VK_VIDEO_CHUNK_SIZE", "0") or "0")
+    api_base_url = os.getenv("VK_API_BASE_URL", "") or DEFAULT_API_BASE_URL
 
     try:
         group_id = int(group_id_raw)
@@ -535,4 +1030,7 @@ def load_scheduler_from_env() -> VKWallScheduler:
         group_id=group_id,
         api_version=api_version,
         cache_ttl_s=cache_ttl_s,
+        rate_limiter=VKRateLimiter(rate_limit_rps) if rate_limit_rps > 0 else get_default_rate_limiter(),
+        video_chunk_size=video_chunk_size or None,
+        api_base_url=api_base_url,
     )